@@ -0,0 +1,123 @@
+#
+# Convert Backends Benchmark
+#   Compare the converter backends on the same textures.
+#   How to use :
+#       python convert_backends.py --maketx path/to/maketx
+#       python convert_backends.py --source path/to/textures --tiles 4
+#   Without --source, the synthetic 4K UDIM textures are generated,
+#   it needs NumPy and tifffile.
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import List, Tuple
+from os.path import dirname, join, realpath
+import argparse
+import tempfile
+import shutil
+import glob
+import time
+import sys
+import os
+
+sys.path.append(join(dirname(dirname(realpath(__file__))), "modules"))
+
+from SurF.convert import Backends, ConverterPool, ConvertJob, ConvertResult  # noqa: E402
+import SurF.imaging  # noqa: E402
+
+_MakeTxOptions: List[str] = [
+    "-oiio", "-u", "--checknan",
+    "--constant-color-detect", "--monochrome-detect", "--opaque-detect"
+]
+
+
+def generate_textures(directory: str, tiles: int, size: int) -> List[str]:
+    """
+    Generate the UDIM textures with noise and gradient.
+    """
+    numpy = SurF.imaging.numpy
+    if numpy is None or SurF.imaging.tifffile is None:
+        raise SystemExit("NumPy and tifffile are required to generate textures.")
+    random = numpy.random.default_rng(0)
+    gradient = numpy.linspace(0, 255, size, dtype=numpy.float32)
+    files: List[str] = []
+    index: int
+    for index in range(tiles):
+        image = random.integers(0, 64, (size, size, 3), dtype=numpy.uint8)
+        image = image + gradient[None, :, None].astype(numpy.uint8) // 2
+        file: str = join(directory, f"Benchmark_BaseColor.{1001 + index}.tif")
+        SurF.imaging.write_image(file, image)
+        files.append(file)
+    return files
+
+
+def run_backend(
+        name: str, sources: List[str], output: str, maketx: str, workers: int
+) -> Tuple[float, List[ConvertResult]]:
+    backend = Backends[name]()
+    pool: ConverterPool = ConverterPool(workers, backend)
+    jobs: List[ConvertJob] = []
+    source: str
+    for source in sources:
+        destination: str = join(
+            output, name, os.path.splitext(os.path.basename(source))[0] + ".tx"
+        )
+        os.makedirs(dirname(destination), exist_ok=True)
+        command: List[str] = [maketx] + _MakeTxOptions + ["-o", destination, source]
+        jobs.append(ConvertJob(source, destination, command))
+    start: float = time.perf_counter()
+    results: List[ConvertResult] = pool.submit(jobs).wait()
+    elapsed: float = time.perf_counter() - start
+    pool.shutdown()
+    return elapsed, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the converter backends.")
+    parser.add_argument("--source", default="", help="The directory of textures.")
+    parser.add_argument("--tiles", type=int, default=4, help="The generated UDIM tiles.")
+    parser.add_argument("--size", type=int, default=4096, help="The generated size.")
+    parser.add_argument("--maketx", default="maketx", help="The maketx path.")
+    parser.add_argument("--workers", type=int, default=0, help="The converter workers.")
+    arguments = parser.parse_args()
+
+    temp_directory: str = tempfile.mkdtemp(prefix="surf_benchmark_")
+    try:
+        if arguments.source:
+            sources: List[str] = sorted(
+                glob.glob(join(arguments.source, "*.tif")) +
+                glob.glob(join(arguments.source, "*.exr")) +
+                glob.glob(join(arguments.source, "*.png"))
+            )
+        else:
+            sources = generate_textures(temp_directory, arguments.tiles, arguments.size)
+        if not sources:
+            raise SystemExit("No textures found.")
+        megabytes: float = sum(os.path.getsize(file) for file in sources) / 1024 ** 2
+        print(f"{len(sources)} textures, {megabytes:.1f} MB")
+        print(f"{'Backend':<10}{'Seconds':>10}{'Files/s':>10}{'MB/s':>10}{'Failed':>8}")
+        name: str
+        for name in Backends:
+            if not Backends[name].is_available():
+                print(f"{name:<10}{'not available':>38}")
+                continue
+            if name == "maketx" and shutil.which(arguments.maketx) is None:
+                print(f"{name:<10}{'not found':>38}")
+                continue
+            elapsed, results = run_backend(
+                name, sources, join(temp_directory, "output"),
+                arguments.maketx, arguments.workers
+            )
+            failed: int = sum(1 for result in results if not result.successful)
+            print(
+                f"{name:<10}{elapsed:>10.2f}{len(sources) / elapsed:>10.2f}"
+                f"{megabytes / elapsed:>10.1f}{failed:>8}"
+            )
+    finally:
+        shutil.rmtree(temp_directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
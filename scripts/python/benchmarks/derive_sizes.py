@@ -0,0 +1,164 @@
+#
+# Derive Sizes Benchmark
+#   Compare deriving the lower resolutions from one full resolution export
+#   against exporting each resolution again by painter.
+#   How to use :
+#       python derive_sizes.py --sizes 2048 1024 512
+#       python derive_sizes.py --source path/to/textures --manifest path/to/manifest.json
+#   Without --source, the synthetic 4K sRGB textures are generated,
+#   it needs NumPy and tifffile.
+#   The painter export time is read from the manifest of a full resolution
+#   export (export_duration of each texture set), or given by --painter.
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import List, Tuple
+from os.path import dirname, join, realpath
+import argparse
+import tempfile
+import shutil
+import glob
+import json
+import time
+import sys
+import os
+
+sys.path.append(join(dirname(dirname(realpath(__file__))), "modules"))
+
+from SurF.convert import ConverterPool, ConvertJob, ConvertResult  # noqa: E402
+from SurF.derive import DeriveBackend, DeriveJob, get_method  # noqa: E402
+import SurF.imaging  # noqa: E402
+
+_Methods: List[Tuple[str, str, str]] = [
+    ("numpy-box", "numpy", "box"),
+    ("numpy-lanczos", "numpy", "lanczos"),
+    ("oiio", "oiio", "lanczos"),
+    ("oiiotool", "oiiotool", "lanczos")
+]
+
+
+def generate_textures(directory: str, tiles: int, size: int) -> List[str]:
+    """
+    Generate the sRGB UDIM textures with noise and gradient.
+    """
+    numpy = SurF.imaging.numpy
+    if numpy is None or SurF.imaging.tifffile is None:
+        raise SystemExit("NumPy and tifffile are required to generate textures.")
+    random = numpy.random.default_rng(0)
+    gradient = numpy.linspace(0, 255, size, dtype=numpy.float32)
+    files: List[str] = []
+    index: int
+    for index in range(tiles):
+        image = random.integers(0, 64, (size, size, 3), dtype=numpy.uint8)
+        image = image + gradient[None, :, None].astype(numpy.uint8) // 2
+        file: str = join(directory, f"Benchmark_BaseColor.{1001 + index}.tif")
+        SurF.imaging.write_image(file, image)
+        files.append(file)
+    return files
+
+
+def get_painter_seconds(manifest: str) -> float:
+    """
+    :return:
+        The painter export time of one full resolution export,
+        the sum of export duration of each texture set.
+    """
+    with open(manifest, "r") as file_handle:
+        records: List[dict] = json.load(file_handle)["records"]
+    return sum({
+        record.get("texture_set"): record.get("export_duration") or 0.0
+        for record in records if not record.get("derived")
+    }.values())
+
+
+def run_method(
+        method: str,
+        filter_name: str,
+        sources: List[str],
+        sizes: List[int],
+        output: str,
+        oiiotool: str,
+        workers: int
+) -> Tuple[float, List[ConvertResult]]:
+    pool: ConverterPool = ConverterPool(workers, DeriveBackend(), adaptive=False)
+    jobs: List[ConvertJob] = []
+    source: str
+    for source in sources:
+        header = SurF.imaging.read_header(source)
+        width: int = header.width if header is not None else max(sizes)
+        size: int
+        for size in sizes:
+            destination: str = join(
+                output, f"{method}_{filter_name}", str(size), os.path.basename(source)
+            )
+            os.makedirs(dirname(destination), exist_ok=True)
+            jobs.append(DeriveJob(
+                source, destination, size / width, 8, oiiotool,
+                filter_name, srgb=True, method=method
+            ))
+    start: float = time.perf_counter()
+    results: List[ConvertResult] = pool.submit(jobs).wait()
+    elapsed: float = time.perf_counter() - start
+    pool.shutdown()
+    return elapsed, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare deriving lower resolutions against exporting again."
+    )
+    parser.add_argument("--source", default="", help="The directory of textures.")
+    parser.add_argument("--tiles", type=int, default=4, help="The generated UDIM tiles.")
+    parser.add_argument("--size", type=int, default=4096, help="The generated size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2048, 1024, 512])
+    parser.add_argument("--oiiotool", default="oiiotool", help="The oiiotool path.")
+    parser.add_argument("--workers", type=int, default=0, help="The derive workers.")
+    parser.add_argument("--manifest", default="", help="The manifest of painter export.")
+    parser.add_argument("--painter", type=float, default=0.0,
+                        help="Seconds of one full resolution painter export.")
+    arguments = parser.parse_args()
+
+    temp_directory: str = tempfile.mkdtemp(prefix="surf_benchmark_")
+    try:
+        if arguments.source:
+            sources: List[str] = sorted(
+                glob.glob(join(arguments.source, "*.tif")) +
+                glob.glob(join(arguments.source, "*.png"))
+            )
+        else:
+            sources = generate_textures(temp_directory, arguments.tiles, arguments.size)
+        if not sources:
+            raise SystemExit("No textures found.")
+        print(f"{len(sources)} textures, sizes {arguments.sizes}")
+        print(f"{'Method':<16}{'Seconds':>10}{'Files/s':>10}{'Failed':>8}")
+        name: str
+        for name, method, filter_name in _Methods:
+            if get_method(method, sources[0], sources[0]) != method:
+                print(f"{name:<16}{'not available':>28}")
+                continue
+            if method == "oiiotool" and shutil.which(arguments.oiiotool) is None:
+                print(f"{name:<16}{'not found':>28}")
+                continue
+            elapsed, results = run_method(
+                method, filter_name, sources, arguments.sizes,
+                join(temp_directory, "output"), arguments.oiiotool, arguments.workers
+            )
+            failed: int = sum(1 for result in results if not result.successful)
+            print(f"{name:<16}{elapsed:>10.2f}{len(results) / elapsed:>10.2f}{failed:>8}")
+        painter: float = arguments.painter
+        if arguments.manifest:
+            painter = get_painter_seconds(arguments.manifest)
+        if painter:
+            # One more painter export per lower resolution.
+            print(f"{'painter':<16}{painter * len(arguments.sizes):>10.2f}")
+        else:
+            print("painter : give --manifest or --painter to compare the export time.")
+    finally:
+        shutil.rmtree(temp_directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
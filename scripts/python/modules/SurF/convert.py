@@ -0,0 +1,671 @@
+#
+# SurF.convert
+#   The converter pool and converter backends :
+#       maketx - Launch the converter (maketx) directly.
+#       oiio - OpenImageIO's make_texture in process.
+#       numpy - NumPy MIP builder in process, needs tifffile.
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import Callable, Dict, List, Optional, Set, Tuple, Type
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, CancelledError
+from SurF.utils import kill_process_tree, get_physical_memory, warn
+from SurF.trace import span, traced
+import SurF.imaging
+import subprocess
+import threading
+import functools
+import itertools
+import hashlib
+import heapq
+import json
+import time
+import re
+import os
+
+_HashChunkSize: int = 1024 * 1024
+
+# The working memory of converter, source pixels plus float MIP pyramid (4/3).
+_FloatMipFactor: float = 4.0 * 4.0 / 3.0
+
+
+def hash_file(file: str) -> str:
+    """
+    :param file: The file path.
+    :return:
+        The content hash of file.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file, "rb") as file_handle:
+        chunk: bytes = file_handle.read(_HashChunkSize)
+        while chunk:
+            digest.update(chunk)
+            chunk = file_handle.read(_HashChunkSize)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=8)
+def _get_converter_version(converter: str, size: int, mtime: float) -> str:
+    try:
+        output: str = subprocess.run(
+            [converter, "--help"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            timeout=10,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        ).stdout or ""
+    except (OSError, subprocess.SubprocessError):
+        output = ""
+    matcher = re.search(r"OpenImageIO\s+(\S+)", output)
+    return matcher.group(1) if matcher else f"{size}-{mtime}"
+
+
+def get_converter_version(converter: str) -> str:
+    """
+    :param converter: The converter path.
+    :return:
+        The converter version, or size and modified time if unknown.
+    """
+    try:
+        stat: os.stat_result = os.stat(converter)
+    except OSError:
+        return ""
+    return _get_converter_version(converter, stat.st_size, stat.st_mtime)
+
+
+class ConvertResult(object):
+    """
+    The result of one converted file.
+    """
+    def __init__(
+            self,
+            source: str,
+            destination: str,
+            return_code: int,
+            stderr: str = "",
+            duration: float = 0.0,
+            cached: bool = False,
+            saved: float = 0.0
+    ) -> None:
+        self.source: str = source
+        self.destination: str = destination
+        self.return_code: int = return_code
+        self.stderr: str = stderr
+        self.duration: float = duration
+        self.cached: bool = cached
+        self.saved: float = saved
+
+    @property
+    def successful(self) -> bool:
+        return self.return_code == 0
+
+    def to_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "destination": self.destination,
+            "return_code": self.return_code,
+            "stderr": self.stderr,
+            "duration": self.duration,
+            "cached": self.cached,
+            "saved": self.saved
+        }
+
+
+class ConvertJob(object):
+    """
+    The converter command of one file.
+    The signature describes how it converted (options, converter version...),
+    it is a part of cache key with the source content hash.
+    """
+    def __init__(
+            self,
+            source: str,
+            destination: str,
+            command: List[str],
+            signature: str = "",
+            color_convert: Optional[Tuple[str, str]] = None
+    ) -> None:
+        self.source: str = source
+        self.destination: str = destination
+        self.command: List[str] = command
+        self.signature: str = signature
+        self.color_convert: Optional[Tuple[str, str]] = color_convert
+
+
+class ConvertCache(object):
+    """
+    Skip the converter if the source is byte-identical to last conversion,
+    the destination will be untouched.
+    The index is a JSON file in the convert directory :
+        {destination : {"key" : key, "size" : size, "duration" : duration}}
+    How to use :
+        cache = ConvertCache.get(directory)
+        batch = pool.submit(jobs, cache)
+        batch.wait()
+        cache.save()
+    """
+    IndexName: str = ".surf_convert_cache.json"
+    Caches: Dict[str, "ConvertCache"] = {}
+    CachesLock: threading.Lock = threading.Lock()
+
+    def __init__(self, directory: str) -> None:
+        self.directory: str = directory
+        self.index_file: str = os.path.join(directory, ConvertCache.IndexName)
+        self.index: Dict[str, dict] = {}
+        self.changed: bool = False
+        self.lock: threading.Lock = threading.Lock()
+        if os.path.isfile(self.index_file):
+            try:
+                with open(self.index_file, "r") as file_handle:
+                    self.index = json.load(file_handle)
+            except (OSError, ValueError) as error:
+                warn(f"Failed to read convert cache : {error}")
+
+    @classmethod
+    def get(cls, directory: str) -> "ConvertCache":
+        """
+        :param directory: The convert directory.
+        :return:
+            The shared cache of directory.
+        """
+        with cls.CachesLock:
+            if directory not in cls.Caches:
+                cls.Caches[directory] = ConvertCache(directory)
+            return cls.Caches[directory]
+
+    @staticmethod
+    def get_key(source: str, signature: str) -> str:
+        return hashlib.sha1(
+            (hash_file(source) + "|" + signature).encode()
+        ).hexdigest()
+
+    def lookup(self, destination: str, key: str) -> Optional[float]:
+        """
+        :return:
+            The duration of last conversion if hit, otherwise None.
+        """
+        with self.lock:
+            record: Optional[dict] = self.index.get(destination)
+        if record is None or record.get("key") != key:
+            return None
+        try:
+            if os.path.getsize(destination) != record.get("size"):
+                return None
+        except OSError:
+            return None
+        return record.get("duration", 0.0)
+
+    def store(self, destination: str, key: str, duration: float) -> None:
+        try:
+            size: int = os.path.getsize(destination)
+        except OSError:
+            return
+        with self.lock:
+            self.index[destination] = {
+                "key": key, "size": size, "duration": duration
+            }
+            self.changed = True
+
+    @traced("ConvertCache.save", "io")
+    def save(self) -> None:
+        with self.lock:
+            if not self.changed:
+                return
+            temp_file: str = self.index_file + f".{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+                with open(temp_file, "w") as file_handle:
+                    json.dump(self.index, file_handle)
+                os.replace(temp_file, self.index_file)
+                self.changed = False
+            except OSError as os_error:
+                warn(f"Failed to write convert cache : {os_error}")
+
+
+class ConvertBatch(object):
+    """
+    The jobs submitted together, it can be waited or cancelled.
+    """
+    def __init__(self) -> None:
+        self.futures: List[Future] = []
+        self.processes: Set[subprocess.Popen] = set()
+        self.cancelled: bool = False
+        self.lock: threading.Lock = threading.Lock()
+
+    def add_process(self, process: subprocess.Popen) -> bool:
+        """
+        :return:
+            False if the batch has been cancelled.
+        """
+        with self.lock:
+            if self.cancelled:
+                return False
+            self.processes.add(process)
+            return True
+
+    def remove_process(self, process: subprocess.Popen) -> None:
+        with self.lock:
+            self.processes.discard(process)
+
+    def cancel(self) -> None:
+        """
+        Cancel the pending jobs and kill the running processes.
+        """
+        with self.lock:
+            self.cancelled = True
+            processes: List[subprocess.Popen] = list(self.processes)
+        future: Future
+        for future in self.futures:
+            future.cancel()
+        process: subprocess.Popen
+        for process in processes:
+            kill_process_tree(process)
+
+    def wait(
+            self, callback: Optional[Callable[[ConvertResult], None]] = None
+    ) -> List[ConvertResult]:
+        """
+        :param callback: Called with each result as soon as it finished.
+        :return:
+            The results of finished jobs.
+        """
+        results: List[ConvertResult] = []
+        future: Future
+        for future in as_completed(self.futures):
+            try:
+                result: ConvertResult = future.result()
+            except CancelledError:
+                continue
+            results.append(result)
+            if callback is not None:
+                callback(result)
+        return results
+
+
+class ConverterBackend(object):
+    """
+    The converter backend converts one file in worker thread.
+    """
+    Name: str = ""
+
+    @staticmethod
+    def is_available() -> bool:
+        return True
+
+    def convert(self, job: ConvertJob, batch: ConvertBatch) -> ConvertResult:
+        raise NotImplementedError
+
+
+class MakeTxBackend(ConverterBackend):
+    """
+    Launch the converter command (maketx) as a process.
+    """
+    Name: str = "maketx"
+
+    def convert(self, job: ConvertJob, batch: ConvertBatch) -> ConvertResult:
+        start: float = time.perf_counter()
+        try:
+            process: subprocess.Popen = subprocess.Popen(
+                job.command,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+                start_new_session=True,
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+            )
+        except OSError as os_error:
+            return ConvertResult(
+                job.source, job.destination, -1, str(os_error),
+                time.perf_counter() - start
+            )
+        if not batch.add_process(process):
+            kill_process_tree(process)
+        stderr: str = process.communicate()[1] or ""
+        batch.remove_process(process)
+        return ConvertResult(
+            job.source, job.destination, process.returncode, stderr.strip(),
+            time.perf_counter() - start
+        )
+
+
+class OIIOBackend(ConverterBackend):
+    """
+    Call OpenImageIO's make_texture in process.
+    """
+    Name: str = "oiio"
+
+    @staticmethod
+    def is_available() -> bool:
+        return SurF.imaging.oiio is not None
+
+    def convert(self, job: ConvertJob, batch: ConvertBatch) -> ConvertResult:
+        oiio = SurF.imaging.oiio
+        start: float = time.perf_counter()
+        config = oiio.ImageSpec()
+        attribute: str
+        for attribute in (
+                "maketx:checknan",
+                "maketx:constant_color_detect",
+                "maketx:monochrome_detect",
+                "maketx:opaque_detect"
+        ):
+            config.attribute(attribute, 1)
+        if job.color_convert is not None:
+            config.attribute("maketx:incolorspace", job.color_convert[0])
+            config.attribute("maketx:outcolorspace", job.color_convert[1])
+        image_buffer = oiio.ImageBuf(job.source)
+        successful: bool = oiio.ImageBufAlgo.make_texture(
+            oiio.MakeTxTexture, image_buffer, job.destination, config
+        )
+        return ConvertResult(
+            job.source, job.destination, 0 if successful else 1,
+            "" if successful else oiio.geterror(), time.perf_counter() - start
+        )
+
+
+class NumpyBackend(ConverterBackend):
+    """
+    Build the tiled MIP pyramid by NumPy in process.
+    The color convert is always sRGB to linear.
+    """
+    Name: str = "numpy"
+
+    @staticmethod
+    def is_available() -> bool:
+        return SurF.imaging.numpy is not None and SurF.imaging.tifffile is not None
+
+    def convert(self, job: ConvertJob, batch: ConvertBatch) -> ConvertResult:
+        start: float = time.perf_counter()
+        try:
+            image = SurF.imaging.read_image(job.source)
+            if SurF.imaging.has_nan(image):
+                raise ValueError(f"NaN found : {job.source}")
+            if job.color_convert is not None:
+                image = SurF.imaging.srgb_to_linear(image)
+            image = SurF.imaging.reduce_texture(image)
+            SurF.imaging.write_texture(
+                job.destination, SurF.imaging.build_mips(image)
+            )
+        except (IOError, OSError, ValueError) as error:
+            return ConvertResult(
+                job.source, job.destination, 1, str(error),
+                time.perf_counter() - start
+            )
+        return ConvertResult(
+            job.source, job.destination, 0, "", time.perf_counter() - start
+        )
+
+
+Backends: Dict[str, Type[ConverterBackend]] = {
+    MakeTxBackend.Name: MakeTxBackend,
+    OIIOBackend.Name: OIIOBackend,
+    NumpyBackend.Name: NumpyBackend
+}
+
+
+def get_backend(name: str) -> ConverterBackend:
+    """
+    :param name: "maketx", "oiio", "numpy" or "auto",
+                 "auto" is oiio if available, otherwise maketx.
+    :return:
+        The backend, fallback to maketx if not available.
+    """
+    if name == "auto":
+        name = OIIOBackend.Name if OIIOBackend.is_available() else MakeTxBackend.Name
+    backend: Type[ConverterBackend] = Backends.get(name, MakeTxBackend)
+    if not backend.is_available():
+        warn(f"Converter backend is not available : {name}, use maketx.")
+        backend = MakeTxBackend
+    return backend()
+
+
+def estimate_memory(source: str) -> int:
+    """
+    :param source: The source image.
+    :return:
+        The estimated memory in bytes to convert the image,
+        by the header if readable, otherwise by the file size.
+    """
+    header: Optional[SurF.imaging.ImageHeader] = SurF.imaging.read_header(source)
+    if header is not None:
+        pixels: int = header.width * header.height * header.channels
+        return int(header.bytes + pixels * _FloatMipFactor)
+    try:
+        return os.path.getsize(source) * 8
+    except OSError:
+        return 0
+
+
+class ConvertTask(object):
+    """
+    The scheduled job with its batch, cache and future.
+    """
+    def __init__(
+            self,
+            job: ConvertJob,
+            batch: ConvertBatch,
+            cache: Optional[ConvertCache],
+            future: Future
+    ) -> None:
+        self.job: ConvertJob = job
+        self.batch: ConvertBatch = batch
+        self.cache: Optional[ConvertCache] = cache
+        self.future: Future = future
+        self.memory: int = estimate_memory(job.source)
+        try:
+            self.size: int = os.path.getsize(job.source)
+        except OSError:
+            self.size = 0
+
+
+class ConvertScheduler(object):
+    """
+    Start the largest task first, bounded by memory budget and concurrency.
+    The concurrency is adjusted by measured throughput (source bytes per second),
+    it climbs up while throughput improves and steps back if it drops.
+    How to use :
+        scheduler = ConvertScheduler(8, 16 * 1024 ** 3)
+        scheduler.push(task)
+        task = scheduler.acquire()
+        ...
+        scheduler.release(task, measured=True)
+    """
+    def __init__(
+            self, max_workers: int, memory_budget: int = 0, adaptive: bool = True
+    ) -> None:
+        self.max_workers: int = max(1, max_workers)
+        self.memory_budget: int = memory_budget or get_physical_memory() // 2
+        self.adaptive: bool = adaptive
+        self.limit: int = max(1, self.max_workers // 2) if adaptive else self.max_workers
+        self.running: int = 0
+        self.memory_used: int = 0
+        self.condition: threading.Condition = threading.Condition()
+        self._pending: List[tuple] = []
+        self._sequence = itertools.count()
+        self._direction: int = 1
+        self._window_start: float = 0.0
+        self._window_bytes: int = 0
+        self._window_count: int = 0
+        self._last_throughput: float = 0.0
+
+    def push(self, task: ConvertTask) -> None:
+        with self.condition:
+            heapq.heappush(
+                self._pending, (-task.memory, -task.size, next(self._sequence), task)
+            )
+            self.condition.notify()
+
+    def _can_start(self) -> bool:
+        if not self._pending or self.running >= self.limit:
+            return False
+        # The largest task always runs alone if it exceeds the budget.
+        memory: int = -self._pending[0][0]
+        return self.running == 0 or self.memory_used + memory <= self.memory_budget
+
+    def acquire(self) -> ConvertTask:
+        """
+        Wait until the largest pending task can be started.
+        """
+        with self.condition:
+            self.condition.wait_for(self._can_start)
+            task: ConvertTask = heapq.heappop(self._pending)[-1]
+            self.running += 1
+            self.memory_used += task.memory
+            if not self._window_start:
+                self._window_start = time.perf_counter()
+            return task
+
+    def release(self, task: ConvertTask, measured: bool = True) -> None:
+        """
+        :param task: The finished task.
+        :param measured: False if the task is skipped (cached or cancelled).
+        """
+        with self.condition:
+            self.running -= 1
+            self.memory_used -= task.memory
+            if measured:
+                self._window_bytes += task.size
+                self._window_count += 1
+                if self.adaptive and self._window_count >= max(2, self.limit):
+                    self._adjust()
+            if not self.running and not self._pending:
+                self._window_start = 0.0
+                self._window_bytes = 0
+                self._window_count = 0
+            self.condition.notify_all()
+
+    def _adjust(self) -> None:
+        now: float = time.perf_counter()
+        throughput: float = self._window_bytes / max(now - self._window_start, 1e-6)
+        if throughput < self._last_throughput * 0.95:
+            self._direction = -self._direction
+        self.limit = min(self.max_workers, max(1, self.limit + self._direction))
+        self._last_throughput = throughput
+        self._window_start = now
+        self._window_bytes = 0
+        self._window_count = 0
+
+
+class ConverterPool(object):
+    """
+    Persistent pool to run converter backend with bounded concurrency,
+    the worker threads stay warm across exports.
+    The jobs are scheduled largest first by ConvertScheduler across batches.
+    How to use :
+        pool = ConverterPool(4, get_backend("maketx"))
+        batch = pool.submit([ConvertJob(source, destination, command)])
+        results = batch.wait(callback)
+    """
+    def __init__(
+            self,
+            max_workers: int = 0,
+            backend: Optional[ConverterBackend] = None,
+            memory_budget: int = 0,
+            adaptive: bool = True
+    ) -> None:
+        self.max_workers: int = max_workers or os.cpu_count() or 1
+        self.backend: ConverterBackend = backend or MakeTxBackend()
+        self.scheduler: ConvertScheduler = ConvertScheduler(
+            self.max_workers, memory_budget, adaptive
+        )
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.lock: threading.Lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.backend.Name
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="SurF-Converter"
+                )
+            return self.executor
+
+    def run(
+            self,
+            job: ConvertJob,
+            batch: ConvertBatch,
+            cache: Optional[ConvertCache] = None
+    ) -> ConvertResult:
+        """
+        Run the converter of one file in worker thread.
+        """
+        start: float = time.perf_counter()
+        key: str = ""
+        if cache is not None:
+            try:
+                with span("ConvertCache.get_key", "convert"):
+                    key = ConvertCache.get_key(job.source, job.signature)
+            except OSError as os_error:
+                return ConvertResult(
+                    job.source, job.destination, -1, str(os_error),
+                    time.perf_counter() - start
+                )
+            saved: Optional[float] = cache.lookup(job.destination, key)
+            if saved is not None:
+                return ConvertResult(
+                    job.source, job.destination, 0, "",
+                    time.perf_counter() - start, cached=True, saved=saved
+                )
+        if batch.cancelled:
+            return ConvertResult(job.source, job.destination, -1, "Cancelled")
+        with span(f"{self.backend.Name}.convert", "convert", source=job.source):
+            result: ConvertResult = self.backend.convert(job, batch)
+        if cache is not None and result.successful:
+            cache.store(job.destination, key, result.duration)
+        return result
+
+    def submit(
+            self, jobs: List[ConvertJob], cache: Optional[ConvertCache] = None
+    ) -> ConvertBatch:
+        """
+        :param jobs: The convert jobs.
+        :param cache: The convert cache, None is no cache.
+        :return:
+            The batch of submitted jobs.
+        """
+        batch: ConvertBatch = ConvertBatch()
+        executor: ThreadPoolExecutor = self.get_executor()
+        job: ConvertJob
+        for job in jobs:
+            future: Future = Future()
+            batch.futures.append(future)
+            self.scheduler.push(ConvertTask(job, batch, cache, future))
+        # Push all before running, so the largest of batch starts first.
+        for _ in jobs:
+            executor.submit(self._work)
+        return batch
+
+    def _work(self) -> None:
+        """
+        Run the largest pending task, one call per submitted job.
+        """
+        task: ConvertTask = self.scheduler.acquire()
+        measured: bool = False
+        try:
+            if not task.future.set_running_or_notify_cancel():
+                return
+            try:
+                result: ConvertResult = self.run(task.job, task.batch, task.cache)
+            except Exception as unknown_error:
+                # A failed job must not abandon the rest of the batch.
+                result = ConvertResult(
+                    task.job.source, task.job.destination, -1, str(unknown_error)
+                )
+            measured = result.successful and not result.cached
+            task.future.set_result(result)
+        finally:
+            self.scheduler.release(task, measured)
+
+    def shutdown(self) -> None:
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False)
+                self.executor = None
+
@@ -0,0 +1,230 @@
+#
+# SurF.derive
+#   Derive the delivery profiles from the exported textures, resize and
+#   change the bit-depth and format without exporting again :
+#       numpy - Vectorized box or Lanczos filter by NumPy in process,
+#               reading and writing need tifffile (TIFF only) or OpenImageIO.
+#       oiio - OpenImageIO's ImageBufAlgo.resize in process.
+#       oiiotool - Launch oiiotool.
+#       auto - The first available of numpy, oiio and oiiotool.
+#   The sRGB channels are filtered in linear.
+#   The derive jobs run in ConverterPool with DeriveBackend, in parallel.
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import Dict, List
+from SurF.convert import ConvertBatch, ConvertJob, ConvertResult, MakeTxBackend
+import SurF.imaging
+import time
+import os
+import re
+
+Methods: List[str] = ["auto", "numpy", "oiio", "oiiotool"]
+
+_DataTypes: Dict[int, str] = {8: "uint8", 16: "uint16", 32: "float"}
+_NumpyTypes: Dict[int, str] = {8: "uint8", 16: "uint16", 32: "float32"}
+_OIIOFilters: Dict[str, str] = {"box": "box", "lanczos": "lanczos3"}
+
+_VariablePattern = re.compile(r"\$([A-Za-z]+)")
+_GroupPattern = re.compile(r"\(([^()]*)\)")
+
+
+def expand_name(template: str, variables: Dict[str, str]) -> str:
+    """
+    Expand the painter's export name template.
+    :param template: The name template, such as "$textureSet/C1(_$udim)".
+    :param variables: The variables without "$", such as {"textureSet": "Body"}.
+    :return:
+        The expanded name, the optional group "( )" is removed if any
+        variable in it is empty, the unknown variables are empty.
+    """
+    def expand_group(matcher) -> str:
+        content: str = matcher.group(1)
+        if any(not variables.get(name) for name in _VariablePattern.findall(content)):
+            return ""
+        return content
+
+    name: str = _GroupPattern.sub(expand_group, template)
+    return _VariablePattern.sub(lambda matcher: variables.get(matcher.group(1), ""), name)
+
+
+def get_oiiotool(converter: str) -> str:
+    """
+    :param converter: The converter (maketx) path.
+    :return:
+        The oiiotool next to converter, otherwise "oiiotool" from PATH.
+    """
+    name: str = "oiiotool.exe" if os.name == "nt" else "oiiotool"
+    oiiotool: str = os.path.join(os.path.dirname(converter), name)
+    if converter and os.path.isfile(oiiotool):
+        return oiiotool.replace("\\", "/")
+    return "oiiotool"
+
+
+def get_derive_command(
+        tool: str,
+        source: str,
+        destination: str,
+        scale: float,
+        bit_depth: int,
+        filter_name: str = "lanczos",
+        srgb: bool = False
+) -> List[str]:
+    """
+    :param tool: The oiiotool path.
+    :param source: The exported image.
+    :param destination: The derived image, the format is decided by extension.
+    :param scale: The resize scale, 1.0 is not resized.
+    :param bit_depth: 8, 16 or 32, 0 keeps the source bit-depth.
+    :param filter_name: "box" or "lanczos".
+    :param srgb: Resize in linear.
+    :return:
+        The oiiotool command.
+    """
+    command: List[str] = [tool, source]
+    if scale != 1.0:
+        resize: List[str] = [
+            f"--resize:filter={_OIIOFilters[filter_name]}", f"{scale * 100:g}%"
+        ]
+        if srgb:
+            resize = ["--colorconvert", "sRGB", "linear"] + resize + \
+                ["--colorconvert", "linear", "sRGB"]
+        command += resize
+    if bit_depth in _DataTypes:
+        command += ["-d", _DataTypes[bit_depth]]
+    return command + ["-o", destination]
+
+
+def can_use_numpy(source: str, destination: str) -> bool:
+    """
+    :return:
+        NumPy is installed, and the files can be read and written,
+        tifffile handles TIFF only, OpenImageIO handles all.
+    """
+    if SurF.imaging.numpy is None:
+        return False
+    if SurF.imaging.oiio is not None:
+        return True
+    return SurF.imaging.tifffile is not None and all(
+        file.lower().endswith((".tif", ".tiff")) for file in (source, destination)
+    )
+
+
+def get_method(method: str, source: str, destination: str) -> str:
+    """
+    :param method: The configured method.
+    :return:
+        The available method for the files, fallback to oiiotool.
+    """
+    if method in ("auto", "numpy") and can_use_numpy(source, destination):
+        return "numpy"
+    if method in ("auto", "numpy", "oiio") and SurF.imaging.oiio is not None:
+        return "oiio"
+    return "oiiotool"
+
+
+class DeriveJob(ConvertJob):
+    """
+    Resize the exported image and write it by bit-depth,
+    the method, filter, color space, scale and bit-depth are part of signature.
+    """
+    def __init__(
+            self,
+            source: str,
+            destination: str,
+            scale: float,
+            bit_depth: int = 0,
+            tool: str = "oiiotool",
+            filter_name: str = "lanczos",
+            srgb: bool = False,
+            method: str = "auto"
+    ) -> None:
+        self.method: str = get_method(method, source, destination)
+        super().__init__(
+            source,
+            destination,
+            get_derive_command(
+                tool, source, destination, scale, bit_depth, filter_name, srgb
+            ),
+            f"derive|{self.method}|{filter_name}|{int(srgb)}|{scale:g}|{bit_depth}"
+        )
+        self.scale: float = scale
+        self.bit_depth: int = bit_depth
+        self.filter_name: str = filter_name
+        self.srgb: bool = srgb
+
+
+class DeriveBackend(MakeTxBackend):
+    """
+    Derive by the method of job, oiiotool is launched as a process.
+    How to use :
+        pool = ConverterPool(backend=DeriveBackend())
+        batch = pool.submit([DeriveJob(source, destination, 0.25, 8)])
+    """
+    Name: str = "derive"
+
+    def convert(self, job: ConvertJob, batch: ConvertBatch) -> ConvertResult:
+        if not isinstance(job, DeriveJob) or job.method == "oiiotool":
+            return super().convert(job, batch)
+        if job.method == "numpy":
+            return self.convert_numpy(job)
+        return self.convert_oiio(job)
+
+    @staticmethod
+    def convert_numpy(job: DeriveJob) -> ConvertResult:
+        numpy = SurF.imaging.numpy
+        start: float = time.perf_counter()
+        try:
+            image = SurF.imaging.read_image(job.source)
+            dtype = numpy.dtype(_NumpyTypes.get(job.bit_depth, image.dtype.name))
+            if job.scale != 1.0:
+                image = SurF.imaging.resize(
+                    image,
+                    max(1, round(image.shape[1] * job.scale)),
+                    max(1, round(image.shape[0] * job.scale)),
+                    job.filter_name, job.srgb, dtype
+                )
+            elif dtype != image.dtype:
+                image = SurF.imaging.resize(
+                    image, image.shape[1], image.shape[0], dtype=dtype
+                )
+            SurF.imaging.write_image(job.destination, image)
+        except (IOError, OSError, ValueError) as error:
+            return ConvertResult(
+                job.source, job.destination, 1, str(error),
+                time.perf_counter() - start
+            )
+        return ConvertResult(
+            job.source, job.destination, 0, "", time.perf_counter() - start
+        )
+
+    @staticmethod
+    def convert_oiio(job: DeriveJob) -> ConvertResult:
+        oiio = SurF.imaging.oiio
+        start: float = time.perf_counter()
+        image = oiio.ImageBuf(job.source)
+        if job.scale != 1.0:
+            if job.srgb:
+                image = oiio.ImageBufAlgo.colorconvert(image, "sRGB", "linear")
+            spec = image.spec()
+            roi = oiio.ROI(
+                0, max(1, round(spec.width * job.scale)),
+                0, max(1, round(spec.height * job.scale)),
+                0, 1, 0, spec.nchannels
+            )
+            image = oiio.ImageBufAlgo.resize(
+                image, filtername=_OIIOFilters[job.filter_name], roi=roi
+            )
+            if job.srgb:
+                image = oiio.ImageBufAlgo.colorconvert(image, "linear", "sRGB")
+        if job.bit_depth in _DataTypes:
+            image.set_write_format(oiio.TypeDesc(_DataTypes[job.bit_depth]))
+        successful: bool = not image.has_error and image.write(job.destination)
+        return ConvertResult(
+            job.source, job.destination, 0 if successful else 1,
+            "" if successful else (image.geterror() or oiio.geterror()),
+            time.perf_counter() - start
+        )
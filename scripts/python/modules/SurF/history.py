@@ -0,0 +1,323 @@
+#
+# SurF.history
+#   The export history of project in SQLite, kept in the root directory
+#   next to the export and convert directories. One row per job :
+#       export - The file painter exported.
+#       derive - The file derived from the rendered profile.
+#       convert - The converted file, its input is the exported file.
+#   A job records its input, parameters hash, output hash, size, mtime and
+#   duration, indexed by texture set and channel and by output path.
+#   The planner estimates from it, changed only mode re-exports the channels
+#   whose recorded outputs are missing or modified on disk.
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from SurF.convert import hash_file
+from SurF.utils import warn
+import threading
+import sqlite3
+import time
+import os
+
+_Schema: str = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    project TEXT,
+    title TEXT,
+    config TEXT,
+    started REAL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    texture_set TEXT,
+    channel TEXT,
+    profile TEXT,
+    udim INTEGER,
+    input TEXT,
+    input_hash TEXT,
+    output TEXT,
+    output_hash TEXT,
+    params_hash TEXT,
+    bytes INTEGER,
+    mtime REAL,
+    bit_depth TEXT,
+    duration REAL,
+    cached INTEGER DEFAULT 0,
+    return_code INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_channel ON jobs(texture_set, channel, kind);
+CREATE INDEX IF NOT EXISTS jobs_output ON jobs(output);
+CREATE INDEX IF NOT EXISTS jobs_run ON jobs(run_id);
+"""
+
+_Columns: Tuple[str, ...] = (
+    "run_id", "kind", "texture_set", "channel", "profile", "udim", "input",
+    "input_hash", "output", "output_hash", "params_hash", "bytes", "mtime",
+    "bit_depth", "duration", "cached", "return_code"
+)
+
+
+def _stat_file(file: str) -> Tuple[Optional[int], Optional[float], Optional[str]]:
+    """
+    :return:
+        The (size, mtime, content hash) of file, None if not exists.
+    """
+    try:
+        stat: os.stat_result = os.stat(file)
+        return stat.st_size, stat.st_mtime, hash_file(file)
+    except OSError:
+        return None, None, None
+
+
+class ExportHistory(object):
+    """
+    The SQLite history of export and conversion jobs,
+    every call opens its own connection so it can be used from any thread.
+    How to use :
+        history = ExportHistory.get(root_directory)
+        history.add_run(run, records)
+        history.get_runs(20)
+    """
+    FileName: str = ".surf_history.sqlite"
+    # The runs kept, the older runs are deleted with their jobs.
+    KeepRuns: int = 500
+    Histories: Dict[str, "ExportHistory"] = {}
+    HistoriesLock: threading.Lock = threading.Lock()
+
+    def __init__(self, file: str) -> None:
+        self.file: str = file
+        self.ready: bool = False
+        self.lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def get(cls, directory: str) -> "ExportHistory":
+        """
+        :param directory: The project root directory.
+        :return:
+            The shared history of directory.
+        """
+        with cls.HistoriesLock:
+            if directory not in cls.Histories:
+                cls.Histories[directory] = ExportHistory(
+                    os.path.join(directory, ExportHistory.FileName).replace("\\", "/")
+                )
+            return cls.Histories[directory]
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        The connection committed when leaving without error, the schema
+        is created by the first connection.
+        """
+        connection: sqlite3.Connection = sqlite3.connect(self.file, timeout=30)
+        try:
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA foreign_keys = ON")
+            with self.lock:
+                if not self.ready:
+                    connection.execute("PRAGMA journal_mode = WAL")
+                    connection.executescript(_Schema)
+                    self.ready = True
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def add_run(self, run: dict, records: List[dict], workers: int = 4) -> int:
+        """
+        Record the files of one export run, the outputs are hashed in parallel.
+        :param run: The project, title, config, started and finished of run.
+        :param records: The manifest records.
+        :param workers: The hash threads.
+        :return:
+            The run id, 0 if failed to write.
+        """
+        files: List[str] = sorted({
+            file for record in records
+            for file in (record.get("source"), record.get("converted")) if file
+        })
+        stats: Dict[str, Tuple[Optional[int], Optional[float], Optional[str]]] = {}
+        if files:
+            with ThreadPoolExecutor(
+                    min(workers, len(files)), thread_name_prefix="SurF-Hash"
+            ) as executor:
+                stats = dict(zip(files, executor.map(_stat_file, files)))
+        try:
+            with self.connect() as connection:
+                run_id: int = connection.execute(
+                    "INSERT INTO runs (project, title, config, started, finished) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (run.get("project"), run.get("title"), run.get("config"),
+                     run.get("started"), run.get("finished", time.time()))
+                ).lastrowid
+                connection.executemany(
+                    f"INSERT INTO jobs ({', '.join(_Columns)}) "
+                    f"VALUES ({', '.join('?' * len(_Columns))})",
+                    [
+                        tuple(job.get(column) for column in _Columns)
+                        for job in self.get_jobs(run_id, records, stats)
+                    ]
+                )
+                connection.execute(
+                    "DELETE FROM runs WHERE id <= ?", (run_id - ExportHistory.KeepRuns,)
+                )
+            return run_id
+        except sqlite3.Error as sql_error:
+            warn(f"Failed to write export history : {sql_error}")
+            return 0
+
+    @staticmethod
+    def get_jobs(
+            run_id: int,
+            records: List[dict],
+            stats: Dict[str, Tuple[Optional[int], Optional[float], Optional[str]]]
+    ) -> Iterator[dict]:
+        """
+        :return:
+            The export or derive job of each record, and its convert job.
+        """
+        record: dict
+        for record in records:
+            source: str = record["source"]
+            size, mtime, source_hash = stats.get(source, (None, None, None))
+            common: dict = {
+                "run_id": run_id,
+                "texture_set": record.get("texture_set"),
+                "channel": record.get("channel"),
+                "profile": record.get("profile"),
+                "udim": record.get("udim"),
+                "bit_depth": record.get("bit_depth")
+            }
+            yield dict(
+                common,
+                kind="derive" if record.get("derived") else "export",
+                output=source, output_hash=source_hash,
+                params_hash=record.get("params_hash"),
+                bytes=size if size is not None else record.get("source_bytes"),
+                mtime=mtime, duration=record.get("export_duration")
+            )
+            if record.get("convert_duration") is None and not record.get("converted"):
+                continue
+            converted: Optional[str] = record.get("converted")
+            size, mtime, converted_hash = stats.get(converted, (None, None, None)) \
+                if converted else (None, None, None)
+            yield dict(
+                common,
+                kind="convert", input=source, input_hash=source_hash,
+                output=converted, output_hash=converted_hash,
+                params_hash=record.get("convert_params"),
+                bytes=size if size is not None else record.get("converted_bytes"),
+                mtime=mtime, duration=record.get("convert_duration"),
+                cached=int(bool(record.get("convert_cached"))),
+                return_code=0 if converted else 1
+            )
+
+    def get_runs(self, limit: int) -> List[List[dict]]:
+        """
+        :param limit: The count of latest runs.
+        :return:
+            The records of runs in the manifest form, oldest first.
+        """
+        try:
+            with self.connect() as connection:
+                run_ids: List[int] = [row["id"] for row in connection.execute(
+                    "SELECT id FROM runs ORDER BY id DESC LIMIT ?", (limit,)
+                )]
+                runs: Dict[int, Dict[str, dict]] = {run_id: {} for run_id in reversed(run_ids)}
+                row: sqlite3.Row
+                for row in connection.execute(
+                        f"SELECT * FROM jobs WHERE run_id IN ({', '.join('?' * len(run_ids))}) "
+                        f"ORDER BY id", run_ids
+                ):
+                    records: Dict[str, dict] = runs[row["run_id"]]
+                    if row["kind"] != "convert":
+                        records[row["output"]] = {
+                            "texture_set": row["texture_set"],
+                            "profile": row["profile"],
+                            "derived": row["kind"] == "derive",
+                            "channel": row["channel"],
+                            "udim": row["udim"],
+                            "source": row["output"],
+                            "source_bytes": row["bytes"],
+                            "bit_depth": row["bit_depth"],
+                            "export_duration": row["duration"]
+                        }
+                    elif row["input"] in records:
+                        records[row["input"]].update(
+                            converted=row["output"] if row["return_code"] == 0 else None,
+                            converted_bytes=row["bytes"],
+                            convert_duration=row["duration"],
+                            convert_cached=bool(row["cached"])
+                        )
+        except sqlite3.Error as sql_error:
+            warn(f"Failed to read export history : {sql_error}")
+            return []
+        return [list(records.values()) for records in runs.values()]
+
+    def get_channel_jobs(
+            self, texture_set: str, channel: str, kind: str = "export", limit: int = 20
+    ) -> List[sqlite3.Row]:
+        """
+        :param texture_set: The texture set name.
+        :param channel: The channel label.
+        :param kind: "export", "derive" or "convert".
+        :param limit: The count of latest jobs.
+        :return:
+            The latest jobs of channel, newest first.
+        """
+        try:
+            with self.connect() as connection:
+                return connection.execute(
+                    "SELECT * FROM jobs WHERE texture_set = ? AND channel = ? AND kind = ? "
+                    "ORDER BY id DESC LIMIT ?", (texture_set, channel, kind, limit)
+                ).fetchall()
+        except sqlite3.Error as sql_error:
+            warn(f"Failed to read export history : {sql_error}")
+            return []
+
+    def get_outputs(self, texture_set: str, profile: str) -> List[sqlite3.Row]:
+        """
+        :param texture_set: The texture set name.
+        :param profile: The profile name.
+        :return:
+            The latest export job of each output file.
+        """
+        try:
+            with self.connect() as connection:
+                return connection.execute(
+                    "SELECT channel, output, bytes, mtime, MAX(id) FROM jobs "
+                    "WHERE texture_set = ? AND kind = 'export' AND profile = ? "
+                    "GROUP BY output", (texture_set, profile)
+                ).fetchall()
+        except sqlite3.Error as sql_error:
+            warn(f"Failed to read export history : {sql_error}")
+            return []
+
+    def get_stale_outputs(self, texture_set: str, profile: str) -> Dict[str, List[str]]:
+        """
+        :param texture_set: The texture set name.
+        :param profile: The profile name.
+        :return:
+            The recorded outputs missing or modified since exported,
+            keyed by channel label.
+        """
+        stale: Dict[str, List[str]] = {}
+        row: sqlite3.Row
+        for row in self.get_outputs(texture_set, profile):
+            try:
+                stat: os.stat_result = os.stat(row["output"])
+                if stat.st_size == row["bytes"] and stat.st_mtime == row["mtime"]:
+                    continue
+            except OSError:
+                pass
+            stale.setdefault(row["channel"], []).append(row["output"])
+        return stale
@@ -0,0 +1,478 @@
+#
+# SurF.imaging
+#   The NumPy image functions, MIP pyramid and texture detections.
+#   NumPy is required, reading and writing need tifffile or OpenImageIO.
+#   The header reader is pure python, it reads TIFF, PNG and EXR.
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+import functools
+import struct
+import os
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import tifffile
+except ImportError:
+    tifffile = None
+
+try:
+    import OpenImageIO as oiio
+except ImportError:
+    oiio = None
+
+TileSize: int = 64
+
+_TiffExtensions = (".tif", ".tiff", ".tx")
+
+_HeaderSize: int = 65536
+
+
+class ImageHeader(NamedTuple):
+    width: int
+    height: int
+    channels: int
+    channel_bytes: int
+
+    @property
+    def bytes(self) -> int:
+        return self.width * self.height * self.channels * self.channel_bytes
+
+
+def read_header(file: str) -> Optional[ImageHeader]:
+    """
+    Read the resolution and pixel format without decoding the pixels.
+    :param file: The image path.
+    :return:
+        The image header, None if unknown format or broken file.
+    """
+    try:
+        with open(file, "rb") as file_handle:
+            data: bytes = file_handle.read(_HeaderSize)
+            if data[:4] in (b"II*\x00", b"MM\x00*"):
+                return _read_tiff_header(file_handle, data[:2])
+        if data[:8] == b"\x89PNG\r\n\x1a\n":
+            return _read_png_header(data)
+        if data[:4] == b"\x76\x2f\x31\x01":
+            return _read_exr_header(data)
+    except (OSError, struct.error, ValueError, IndexError, KeyError):
+        pass
+    return None
+
+
+def _read_png_header(data: bytes) -> ImageHeader:
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", data[16:26])
+    channels: int = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}[color_type]
+    return ImageHeader(width, height, channels, max(1, bit_depth // 8))
+
+
+def _read_tiff_header(file_handle, byte_order: bytes) -> ImageHeader:
+    order: str = "<" if byte_order == b"II" else ">"
+    file_handle.seek(4)
+    offset: int = struct.unpack(order + "I", file_handle.read(4))[0]
+    file_handle.seek(offset)
+    count: int = struct.unpack(order + "H", file_handle.read(2))[0]
+    entries: bytes = file_handle.read(count * 12)
+    tags: dict = {}
+    index: int
+    for index in range(count):
+        tag, kind, number, value = struct.unpack(
+            order + "HHI4s", entries[index * 12:index * 12 + 12]
+        )
+        # Short (3) is left aligned in value field, long (4) takes all.
+        if kind == 3 and number <= 2:
+            tags[tag] = struct.unpack(order + "H", value[:2])[0]
+        elif kind == 3:
+            file_handle.seek(struct.unpack(order + "I", value)[0])
+            tags[tag] = struct.unpack(order + "H", file_handle.read(2))[0]
+        else:
+            tags[tag] = struct.unpack(order + "I", value)[0]
+    return ImageHeader(
+        tags[256], tags[257], tags.get(277, 1), max(1, tags.get(258, 8) // 8)
+    )
+
+
+def _read_exr_header(data: bytes) -> ImageHeader:
+    position: int = 8
+    channels: int = 0
+    channel_bytes: int = 2
+    width: int = 0
+    height: int = 0
+    while data[position] != 0:
+        name_end: int = data.index(b"\x00", position)
+        type_end: int = data.index(b"\x00", name_end + 1)
+        name: bytes = data[position:name_end]
+        size: int = struct.unpack("<i", data[type_end + 1:type_end + 5])[0]
+        value: bytes = data[type_end + 5:type_end + 5 + size]
+        if name == b"channels":
+            cursor: int = 0
+            while value[cursor] != 0:
+                cursor = value.index(b"\x00", cursor) + 1
+                pixel_type: int = struct.unpack("<i", value[cursor:cursor + 4])[0]
+                channel_bytes = max(channel_bytes, 2 if pixel_type == 1 else 4)
+                channels += 1
+                cursor += 16
+        elif name == b"dataWindow":
+            x_min, y_min, x_max, y_max = struct.unpack("<iiii", value[:16])
+            width, height = x_max - x_min + 1, y_max - y_min + 1
+        position = type_end + 5 + size
+    return ImageHeader(width, height, channels, channel_bytes)
+
+
+def is_available() -> bool:
+    """
+    :return:
+        NumPy and tifffile (or OpenImageIO) are installed.
+    """
+    return numpy is not None and (tifffile is not None or oiio is not None)
+
+
+def read_image(file: str) -> "numpy.ndarray":
+    """
+    :param file: The image path.
+    :return:
+        The pixels in (height, width, channels) with native data type.
+    """
+    if oiio is not None:
+        image_buffer = oiio.ImageBuf(file)
+        if image_buffer.has_error:
+            raise IOError(image_buffer.geterror())
+        pixels = image_buffer.get_pixels(image_buffer.spec().format)
+    elif tifffile is not None and file.lower().endswith(_TiffExtensions):
+        pixels = tifffile.imread(file, key=0)
+    else:
+        raise IOError(f"Can't read image without tifffile or OpenImageIO : {file}")
+    if pixels.ndim == 2:
+        pixels = pixels[..., None]
+    return pixels
+
+
+def write_image(file: str, image: "numpy.ndarray") -> None:
+    """
+    Write one level image (not tiled).
+    :param file: The image path.
+    :param image: The pixels in (height, width, channels).
+    """
+    if oiio is not None:
+        output = oiio.ImageOutput.create(file)
+        if output is None:
+            raise IOError(oiio.geterror())
+        spec = oiio.ImageSpec(
+            image.shape[1], image.shape[0], image.shape[2], _get_type_desc(image)
+        )
+        if not output.open(file, spec):
+            raise IOError(output.geterror())
+        output.write_image(image)
+        output.close()
+    elif tifffile is not None and file.lower().endswith(_TiffExtensions):
+        tifffile.imwrite(
+            file,
+            image if image.shape[2] > 1 else image[..., 0],
+            photometric="rgb" if image.shape[2] >= 3 else "minisblack",
+            planarconfig="contig"
+        )
+    else:
+        raise IOError(f"Can't write image without tifffile or OpenImageIO : {file}")
+
+
+def write_texture(file: str, levels: List["numpy.ndarray"], tile: int = TileSize) -> None:
+    """
+    Write the MIP levels into a tiled TIFF, one directory per level.
+    :param file: The texture path.
+    :param levels: The MIP levels, from the largest.
+    :param tile: The tile size, must be a multiple of 16.
+    """
+    if tifffile is None:
+        raise IOError(f"Can't write tiled texture without tifffile : {file}")
+    temp_file: str = file + f".{os.getpid()}.tmp"
+    with tifffile.TiffWriter(temp_file) as writer:
+        level: "numpy.ndarray"
+        for level in levels:
+            writer.write(
+                level if level.shape[2] > 1 else level[..., 0],
+                tile=(tile, tile),
+                photometric="rgb" if level.shape[2] >= 3 else "minisblack",
+                planarconfig="contig",
+                compression="zlib",
+                description="SurF MIP texture"
+            )
+    os.replace(temp_file, file)
+
+
+def _get_type_desc(image: "numpy.ndarray"):
+    return {
+        "uint8": oiio.UINT8,
+        "uint16": oiio.UINT16,
+        "float16": oiio.HALF,
+        "float32": oiio.FLOAT
+    }.get(image.dtype.name, oiio.FLOAT)
+
+
+def get_maximum(image: "numpy.ndarray") -> float:
+    """
+    :return:
+        The maximum value of data type, 1.0 for float.
+    """
+    if numpy.issubdtype(image.dtype, numpy.integer):
+        return float(numpy.iinfo(image.dtype).max)
+    return 1.0
+
+
+def to_dtype(data: "numpy.ndarray", dtype: "numpy.dtype") -> "numpy.ndarray":
+    """
+    :return:
+        The float data converted to data type, rounded and clipped for integer.
+    """
+    if numpy.issubdtype(dtype, numpy.integer):
+        info = numpy.iinfo(dtype)
+        return numpy.clip(numpy.rint(data), info.min, info.max).astype(dtype)
+    return data.astype(dtype)
+
+
+def has_nan(image: "numpy.ndarray") -> bool:
+    return numpy.issubdtype(image.dtype, numpy.floating) and \
+        bool(numpy.isnan(image).any())
+
+
+def is_constant(image: "numpy.ndarray") -> bool:
+    return bool((image == image[:1, :1]).all())
+
+
+def is_monochrome(image: "numpy.ndarray") -> bool:
+    if image.shape[2] < 3:
+        return False
+    return bool(
+        (image[..., 0] == image[..., 1]).all() and
+        (image[..., 1] == image[..., 2]).all()
+    )
+
+
+def is_opaque(image: "numpy.ndarray") -> bool:
+    if image.shape[2] not in (2, 4):
+        return False
+    return bool((image[..., -1] == get_maximum(image)).all())
+
+
+def reduce_texture(image: "numpy.ndarray", tile: int = TileSize) -> "numpy.ndarray":
+    """
+    The same as maketx's detections :
+        --constant-color-detect : constant image becomes one tile.
+        --opaque-detect : drop the alpha if fully opaque.
+        --monochrome-detect : keep one channel if R = G = B.
+    """
+    if is_constant(image):
+        shape = (
+            min(tile, image.shape[0]), min(tile, image.shape[1]), image.shape[2]
+        )
+        image = numpy.broadcast_to(image[:1, :1], shape).copy()
+    if is_opaque(image):
+        image = image[..., :-1]
+    if is_monochrome(image):
+        channels: List[int] = [0, 3] if image.shape[2] == 4 else [0]
+        image = image[..., channels]
+    return image
+
+
+def decode_srgb(data: "numpy.ndarray") -> "numpy.ndarray":
+    """
+    :param data: The normalized float pixels, modified in place.
+    :return:
+        The color channels decoded from sRGB to linear, alpha is untouched.
+    """
+    color: int = 1 if data.shape[2] in (1, 2) else 3
+    rgb = data[..., :color]
+    data[..., :color] = numpy.where(
+        rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4
+    )
+    return data
+
+
+def encode_srgb(data: "numpy.ndarray") -> "numpy.ndarray":
+    """
+    :param data: The normalized float pixels, modified in place.
+    :return:
+        The color channels encoded from linear to sRGB, alpha is untouched.
+    """
+    color: int = 1 if data.shape[2] in (1, 2) else 3
+    rgb = numpy.clip(data[..., :color], 0.0, None)
+    data[..., :color] = numpy.where(
+        rgb <= 0.0031308, rgb * 12.92, 1.055 * rgb ** (1.0 / 2.4) - 0.055
+    )
+    return data
+
+
+def srgb_to_linear(image: "numpy.ndarray") -> "numpy.ndarray":
+    """
+    Convert the color channels from sRGB to linear, alpha is untouched.
+    """
+    maximum: float = get_maximum(image)
+    data = decode_srgb(image.astype(numpy.float32) / maximum)
+    return to_dtype(data * maximum, image.dtype)
+
+
+def linear_to_srgb(image: "numpy.ndarray") -> "numpy.ndarray":
+    """
+    Convert the color channels from linear to sRGB, alpha is untouched.
+    """
+    maximum: float = get_maximum(image)
+    data = encode_srgb(image.astype(numpy.float32) / maximum)
+    return to_dtype(data * maximum, image.dtype)
+
+
+def half_size(data: "numpy.ndarray") -> "numpy.ndarray":
+    """
+    :param data: The float pixels.
+    :return:
+        The half size pixels by 2x2 box filter, odd edge is repeated.
+    """
+    axis: int
+    for axis in (0, 1):
+        if data.shape[axis] == 1:
+            continue
+        if data.shape[axis] % 2:
+            edge = data[-1:] if axis == 0 else data[:, -1:]
+            data = numpy.concatenate([data, edge], axis=axis)
+        if axis == 0:
+            data = (data[0::2] + data[1::2]) * 0.5
+        else:
+            data = (data[:, 0::2] + data[:, 1::2]) * 0.5
+    return data
+
+
+def build_mips(image: "numpy.ndarray") -> List["numpy.ndarray"]:
+    """
+    :param image: The largest level.
+    :return:
+        The MIP levels until 1x1.
+    """
+    levels: List["numpy.ndarray"] = [image]
+    data = image.astype(numpy.float32)
+    while data.shape[0] > 1 or data.shape[1] > 1:
+        data = half_size(data)
+        levels.append(to_dtype(data, image.dtype))
+    return levels
+
+
+@functools.lru_cache(maxsize=4)
+def _get_decode_table(dtype_name: str) -> "numpy.ndarray":
+    """
+    :return:
+        The normalized linear values of each integer sRGB value.
+    """
+    maximum: int = numpy.iinfo(numpy.dtype(dtype_name)).max
+    table = numpy.arange(maximum + 1, dtype=numpy.float32) / maximum
+    return decode_srgb(table.reshape(-1, 1, 1)).reshape(-1)
+
+
+def _to_float(image: "numpy.ndarray", srgb: bool) -> "numpy.ndarray":
+    """
+    :return:
+        The normalized float pixels, decoded to linear if sRGB,
+        the 8 and 16 bits sRGB are decoded by lookup table.
+    """
+    if srgb and image.dtype.name in ("uint8", "uint16"):
+        table = _get_decode_table(image.dtype.name)
+        data = numpy.empty(image.shape, numpy.float32)
+        color: int = 1 if image.shape[2] in (1, 2) else 3
+        data[..., :color] = table[image[..., :color]]
+        data[..., color:] = image[..., color:] / numpy.float32(get_maximum(image))
+        return data
+    data = image.astype(numpy.float32) / numpy.float32(get_maximum(image))
+    return decode_srgb(data) if srgb else data
+
+
+def _box(distance: "numpy.ndarray") -> "numpy.ndarray":
+    return ((distance >= -0.5) & (distance < 0.5)).astype(numpy.float32)
+
+
+def _lanczos3(distance: "numpy.ndarray") -> "numpy.ndarray":
+    weights = numpy.sinc(distance) * numpy.sinc(distance / 3.0)
+    weights[numpy.abs(distance) >= 3.0] = 0.0
+    return weights.astype(numpy.float32)
+
+
+# The filter kernel and its radius in pixels.
+Filters: Dict[str, Tuple[Callable, float]] = {
+    "box": (_box, 0.5),
+    "lanczos": (_lanczos3, 3.0)
+}
+
+
+@functools.lru_cache(maxsize=64)
+def get_filter_weights(
+        source: int, target: int, filter_name: str
+) -> Tuple["numpy.ndarray", "numpy.ndarray"]:
+    """
+    :param source: The source pixels of one axis.
+    :param target: The target pixels of one axis.
+    :param filter_name: "box" or "lanczos".
+    :return:
+        The (indices, weights) in (target, taps), the kernel is stretched
+        by the reduction, edge pixels are repeated, each row sums to 1.
+        Do not modify the returned arrays, they are cached.
+    """
+    kernel, radius = Filters[filter_name]
+    stretch: float = max(source / target, 1.0)
+    centers = (numpy.arange(target, dtype=numpy.float64) + 0.5) * source / target
+    taps: int = int(numpy.ceil(radius * stretch * 2.0)) + 1
+    first = numpy.floor(centers - radius * stretch).astype(numpy.int64)
+    indices = first[:, None] + numpy.arange(taps)[None, :]
+    weights = kernel((indices + 0.5 - centers[:, None]) / stretch)
+    weights /= numpy.maximum(weights.sum(axis=1, keepdims=True), 1e-8)
+    return numpy.clip(indices, 0, source - 1), weights
+
+
+def _resize_axis(data: "numpy.ndarray", target: int, filter_name: str) -> "numpy.ndarray":
+    """
+    Resize the first axis, the gather and multiply-add are vectorized per tap.
+    """
+    source: int = data.shape[0]
+    if source == target:
+        return data
+    if filter_name == "box" and source % target == 0:
+        return data.reshape((target, source // target) + data.shape[1:]).mean(axis=1)
+    indices, weights = get_filter_weights(source, target, filter_name)
+    result = numpy.zeros((target,) + data.shape[1:], numpy.float32)
+    tap: int
+    for tap in range(indices.shape[1]):
+        result += data[indices[:, tap]] * weights[:, tap, None, None]
+    return result
+
+
+def resize(
+        image: "numpy.ndarray",
+        width: int,
+        height: int,
+        filter_name: str = "lanczos",
+        srgb: bool = False,
+        dtype: Optional["numpy.dtype"] = None
+) -> "numpy.ndarray":
+    """
+    Resize by separable box or Lanczos-3 filter.
+    :param image: The pixels in (height, width, channels).
+    :param width: The target width.
+    :param height: The target height.
+    :param filter_name: "box" or "lanczos".
+    :param srgb: Filter the color channels in linear, then encode back to sRGB.
+    :param dtype: The result data type, default is the image's.
+    :return:
+        The resized pixels, rounded and clipped for integer data type.
+    """
+    dtype = numpy.dtype(dtype or image.dtype)
+    data = _resize_axis(_to_float(image, srgb), height, filter_name)
+    data = _resize_axis(
+        numpy.ascontiguousarray(data.transpose(1, 0, 2)), width, filter_name
+    ).transpose(1, 0, 2)
+    if srgb:
+        data = encode_srgb(numpy.ascontiguousarray(data))
+    maximum: float = float(numpy.iinfo(dtype).max) \
+        if numpy.issubdtype(dtype, numpy.integer) else 1.0
+    return to_dtype(data * maximum, dtype)
@@ -0,0 +1,189 @@
+#
+# SurF.packing
+#   Pack the components of several channels or mesh maps into one file,
+#   such as ORM : ambient occlusion -> R, roughness -> G, metallic -> B.
+#   The packing is declared in config :
+#       "packing" : {
+#           "ORM" : {
+#               "channels" : {
+#                   "R" : "mesh:ambient_occlusion",
+#                   "G" : "roughness",
+#                   "B" : "metallic"
+#               },
+#               "bit_depth" : 8
+#           }
+#       }
+#   The key of "channels" is the destination component : R, G, B, A or L.
+#   The source is a channel label of "maps", or "mesh:" and a mesh map name,
+#   ".R", ".G", ".B", ".A" or ".L" picks the component of source, default is L.
+#   target - "textures" packs in texture export, "meshmaps" in mesh map export.
+#   exclusive - 1 the packed channels are not exported alone, 0 both.
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple, Union
+
+Components: Tuple[str, ...] = ("R", "G", "B", "A", "L")
+Targets: Tuple[str, ...] = ("textures", "meshmaps")
+BitDepths: Tuple[int, ...] = (8, 16, 32)
+
+_MeshPrefix: str = "mesh:"
+
+
+class PackSource(NamedTuple):
+    destination: str
+    # "channel" or "mesh".
+    kind: str
+    name: str
+    component: str
+
+
+def parse_source(destination: str, source: str) -> PackSource:
+    """
+    :param destination: The destination component.
+    :param source: The source, such as "roughness", "basecolor.R" or
+        "mesh:ambient_occlusion".
+    :return:
+        The parsed source.
+    """
+    kind: str = "channel"
+    if source.startswith(_MeshPrefix):
+        kind = "mesh"
+        source = source[len(_MeshPrefix):]
+    name, _, component = source.partition(".")
+    return PackSource(destination, kind, name.lower() if kind == "channel" else name,
+                      component.upper() or "L")
+
+
+class PackedMap(object):
+    """
+    One packed output file.
+    How to use :
+        packed = PackedMap("ORM", {"channels" : {"R" : "ao", "G" : "roughness"}})
+        packed.build(file_name, source_maps)
+    """
+    def __init__(self, name: str, values: dict) -> None:
+        self.name: str = name
+        self.target: str = values.get("target", "textures")
+        self.bit_depth: int = values.get("bit_depth", 8)
+        self.exclusive: bool = bool(values.get("exclusive", 1))
+        self.sources: List[PackSource] = [
+            parse_source(destination, source)
+            for destination, source in values["channels"].items()
+        ]
+
+    def __repr__(self) -> str:
+        return f"PackedMap({self.name!r})"
+
+    @property
+    def label(self) -> str:
+        """
+        The output label, such as the channel label of "maps".
+        """
+        return self.name.lower()
+
+    @property
+    def channel_labels(self) -> Set[str]:
+        """
+        The channel labels packed in this map.
+        """
+        return {source.name for source in self.sources if source.kind == "channel"}
+
+    def get_missing(self, labels: Iterable[str]) -> List[str]:
+        """
+        :param labels: The channel labels of texture set.
+        :return:
+            The packed channel labels not in texture set.
+        """
+        return sorted(self.channel_labels - set(labels))
+
+    def build(
+            self,
+            file_name: str,
+            source_maps: Dict[str, Tuple[str, str]],
+            bit_depth: Union[int, None] = None
+    ) -> dict:
+        """
+        :param file_name: The export name.
+        :param source_maps: The (srcMapType, srcMapName) of channels keyed by label.
+        :param bit_depth: The bit-depth, None is the packed map's.
+        :return:
+            The map description of export preset.
+        """
+        channels: List[dict] = []
+        source: PackSource
+        for source in self.sources:
+            src_map_type, src_map_name = ("meshMap", source.name) \
+                if source.kind == "mesh" else source_maps[source.name]
+            channels.append({
+                "destChannel": source.destination,
+                "srcChannel": source.component,
+                "srcMapType": src_map_type,
+                "srcMapName": src_map_name
+            })
+        return {
+            "fileName": file_name,
+            "channels": channels,
+            "parameters": {"bitDepth": str(bit_depth or self.bit_depth)}
+        }
+
+
+def validate_packing(
+        packing: dict, maps: Dict[str, str], mesh_maps: Iterable[str]
+) -> List[str]:
+    """
+    :param packing: The packing keyed by output name.
+    :param maps: The output names keyed by channel label.
+    :param mesh_maps: The mesh map names.
+    :return:
+        The errors of packing.
+    """
+    if not isinstance(packing, dict):
+        return [f"packing : must be object, got {packing!r}"]
+    errors: List[str] = []
+    mesh_maps = set(mesh_maps)
+    outputs: Set[str] = set(maps.values())
+    name: str
+    for name, values in packing.items():
+        prefix: str = f"packing : {name}"
+        if name in outputs or name.lower() in maps:
+            errors.append(f"{prefix} is already a channel output")
+        if not isinstance(values, dict):
+            errors.append(f"{prefix} must be object, got {values!r}")
+            continue
+        channels = values.get("channels")
+        if not isinstance(channels, dict) or not channels:
+            errors.append(f"{prefix}.channels must be non-empty object")
+            continue
+        destinations: Set[str] = set(channels)
+        if destinations - set(Components):
+            errors.append(f"{prefix}.channels {sorted(destinations - set(Components))} "
+                          f"are not in {list(Components)}")
+        if "L" in destinations and destinations & {"R", "G", "B"}:
+            errors.append(f"{prefix}.channels can't mix L with R, G, B")
+        target: str = values.get("target", "textures")
+        if target not in Targets:
+            errors.append(f"{prefix}.target is not one of {list(Targets)}")
+        if values.get("bit_depth", 8) not in BitDepths:
+            errors.append(f"{prefix}.bit_depth is not one of {list(BitDepths)}")
+        if values.get("exclusive", 1) not in (0, 1):
+            errors.append(f"{prefix}.exclusive must be 0 or 1")
+        destination: str
+        for destination, text in channels.items():
+            if not isinstance(text, str):
+                errors.append(f"{prefix}.{destination} must be str, got {text!r}")
+                continue
+            source: PackSource = parse_source(destination, text)
+            if source.component not in Components:
+                errors.append(f"{prefix}.{destination} component {source.component!r} "
+                              f"is not in {list(Components)}")
+            if source.kind == "mesh" and source.name not in mesh_maps:
+                errors.append(f"{prefix}.{destination} mesh map {source.name!r} is unknown")
+            elif source.kind == "channel" and source.name not in maps:
+                errors.append(f"{prefix}.{destination} channel {source.name!r} is not in maps")
+            elif source.kind == "channel" and target == "meshmaps":
+                errors.append(f"{prefix}.{destination} meshmaps target packs mesh maps only")
+    return errors
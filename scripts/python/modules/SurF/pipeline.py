@@ -0,0 +1,233 @@
+#
+# SurF.pipeline
+#   The staged pipeline engine, stages are linked by bounded queues.
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import Any, Callable, List, Optional
+from SurF.utils import log, err
+import threading
+import traceback
+import queue
+import time
+
+_StopSignal = object()
+
+
+class Stage(object):
+    """
+    A pipeline stage.
+    How to use :
+        stage = Stage("convert", convert_function, concurrency=2)
+    The function takes one item and returns the item for next stage,
+    if it returns None, the item will be dropped.
+    """
+    def __init__(
+            self, name: str, function: Callable[[Any], Any], concurrency: int = 1
+    ) -> None:
+        self.name: str = name
+        self.function: Callable[[Any], Any] = function
+        self.concurrency: int = max(1, int(concurrency))
+        self.count: int = 0
+        self.failed: int = 0
+        self.busy: float = 0.0
+        self.started: float = 0.0
+        self.finished: float = 0.0
+        self.lock: threading.Lock = threading.Lock()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.failed = 0
+        self.busy = 0.0
+        self.started = 0.0
+        self.finished = 0.0
+
+    def process(self, item: Any) -> Any:
+        """
+        Process one item and record the timing.
+        :param item: The item from previous stage.
+        :return:
+            The result for next stage, None if failed or dropped.
+        """
+        start: float = time.perf_counter()
+        result: Any = None
+        failed: bool = False
+        try:
+            result = self.function(item)
+        except Exception as unknown_error:
+            traceback.print_exc()
+            err(f"Stage {self.name} failed : {unknown_error}")
+            failed = True
+        end: float = time.perf_counter()
+        with self.lock:
+            if not self.started:
+                self.started = start
+            self.finished = end
+            self.busy += end - start
+            self.count += 1
+            if failed:
+                self.failed += 1
+        return result
+
+    @property
+    def wall(self) -> float:
+        return self.finished - self.started if self.started else 0.0
+
+
+class Pipeline(object):
+    """
+    Run the items through stages.
+    The first stage runs in the caller thread (painter's API must be called
+    from main thread), the other stages run in worker threads with its own
+    concurrency, every stage is linked by a bounded queue, so the first stage
+    will wait if the next stage is busy.
+    How to use :
+        pipeline = Pipeline([
+            Stage("export", export),
+            Stage("convert", convert, 2)
+        ], queue_size=2)
+        results = pipeline.run(items)
+        pipeline.report()
+    Or feed the items one by one without blocking the caller :
+        pipeline.start()
+        if not pipeline.is_full():
+            pipeline.submit(item)
+        results = pipeline.close()
+    """
+    def __init__(self, stages: List[Stage], queue_size: int = 2) -> None:
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages: List[Stage] = stages
+        self.queue_size: int = max(1, int(queue_size))
+        self.results: List[Any] = []
+        self.elapsed: float = 0.0
+        self.cancelled: threading.Event = threading.Event()
+        self._started: float = 0.0
+        self._queues: List[queue.Queue] = []
+        self._workers: List[List[threading.Thread]] = []
+        self._lock: threading.Lock = threading.Lock()
+
+    def _work(
+            self, stage: Stage, inbox: queue.Queue, outbox: Optional[queue.Queue]
+    ) -> None:
+        while True:
+            item: Any = inbox.get()
+            if item is _StopSignal:
+                break
+            if self.cancelled.is_set():
+                continue
+            result: Any = stage.process(item)
+            if result is None:
+                continue
+            if outbox is None:
+                with self._lock:
+                    self.results.append(result)
+            else:
+                outbox.put(result)
+
+    def start(self) -> None:
+        """
+        Start the worker threads of stages.
+        """
+        self._started = time.perf_counter()
+        self.results = []
+        self.cancelled.clear()
+        stage: Stage
+        for stage in self.stages:
+            stage.reset()
+        tails: List[Stage] = self.stages[1:]
+        self._queues = [queue.Queue(self.queue_size) for _ in tails]
+        self._workers = []
+        index: int
+        for index, stage in enumerate(tails):
+            outbox: Optional[queue.Queue] = \
+                self._queues[index + 1] if index + 1 < len(self._queues) else None
+            threads: List[threading.Thread] = [
+                threading.Thread(
+                    target=self._work,
+                    args=(stage, self._queues[index], outbox),
+                    name=f"SurF-{stage.name}-{number}",
+                    daemon=True
+                ) for number in range(stage.concurrency)
+            ]
+            for thread in threads:
+                thread.start()
+            self._workers.append(threads)
+
+    def is_full(self) -> bool:
+        """
+        :return:
+            If the queue of second stage is full, submit will be blocked.
+        """
+        return bool(self._queues) and self._queues[0].full()
+
+    def submit(self, item: Any) -> None:
+        """
+        Process the item by first stage in caller thread,
+        and put the result into next stage.
+        :param item: The item feed into first stage.
+        """
+        if self.cancelled.is_set():
+            return
+        result: Any = self.stages[0].process(item)
+        if result is None:
+            return
+        if self._queues:
+            self._queues[0].put(result)
+        else:
+            with self._lock:
+                self.results.append(result)
+
+    def close(self) -> List[Any]:
+        """
+        Wait all stages finished.
+        :return:
+            The results of last stage.
+        """
+        # Stop stages one by one, so every queued item will be done.
+        index: int
+        threads: List[threading.Thread]
+        for index, threads in enumerate(self._workers):
+            for _ in threads:
+                self._queues[index].put(_StopSignal)
+            for thread in threads:
+                thread.join()
+        self._workers = []
+        self.elapsed = time.perf_counter() - self._started
+        return self.results
+
+    def cancel(self) -> None:
+        """
+        The queued items will be dropped, the running items will be finished.
+        """
+        self.cancelled.set()
+
+    def run(self, items: List[Any]) -> List[Any]:
+        """
+        :param items: The items feed into first stage.
+        :return:
+            The results of last stage.
+        """
+        self.start()
+        try:
+            for item in items:
+                self.submit(item)
+        finally:
+            self.close()
+        return self.results
+
+    def report(self) -> None:
+        """
+        Log the timing of every stage.
+        """
+        stage: Stage
+        for stage in self.stages:
+            log(
+                f"Stage {stage.name} : {stage.count} items, "
+                f"{stage.failed} failed, busy {stage.busy:.2f}s, "
+                f"wall {stage.wall:.2f}s, concurrency {stage.concurrency}"
+            )
+        log(f"Pipeline finished : {self.elapsed:.2f}s")
@@ -0,0 +1,404 @@
+#
+# SurF.plan
+#   The dry-run export plan, the planned files with estimated bytes and
+#   seconds, the status of existing outputs and the free disk space.
+#   The estimates come from the export history or the manifests of past runs :
+#       The same output path - Its recorded bytes and durations.
+#       Otherwise - The uncompressed size, and the export and convert
+#                   throughput of past runs.
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from SurF.utils import warn
+import shutil
+import glob
+import json
+import os
+
+# The MIP pyramid adds a third of the largest level.
+MipFactor: float = 4.0 / 3.0
+
+_MipFormats: Tuple[str, ...] = ("tx", "tex", "dds", "ktx")
+
+
+def estimate_bytes(
+        width: int, height: int, channels: int, bit_depth: int, file_format: str
+) -> int:
+    """
+    :return:
+        The uncompressed bytes of image, with MIP levels for texture formats.
+    """
+    size: float = width * height * channels * max(1, bit_depth // 8)
+    if file_format.lower() in _MipFormats:
+        size *= MipFactor
+    return int(size)
+
+
+class PlanItem(object):
+    """
+    One planned output file.
+    """
+    def __init__(
+            self,
+            texture_set: str,
+            profile: str,
+            channel: str,
+            udim: Optional[int],
+            file: str,
+            kind: str,
+            width: int,
+            height: int,
+            channels: int,
+            bit_depth: int,
+            source: str = ""
+    ) -> None:
+        self.texture_set: str = texture_set
+        self.profile: str = profile
+        self.channel: str = channel
+        self.udim: Optional[int] = udim
+        self.file: str = file
+        # "export", "derive" or "convert".
+        self.kind: str = kind
+        self.width: int = width
+        self.height: int = height
+        self.channels: int = channels
+        self.bit_depth: int = bit_depth
+        self.source: str = source
+        # Painter reports the channel changed since last export.
+        self.dirty: bool = True
+        # "new", "changed" or "unchanged" against the file on disk.
+        self.status: str = ""
+        self.existing_bytes: Optional[int] = None
+        self.bytes: int = 0
+        self.seconds: Optional[float] = None
+
+    @property
+    def format(self) -> str:
+        return os.path.splitext(self.file)[1][1:].lower()
+
+    @property
+    def growth(self) -> int:
+        """
+        :return:
+            The bytes added to disk, the existing file is overwritten.
+        """
+        return max(0, self.bytes - (self.existing_bytes or 0))
+
+    def to_dict(self) -> dict:
+        return {
+            "texture_set": self.texture_set,
+            "profile": self.profile,
+            "channel": self.channel,
+            "udim": self.udim,
+            "file": self.file,
+            "kind": self.kind,
+            "source": self.source,
+            "resolution": [self.width, self.height],
+            "channels": self.channels,
+            "bit_depth": self.bit_depth,
+            "status": self.status,
+            "existing_bytes": self.existing_bytes,
+            "estimated_bytes": self.bytes,
+            "estimated_seconds": self.seconds
+        }
+
+
+class RunHistory(object):
+    """
+    The file records of past runs read from the manifests,
+    the latest record of each file wins.
+    How to use :
+        history = RunHistory.load(manifest_directory)
+        history.get_bytes(file)
+    """
+    Limit: int = 20
+
+    def __init__(self) -> None:
+        self.files: Dict[str, dict] = {}
+        self.export_seconds: Dict[str, float] = {}
+        self.export_rate: float = 0.0
+        self.convert_rate: float = 0.0
+
+    @classmethod
+    def load(cls, directory: str, limit: int = 0) -> "RunHistory":
+        """
+        :param directory: The manifest directory.
+        :param limit: The count of latest manifests, 0 is RunHistory.Limit.
+        :return:
+            The history, empty if no manifest.
+        """
+        history: RunHistory = cls()
+        manifests: List[str] = sorted(
+            glob.glob(os.path.join(directory, "*.json")), key=os.path.getmtime
+        )[-(limit or cls.Limit):] if directory else []
+        manifest: str
+        for manifest in manifests:
+            try:
+                with open(manifest, "r") as file_handle:
+                    history.add(json.load(file_handle).get("records", []))
+            except (OSError, ValueError, AttributeError) as error:
+                warn(f"Failed to read manifest {manifest} : {error}")
+        return history
+
+    @classmethod
+    def from_runs(cls, runs: Iterable[List[dict]]) -> "RunHistory":
+        """
+        :param runs: The records of each run in the manifest form, oldest first,
+            such as the runs of export history.
+        :return:
+            The history of runs.
+        """
+        history: RunHistory = cls()
+        records: List[dict]
+        for records in runs:
+            history.add(records)
+        return history
+
+    def add(self, records: List[dict]) -> None:
+        """
+        :param records: The records of one manifest, the files of a texture
+            set exported by the same painter call share the export duration.
+        """
+        exported: Dict[Tuple[Optional[str], float], List[dict]] = {}
+        record: dict
+        for record in records:
+            if record.get("source"):
+                self.files[record["source"]] = record
+            converted: Optional[str] = record.get("converted")
+            if converted:
+                self.files[converted] = dict(record, source_bytes=record.get("converted_bytes"))
+            if record.get("export_duration") and not record.get("derived"):
+                exported.setdefault(
+                    (record.get("texture_set"), record["export_duration"]), []
+                ).append(record)
+        duration: float
+        for (_, duration), exported_records in exported.items():
+            for record in exported_records:
+                self.export_seconds[record["source"]] = duration / len(exported_records)
+        self.update_rates()
+
+    def update_rates(self) -> None:
+        """
+        The export and convert throughput (bytes per second).
+        """
+        exported_bytes: int = 0
+        export_seconds: float = 0.0
+        converted_bytes: int = 0
+        convert_seconds: float = 0.0
+        file: str
+        record: dict
+        for file, record in self.files.items():
+            if not record.get("source_bytes"):
+                continue
+            if file in self.export_seconds:
+                exported_bytes += record["source_bytes"]
+                export_seconds += self.export_seconds[file]
+            if file == record.get("source") and record.get("convert_duration") \
+                    and not record.get("convert_cached"):
+                converted_bytes += record["source_bytes"]
+                convert_seconds += record["convert_duration"]
+        self.export_rate = exported_bytes / export_seconds if export_seconds else 0.0
+        self.convert_rate = converted_bytes / convert_seconds if convert_seconds else 0.0
+
+    def get_bytes(self, file: str) -> Optional[int]:
+        record: Optional[dict] = self.files.get(file)
+        return record.get("source_bytes") if record is not None else None
+
+    def get_export_seconds(self, file: str, size: int) -> Optional[float]:
+        """
+        :param file: The exported file.
+        :param size: The estimated bytes of file.
+        :return:
+            The recorded share of painter export, or estimated by throughput,
+            None if unknown.
+        """
+        if file in self.export_seconds:
+            return self.export_seconds[file]
+        return size / self.export_rate if self.export_rate else None
+
+    def get_convert_seconds(self, source: str, size: int) -> Optional[float]:
+        """
+        :param source: The converted source file.
+        :param size: The estimated bytes of source.
+        :return:
+            The recorded duration, or estimated by throughput, None if unknown.
+        """
+        record: Optional[dict] = self.files.get(source)
+        if record is not None and record.get("source") == source \
+                and record.get("convert_duration") and not record.get("convert_cached"):
+            return record["convert_duration"]
+        return size / self.convert_rate if self.convert_rate else None
+
+
+def stat_files(files: Iterable[str], workers: int = 16) -> Dict[str, Optional[int]]:
+    """
+    Stat the files in parallel, the network drives respond slowly one by one.
+    :param files: The file paths.
+    :param workers: The stat threads.
+    :return:
+        The file sizes keyed by path, None if not exists.
+    """
+    def get_size(file: str) -> Optional[int]:
+        try:
+            return os.stat(file).st_size
+        except OSError:
+            return None
+
+    unique: List[str] = sorted(set(files))
+    if not unique:
+        return {}
+    with ThreadPoolExecutor(min(workers, len(unique)), thread_name_prefix="SurF-Stat") as executor:
+        return dict(zip(unique, executor.map(get_size, unique)))
+
+
+def _get_existing_directory(path: str) -> str:
+    path = os.path.abspath(path)
+    while not os.path.isdir(path):
+        parent: str = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def check_disk_space(needed: Dict[str, int]) -> List[Tuple[str, int, int]]:
+    """
+    :param needed: The bytes to write keyed by file path.
+    :return:
+        The (directory, needed bytes, free bytes) of each volume,
+        the directory is the first existing one found of the volume.
+    """
+    volumes: Dict[int, List] = {}
+    file: str
+    size: int
+    for file, size in needed.items():
+        directory: str = _get_existing_directory(os.path.dirname(file))
+        try:
+            device: int = os.stat(directory).st_dev
+        except OSError:
+            continue
+        volume: List = volumes.setdefault(device, [directory, 0])
+        volume[1] += size
+    spaces: List[Tuple[str, int, int]] = []
+    directory: str
+    for directory, size in volumes.values():
+        try:
+            free: int = shutil.disk_usage(directory).free
+        except OSError:
+            continue
+        spaces.append((directory, size, free))
+    return spaces
+
+
+class ExportPlan(object):
+    """
+    The planned files of an export run, resolved against the disk and
+    the run history without exporting anything.
+    How to use :
+        plan = ExportPlan(title)
+        plan.add(PlanItem(...))
+        plan.resolve(RunHistory.load(manifest_directory))
+        plan.write(plan_file)
+    """
+    def __init__(self, title: str) -> None:
+        self.title: str = title
+        self.items: List[PlanItem] = []
+        self.spaces: List[Tuple[str, int, int]] = []
+
+    def add(self, item: PlanItem) -> PlanItem:
+        self.items.append(item)
+        return item
+
+    def resolve(self, history: RunHistory) -> None:
+        """
+        Stat the existing outputs, then estimate bytes, seconds and disk space.
+        :param history: The past runs.
+        """
+        sizes: Dict[str, Optional[int]] = stat_files(item.file for item in self.items)
+        dirty: Dict[str, bool] = {item.file: item.dirty for item in self.items}
+        item: PlanItem
+        for item in self.items:
+            item.existing_bytes = sizes.get(item.file)
+            # The derived and converted files change with their source.
+            item.dirty = dirty.get(item.source, item.dirty)
+            if item.existing_bytes is None:
+                item.status = "new"
+            else:
+                item.status = "changed" if item.dirty else "unchanged"
+            recorded: Optional[int] = history.get_bytes(item.file)
+            if recorded is not None:
+                item.bytes = recorded
+            elif item.existing_bytes is not None:
+                item.bytes = item.existing_bytes
+            else:
+                item.bytes = estimate_bytes(
+                    item.width, item.height, item.channels, item.bit_depth, item.format
+                )
+        estimated: Dict[str, int] = {item.file: item.bytes for item in self.items}
+        for item in self.items:
+            if item.kind == "export":
+                item.seconds = history.get_export_seconds(item.file, item.bytes)
+            elif item.kind == "convert":
+                item.seconds = history.get_convert_seconds(
+                    item.source, estimated.get(item.source, item.bytes)
+                )
+        self.spaces = check_disk_space({item.file: item.growth for item in self.items})
+
+    def get_totals(self) -> dict:
+        """
+        :return:
+            The file counts by status, bytes and seconds of the plan.
+        """
+        counts: Dict[str, int] = {"new": 0, "changed": 0, "unchanged": 0}
+        item: PlanItem
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return {
+            "files": len(self.items),
+            "status": counts,
+            "bytes": sum(item.bytes for item in self.items),
+            "growth": sum(item.growth for item in self.items),
+            "seconds": sum(item.seconds or 0.0 for item in self.items),
+            "unknown_seconds": sum(1 for item in self.items if item.seconds is None)
+        }
+
+    def get_warnings(self) -> List[str]:
+        """
+        :return:
+            The volumes without enough free space.
+        """
+        return [
+            f"Not enough space on {directory} : "
+            f"needs {format_bytes(needed)}, free {format_bytes(free)}"
+            for directory, needed, free in self.spaces if needed > free
+        ]
+
+    def to_dict(self) -> dict:
+        return {
+            "title": self.title,
+            "totals": self.get_totals(),
+            "disk": [
+                {"directory": directory, "needed_bytes": needed, "free_bytes": free}
+                for directory, needed, free in self.spaces
+            ],
+            "warnings": self.get_warnings(),
+            "items": [item.to_dict() for item in self.items]
+        }
+
+    def write(self, file: str) -> None:
+        with open(file, "w") as file_handle:
+            json.dump(self.to_dict(), file_handle, indent=4)
+
+
+def format_bytes(size: float) -> str:
+    unit: str
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
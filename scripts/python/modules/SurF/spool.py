@@ -0,0 +1,489 @@
+#
+# SurF.spool
+#   The spool directory conversion queue, the jobs are converted by workers
+#   on any machine which can access the spool directory.
+#   Spool directory :
+#       pending/ - The job records waiting for workers.
+#       claimed/ - The job records claimed by workers (renamed from pending).
+#       done/ - The result records written by workers.
+#   The submitter waiting the batch reads and removes its done records,
+#   the detached (not waited) done records are collected into convert cache
+#   by the next submit, the workers remove the done records nobody collected.
+#   Worker :
+#       python -m SurF.spool --spool //server/spool --workers 4 --converter maketx
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import Callable, Dict, List, Optional, Tuple
+from SurF.convert import ConvertBatch, ConvertCache, ConvertJob, ConvertResult
+from SurF.convert import estimate_memory, get_backend, ConverterBackend
+from SurF.utils import log, warn, err
+from SurF.trace import traced
+import argparse
+import threading
+import socket
+import uuid
+import json
+import time
+import os
+
+PollInterval: float = 0.5
+StaleTimeout: float = 300.0
+# The done records older than it are removed by workers.
+DoneTimeout: float = 86400.0
+CleanInterval: float = 60.0
+
+_Pending: str = "pending"
+_Claimed: str = "claimed"
+_Done: str = "done"
+
+
+def _write_record(file: str, record: dict) -> None:
+    temp_file: str = f"{file}.{os.getpid()}.tmp"
+    with open(temp_file, "w") as file_handle:
+        json.dump(record, file_handle, indent=4)
+    os.replace(temp_file, file)
+
+
+def _read_record(file: str) -> Optional[dict]:
+    try:
+        with open(file, "r") as file_handle:
+            return json.load(file_handle)
+    except (OSError, ValueError):
+        return None
+
+
+class SpoolQueue(object):
+    """
+    Submit the convert jobs into spool directory, it works like ConverterPool.
+    How to use :
+        queue = SpoolQueue("//server/spool")
+        batch = queue.submit([ConvertJob(source, destination, command)])
+        results = batch.wait(callback)
+    The detached queue doesn't wait its batches, the results are collected
+    into convert cache by the next submit.
+    """
+    def __init__(self, directory: str, detached: bool = False) -> None:
+        self.name: str = "spool"
+        self.directory: str = directory
+        self.detached: bool = detached
+        for folder in (_Pending, _Claimed, _Done):
+            os.makedirs(os.path.join(directory, folder), exist_ok=True)
+
+    def collect(self) -> int:
+        """
+        Store the successful detached results into their convert cache,
+        and remove the detached done records.
+        :return:
+            The count of collected records.
+        """
+        done_directory: str = os.path.join(self.directory, _Done)
+        try:
+            names: List[str] = [
+                name for name in os.listdir(done_directory) if name.endswith(".json")
+            ]
+        except OSError:
+            return 0
+        caches: Dict[str, ConvertCache] = {}
+        collected: int = 0
+        name: str
+        for name in names:
+            done_file: str = os.path.join(done_directory, name)
+            record: Optional[dict] = _read_record(done_file)
+            if record is None or not record.get("detached"):
+                continue
+            try:
+                os.remove(done_file)
+            except OSError:
+                # Collected by another submitter.
+                continue
+            collected += 1
+            if record.get("return_code") == 0 and record.get("cache_key") \
+                    and record.get("cache_directory"):
+                cache: ConvertCache = ConvertCache.get(record["cache_directory"])
+                cache.store(record["destination"], record["cache_key"], record.get("duration", 0.0))
+                caches[cache.directory] = cache
+        for cache in caches.values():
+            cache.save()
+        return collected
+
+    @traced("SpoolQueue.submit", "convert")
+    def submit(
+            self, jobs: List[ConvertJob], cache: Optional[ConvertCache] = None
+    ) -> "SpoolBatch":
+        """
+        :param jobs: The convert jobs.
+        :param cache: The convert cache, the cached jobs are not spooled.
+        :return:
+            The batch of spooled jobs.
+        """
+        self.collect()
+        batch: SpoolBatch = SpoolBatch(self, cache)
+        submitter: str = f"{socket.gethostname()}:{os.getpid()}"
+        job: ConvertJob
+        for job in jobs:
+            key: str = ""
+            if cache is not None:
+                try:
+                    key = ConvertCache.get_key(job.source, job.signature)
+                except OSError as os_error:
+                    batch.results.append(
+                        ConvertResult(job.source, job.destination, -1, str(os_error))
+                    )
+                    continue
+                saved: Optional[float] = cache.lookup(job.destination, key)
+                if saved is not None:
+                    batch.results.append(ConvertResult(
+                        job.source, job.destination, 0, "", cached=True, saved=saved
+                    ))
+                    continue
+            memory: int = estimate_memory(job.source)
+            # The larger job sorts first by name, workers take it first.
+            megabytes: int = min(memory // 1024 ** 2, 99999999)
+            name: str = f"{megabytes:08d}_{uuid.uuid4().hex}.json"
+            _write_record(os.path.join(self.directory, _Pending, name), {
+                "source": job.source,
+                "destination": job.destination,
+                "command": job.command,
+                "signature": job.signature,
+                "color_convert": job.color_convert,
+                "memory": memory,
+                "submitter": submitter,
+                "submitted": time.time(),
+                "detached": self.detached,
+                "cache_key": key,
+                "cache_directory": cache.directory if cache is not None else ""
+            })
+            batch.jobs[name] = (job, key)
+        return batch
+
+
+class SpoolBatch(object):
+    """
+    The jobs spooled together, it can be waited or cancelled like ConvertBatch.
+    """
+    def __init__(self, queue: SpoolQueue, cache: Optional[ConvertCache]) -> None:
+        self.queue: SpoolQueue = queue
+        self.cache: Optional[ConvertCache] = cache
+        self.jobs: Dict[str, Tuple[ConvertJob, str]] = {}
+        self.results: List[ConvertResult] = []
+        self.cancelled: bool = False
+
+    def cancel(self) -> None:
+        """
+        Remove the pending jobs, the claimed jobs will be finished by workers.
+        """
+        self.cancelled = True
+        name: str
+        for name in list(self.jobs):
+            try:
+                os.remove(os.path.join(self.queue.directory, _Pending, name))
+            except OSError:
+                continue
+
+    def wait(
+            self,
+            callback: Optional[Callable[[ConvertResult], None]] = None,
+            timeout: float = 0.0
+    ) -> List[ConvertResult]:
+        """
+        :param callback: Called with each result as soon as it found.
+        :param timeout: Stop waiting after seconds, 0 is no timeout.
+        :return:
+            The results of finished jobs.
+        """
+        result: ConvertResult
+        if callback is not None:
+            for result in self.results:
+                callback(result)
+        start: float = time.monotonic()
+        done_directory: str = os.path.join(self.queue.directory, _Done)
+        while self.jobs and not self.cancelled:
+            if timeout and time.monotonic() - start > timeout:
+                warn(f"Spool wait timeout : {len(self.jobs)} jobs left.")
+                break
+            name: str
+            for name in list(self.jobs):
+                done_file: str = os.path.join(done_directory, name)
+                record: Optional[dict] = _read_record(done_file)
+                if record is None:
+                    continue
+                job, key = self.jobs.pop(name)
+                result = ConvertResult(
+                    job.source, job.destination, record["return_code"],
+                    record.get("stderr", ""), record.get("duration", 0.0)
+                )
+                if self.cache is not None and result.successful:
+                    self.cache.store(job.destination, key, result.duration)
+                try:
+                    os.remove(done_file)
+                except OSError:
+                    pass
+                self.results.append(result)
+                if callback is not None:
+                    callback(result)
+            if self.jobs:
+                time.sleep(PollInterval)
+        return self.results
+
+
+class SpoolWorker(object):
+    """
+    Claim the spooled jobs by renaming pending record into claimed directory,
+    the rename is atomic, so one job can only be claimed by one worker.
+    The claimed record is stamped by a claim token, the worker writes the
+    result and removes the claimed record only if it still owns the token.
+    The claimed records are touched as heartbeat, a claimed record without
+    heartbeat longer than stale timeout is moved back to pending.
+    How to use :
+        SpoolWorker("//server/spool", workers=4).run()
+    """
+    def __init__(
+            self,
+            directory: str,
+            workers: int = 1,
+            converter: str = "",
+            backend: Optional[ConverterBackend] = None,
+            stale_timeout: float = StaleTimeout
+    ) -> None:
+        self.directory: str = directory
+        self.workers: int = max(1, workers)
+        self.converter: str = converter
+        self.backend: ConverterBackend = backend or get_backend("maketx")
+        self.stale_timeout: float = stale_timeout
+        self.name: str = f"{socket.gethostname()}:{os.getpid()}"
+        # The claim tokens keyed by claimed record name.
+        self.claimed: Dict[str, str] = {}
+        self.cleaned: float = 0.0
+        self.lock: threading.Lock = threading.Lock()
+        self.stopped: threading.Event = threading.Event()
+        for folder in (_Pending, _Claimed, _Done):
+            os.makedirs(os.path.join(directory, folder), exist_ok=True)
+
+    def get_path(self, folder: str, name: str) -> str:
+        return os.path.join(self.directory, folder, name)
+
+    def claim(self) -> Optional[str]:
+        """
+        :return:
+            The claimed record name, None if no pending job.
+        """
+        try:
+            names: List[str] = sorted(
+                (
+                    name for name in os.listdir(os.path.join(self.directory, _Pending))
+                    if name.endswith(".json")
+                ),
+                reverse=True
+            )
+        except OSError:
+            return None
+        name: str
+        for name in names:
+            pending_file: str = self.get_path(_Pending, name)
+            claimed_file: str = self.get_path(_Claimed, name)
+            try:
+                # The rename keeps mtime, touch it first, or a job waited
+                # longer than stale timeout is recovered right after claimed.
+                os.utime(pending_file)
+                os.rename(pending_file, claimed_file)
+            except OSError:
+                # Claimed by another worker or cancelled.
+                continue
+            token: str = uuid.uuid4().hex
+            record: Optional[dict] = _read_record(claimed_file)
+            try:
+                if record is not None:
+                    record["claim"] = token
+                    record["worker"] = self.name
+                    _write_record(claimed_file, record)
+            except OSError:
+                continue
+            with self.lock:
+                self.claimed[name] = token
+            return name
+        return None
+
+    def is_owned(self, name: str, token: str) -> bool:
+        """
+        :return:
+            The claimed record is still claimed by the token,
+            it's not recovered and claimed by another worker.
+        """
+        record: Optional[dict] = _read_record(self.get_path(_Claimed, name))
+        return record is not None and record.get("claim") == token
+
+    def clean_done(self) -> int:
+        """
+        Remove the done records older than DoneTimeout,
+        their submitter is gone or never waited, once per CleanInterval.
+        :return:
+            The count of removed records.
+        """
+        removed: int = 0
+        now: float = time.time()
+        with self.lock:
+            if now - self.cleaned < CleanInterval:
+                return 0
+            self.cleaned = now
+        done_directory: str = os.path.join(self.directory, _Done)
+        try:
+            names: List[str] = os.listdir(done_directory)
+        except OSError:
+            return 0
+        name: str
+        for name in names:
+            done_file: str = os.path.join(done_directory, name)
+            try:
+                if now - os.path.getmtime(done_file) < DoneTimeout:
+                    continue
+                os.remove(done_file)
+            except OSError:
+                continue
+            removed += 1
+        return removed
+
+    def recover_stale(self) -> int:
+        """
+        Move the stale claimed records back to pending.
+        :return:
+            The count of recovered records.
+        """
+        recovered: int = 0
+        now: float = time.time()
+        try:
+            names: List[str] = os.listdir(os.path.join(self.directory, _Claimed))
+        except OSError:
+            return 0
+        name: str
+        for name in names:
+            with self.lock:
+                if name in self.claimed:
+                    continue
+            claimed_file: str = self.get_path(_Claimed, name)
+            try:
+                if now - os.path.getmtime(claimed_file) < self.stale_timeout:
+                    continue
+                os.rename(claimed_file, self.get_path(_Pending, name))
+            except OSError:
+                continue
+            warn(f"Recovered stale job : {name}")
+            recovered += 1
+        return recovered
+
+    def heartbeat(self) -> None:
+        while not self.stopped.wait(min(self.stale_timeout / 4, 30.0)):
+            with self.lock:
+                names: List[str] = list(self.claimed)
+            for name in names:
+                try:
+                    os.utime(self.get_path(_Claimed, name))
+                except OSError:
+                    continue
+
+    def process(self, name: str) -> None:
+        """
+        Convert the claimed job and write the result record.
+        """
+        claimed_file: str = self.get_path(_Claimed, name)
+        with self.lock:
+            token: str = self.claimed.get(name, "")
+        record: Optional[dict] = _read_record(claimed_file)
+        if record is None:
+            result: ConvertResult = ConvertResult("", "", -1, "Broken job record")
+        else:
+            command: List[str] = list(record["command"])
+            if self.converter and command:
+                command[0] = self.converter
+            color_convert = record.get("color_convert")
+            job: ConvertJob = ConvertJob(
+                record["source"], record["destination"], command,
+                record.get("signature", ""),
+                tuple(color_convert) if color_convert else None
+            )
+            os.makedirs(os.path.dirname(job.destination) or ".", exist_ok=True)
+            try:
+                result = self.backend.convert(job, ConvertBatch())
+            except Exception as unknown_error:
+                result = ConvertResult(job.source, job.destination, -1, str(unknown_error))
+        done: dict = result.to_dict()
+        done["worker"] = self.name
+        if record is not None:
+            done.update({
+                key: record.get(key)
+                for key in ("submitter", "detached", "cache_key", "cache_directory")
+            })
+        owned: bool = record is None or self.is_owned(name, token)
+        with self.lock:
+            self.claimed.pop(name, None)
+        if not owned:
+            # Recovered and claimed by another worker, it writes the result.
+            warn(f"Claim taken over, result dropped : {name}")
+            return
+        _write_record(self.get_path(_Done, name), done)
+        try:
+            os.remove(claimed_file)
+        except OSError:
+            pass
+        if result.successful:
+            log(f"Converted : {result.source} ({result.duration:.2f}s)")
+        else:
+            err(f"Failed to convert : {result.source}\n{result.stderr}")
+
+    def work(self, once: bool) -> None:
+        while not self.stopped.is_set():
+            name: Optional[str] = self.claim()
+            if name is not None:
+                self.process(name)
+                continue
+            if self.recover_stale():
+                continue
+            self.clean_done()
+            if once:
+                break
+            time.sleep(PollInterval)
+
+    def run(self, once: bool = False) -> None:
+        """
+        :param once: Exit when no pending job, otherwise run until interrupted.
+        """
+        log(f"Spool worker {self.name} : {self.directory}, {self.workers} workers")
+        heartbeat: threading.Thread = threading.Thread(target=self.heartbeat, daemon=True)
+        heartbeat.start()
+        threads: List[threading.Thread] = [
+            threading.Thread(target=self.work, args=(once,), daemon=True)
+            for _ in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(PollInterval)
+        except KeyboardInterrupt:
+            log("Spool worker stopping, the running jobs will be recovered.")
+        finally:
+            self.stopped.set()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SurF spool conversion worker.")
+    parser.add_argument("--spool", required=True, help="The spool directory.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--converter", default="", help="Override the converter path.")
+    parser.add_argument("--backend", default="maketx", help="The converter backend.")
+    parser.add_argument("--stale", type=float, default=StaleTimeout,
+                        help="Seconds without heartbeat to recover a claimed job.")
+    parser.add_argument("--once", action="store_true", help="Exit when no pending job.")
+    arguments = parser.parse_args()
+    SpoolWorker(
+        arguments.spool, arguments.workers, arguments.converter,
+        get_backend(arguments.backend), arguments.stale
+    ).run(arguments.once)
+
+
+if __name__ == "__main__":
+    main()
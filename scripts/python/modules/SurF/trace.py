@@ -0,0 +1,252 @@
+#
+# SurF.trace
+#   The lightweight tracing of hot paths. The spans are recorded only while
+#   tracing is started, otherwise a span costs one flag check.
+#   The trace is written as Chrome trace JSON (chrome://tracing or
+#   https://ui.perfetto.dev), and summarized per phase into the log :
+#       Phase                        Calls   Total s    Self s   Mean ms    Max ms
+#   The self time excludes the nested spans on the same thread.
+#   How to use :
+#       @traced("Exporter.get_parameters", "export")
+#       def get_parameters(self): ...
+#       with span("spex.export_project_textures", "painter", texture_set=name):
+#           ...
+#       Tracer.start()
+#       ...
+#       Tracer.stop()
+#       Tracer.write(trace_file)
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+from SurF.utils import log
+import threading
+import functools
+import json
+import time
+import os
+
+Function = TypeVar("Function", bound=Callable)
+
+
+class _Tracer(object):
+    """
+    The recorded spans of one traced run, the spans from worker threads are
+    recorded with their thread id and name.
+    """
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.events: List[dict] = []
+        self.threads: Dict[int, str] = {}
+        self.origin: float = 0.0
+        self.started: float = 0.0
+        self.lock: threading.Lock = threading.Lock()
+
+    def start(self) -> None:
+        """
+        Drop the recorded spans and start recording.
+        """
+        with self.lock:
+            self.events = []
+            self.threads = {}
+            self.origin = time.perf_counter()
+            self.started = time.time()
+        self.enabled = True
+
+    def stop(self) -> None:
+        self.enabled = False
+
+    def add(self, name: str, category: str, start: float, end: float, args: dict) -> None:
+        """
+        :param name: The span name.
+        :param category: The phase category, such as "export" or "convert".
+        :param start: The perf_counter when span entered.
+        :param end: The perf_counter when span exited.
+        :param args: The arguments shown in trace viewer.
+        """
+        thread: threading.Thread = threading.current_thread()
+        event: dict = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": thread.ident
+        }
+        if args:
+            event["args"] = {key: str(value) for key, value in args.items()}
+        with self.lock:
+            self.events.append(event)
+            self.threads[thread.ident] = thread.name
+
+    def to_chrome(self) -> dict:
+        """
+        :return:
+            The Chrome trace of recorded spans, with the thread names.
+        """
+        with self.lock:
+            events: List[dict] = list(self.events)
+            threads: Dict[int, str] = dict(self.threads)
+        return {
+            "traceEvents": events + [{
+                "name": "thread_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": {"name": name}
+            } for tid, name in threads.items()],
+            "displayTimeUnit": "ms",
+            "otherData": {"started": self.started}
+        }
+
+    def write(self, file: str) -> str:
+        """
+        :param file: The trace JSON file.
+        :return:
+            The written file, empty if nothing traced.
+        """
+        if not self.events:
+            return ""
+        os.makedirs(os.path.dirname(file) or ".", exist_ok=True)
+        with open(file, "w") as file_handle:
+            json.dump(self.to_chrome(), file_handle)
+        return file
+
+    def get_summary(self) -> Tuple[float, List[dict]]:
+        """
+        :return:
+            The (wall seconds, phases), the phase is the calls, total, self,
+            mean and max seconds of a span name, sorted by self time.
+        """
+        with self.lock:
+            events: List[dict] = sorted(
+                self.events, key=lambda event: (event["tid"], event["ts"], -event["dur"])
+            )
+        if not events:
+            return 0.0, []
+        wall: float = (
+            max(event["ts"] + event["dur"] for event in events) -
+            min(event["ts"] for event in events)
+        ) / 1e6
+        phases: Dict[str, dict] = {}
+        # The open spans of thread, (end, phase).
+        stack: List[Tuple[float, dict]] = []
+        tid: Optional[int] = None
+        event: dict
+        for event in events:
+            if event["tid"] != tid:
+                tid = event["tid"]
+                stack = []
+            while stack and stack[-1][0] <= event["ts"]:
+                stack.pop()
+            seconds: float = event["dur"] / 1e6
+            phase: dict = phases.setdefault(event["name"], {
+                "name": event["name"], "category": event["cat"],
+                "calls": 0, "total": 0.0, "self": 0.0, "max": 0.0
+            })
+            phase["calls"] += 1
+            phase["total"] += seconds
+            phase["self"] += seconds
+            phase["max"] = max(phase["max"], seconds)
+            if stack:
+                stack[-1][1]["self"] -= seconds
+            stack.append((event["ts"] + event["dur"], phase))
+        return wall, sorted(phases.values(), key=lambda item: item["self"], reverse=True)
+
+    def format_summary(self) -> List[str]:
+        """
+        :return:
+            The summary table lines.
+        """
+        wall, phases = self.get_summary()
+        lines: List[str] = [
+            f"{'Phase':<40}{'Calls':>7}{'Total s':>10}{'Self s':>10}"
+            f"{'Mean ms':>10}{'Max ms':>10}{'Self %':>8}"
+        ]
+        phase: dict
+        for phase in phases:
+            lines.append(
+                f"{phase['name'][:39]:<40}{phase['calls']:>7}{phase['total']:>10.3f}"
+                f"{phase['self']:>10.3f}{phase['total'] / phase['calls'] * 1e3:>10.2f}"
+                f"{phase['max'] * 1e3:>10.2f}"
+                f"{phase['self'] / wall * 100 if wall else 0.0:>8.1f}"
+            )
+        lines.append(f"Traced wall time : {wall:.3f}s, {len(phases)} phases")
+        return lines
+
+    def log_summary(self) -> None:
+        line: str
+        for line in self.format_summary():
+            log(line)
+
+
+Tracer: _Tracer = _Tracer()
+
+
+class _Span(object):
+    __slots__ = ("name", "category", "args", "start")
+
+    def __init__(self, name: str, category: str, args: dict) -> None:
+        self.name: str = name
+        self.category: str = category
+        self.args: dict = args
+        self.start: float = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_) -> None:
+        Tracer.add(self.name, self.category, self.start, time.perf_counter(), self.args)
+
+
+class _NullSpan(object):
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *_) -> None:
+        pass
+
+
+_Null: _NullSpan = _NullSpan()
+
+
+def span(name: str, category: str = "", **args):
+    """
+    :param name: The span name.
+    :param category: The phase category.
+    :param args: The arguments shown in trace viewer.
+    :return:
+        The span context manager, a shared no-op one if not tracing.
+    """
+    if not Tracer.enabled:
+        return _Null
+    return _Span(name, category, args)
+
+
+def traced(name: str = "", category: str = "") -> Callable[[Function], Function]:
+    """
+    Trace the calls of function.
+    :param name: The span name, default is the qualified name of function.
+    :param category: The phase category.
+    """
+    def decorator(function: Function) -> Function:
+        label: str = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not Tracer.enabled:
+                return function(*args, **kwargs)
+            start: float = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                Tracer.add(label, category, start, time.perf_counter(), {})
+        return wrapper
+    return decorator
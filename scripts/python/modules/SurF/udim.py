@@ -0,0 +1,278 @@
+#
+# SurF.udim
+#   The UDIM range compiler, the range expressions are compiled into
+#   tile bitsets over 1001 ~ 9999, bit 0 is 1001.
+#   Expression :
+#       1001-1010,1015 - Range and single tiles separated by comma or space
+#                        are merged.
+#       !1005, !1003-1004 - Exclude tiles, exclusion only means all but it.
+#       * - All tiles.
+#   Scope : channel:expression separated by semi-colon, comma or space,
+#       the expression of a channel runs to the next "channel:",
+#       the channel "*" is the default of channels not listed.
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from SurF.utils import warn
+import functools
+import re
+
+UdimFirst: int = 1001
+UdimLast: int = 9999
+
+_TermPattern = re.compile(r"^(!?)([1-9]\d{3})(?:-([1-9]\d{3}))?$")
+_ChannelPattern = re.compile(r"^(\*|\w[\w\d]+)$")
+_ScopeChannelPattern = re.compile(r"([^\s,;:]*)\s*:")
+_SeparatorPattern = re.compile(r"[\s,;]+")
+
+
+class TileSet(object):
+    """
+    Immutable set of UDIM tiles stored as bitset.
+    How to use :
+        tiles = TileSet.from_range(1001, 1010) - TileSet.from_tiles([1005])
+        1005 in tiles  # False
+        tiles.to_uv_tiles()  # [[0, 0], [1, 0], ...]
+    """
+    __slots__ = ("bits",)
+
+    def __init__(self, bits: int = 0) -> None:
+        self.bits: int = bits & _AllBits
+
+    @classmethod
+    def from_tiles(cls, tiles: Iterable[int]) -> "TileSet":
+        bits: int = 0
+        tile: int
+        for tile in tiles:
+            if UdimFirst <= tile <= UdimLast:
+                bits |= 1 << (tile - UdimFirst)
+        return cls(bits)
+
+    @classmethod
+    def from_range(cls, start: int, end: int) -> "TileSet":
+        """
+        :return:
+            The tiles from start to end, both included.
+        """
+        start = max(start, UdimFirst)
+        end = min(end, UdimLast)
+        if end < start:
+            return cls()
+        return cls(((1 << (end - start + 1)) - 1) << (start - UdimFirst))
+
+    @classmethod
+    def from_uv_tiles(cls, uv_tiles: Iterable[Tuple[int, int]]) -> "TileSet":
+        return cls.from_tiles(UdimFirst + u + v * 10 for u, v in uv_tiles)
+
+    def __or__(self, other: "TileSet") -> "TileSet":
+        return TileSet(self.bits | other.bits)
+
+    def __and__(self, other: "TileSet") -> "TileSet":
+        return TileSet(self.bits & other.bits)
+
+    def __sub__(self, other: "TileSet") -> "TileSet":
+        return TileSet(self.bits & ~other.bits)
+
+    def __xor__(self, other: "TileSet") -> "TileSet":
+        return TileSet(self.bits ^ other.bits)
+
+    def __invert__(self) -> "TileSet":
+        return TileSet(~self.bits)
+
+    def __contains__(self, tile: int) -> bool:
+        return UdimFirst <= tile <= UdimLast and bool(self.bits >> (tile - UdimFirst) & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        bits: int = self.bits
+        while bits:
+            low: int = bits & -bits
+            yield UdimFirst + low.bit_length() - 1
+            bits ^= low
+
+    def __len__(self) -> int:
+        return bin(self.bits).count("1")
+
+    def __bool__(self) -> bool:
+        return bool(self.bits)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, TileSet) and self.bits == other.bits
+
+    def __hash__(self) -> int:
+        return hash(self.bits)
+
+    def __repr__(self) -> str:
+        return f"TileSet({self.to_expression()!r})"
+
+    @property
+    def is_all(self) -> bool:
+        return self.bits == _AllBits
+
+    def to_uv_tiles(self) -> List[List[int]]:
+        """
+        :return:
+            The [u, v] pairs of painter's uvTiles filter, 1001 is [0, 0].
+        """
+        return [[(tile - UdimFirst) % 10, (tile - UdimFirst) // 10] for tile in self]
+
+    def to_ranges(self) -> List[Tuple[int, int]]:
+        """
+        :return:
+            The continuous (start, end) ranges.
+        """
+        ranges: List[List[int]] = []
+        tile: int
+        for tile in self:
+            if ranges and ranges[-1][1] == tile - 1:
+                ranges[-1][1] = tile
+            else:
+                ranges.append([tile, tile])
+        return [(start, end) for start, end in ranges]
+
+    def to_expression(self) -> str:
+        if self.is_all:
+            return "*"
+        return ",".join(
+            str(start) if start == end else f"{start}-{end}"
+            for start, end in self.to_ranges()
+        )
+
+
+_AllBits: int = (1 << (UdimLast - UdimFirst + 1)) - 1
+TileSet.All = TileSet(_AllBits)
+TileSet.Empty = TileSet()
+
+
+class RangeTerm(object):
+    """
+    The compiled expression of one key, the included and excluded tiles.
+    If nothing included, include means all.
+    """
+    __slots__ = ("include", "exclude", "has_include")
+
+    def __init__(self) -> None:
+        self.include: TileSet = TileSet.Empty
+        self.exclude: TileSet = TileSet.Empty
+        self.has_include: bool = False
+
+    def resolve(self, default: Optional["RangeTerm"] = None) -> TileSet:
+        """
+        :param default: The wildcard term, its include is used if this term
+                        has no include, its exclude is always applied.
+        :return:
+            The tiles of this term.
+        """
+        include: TileSet = TileSet.All
+        exclude: TileSet = self.exclude
+        if self.has_include:
+            include = self.include
+        elif default is not None and default.has_include:
+            include = default.include
+        if default is not None:
+            exclude = exclude | default.exclude
+        return include - exclude
+
+
+def _parse_terms(expression: str, term: RangeTerm) -> bool:
+    """
+    Merge the range expression into the term.
+    :return:
+        False if no valid token, the term is untouched.
+    """
+    valid: bool = False
+    token: str
+    for token in _SeparatorPattern.split(expression):
+        if not token:
+            continue
+        if token == "*":
+            term.include = TileSet.All
+            term.has_include = True
+            valid = True
+            continue
+        matcher = _TermPattern.match(token)
+        if not matcher:
+            warn(f"Invalid range expression : {token}")
+            continue
+        excluded, start, end = matcher.groups()
+        start_number: int = int(start)
+        end_number: int = int(end) if end else start_number
+        if end_number < start_number:
+            warn(f"Invalid UDIM range : {start}-{end}")
+            continue
+        tiles: TileSet = TileSet.from_range(start_number, end_number)
+        if excluded:
+            term.exclude = term.exclude | tiles
+        else:
+            term.include = term.include | tiles
+            term.has_include = True
+        valid = True
+    return valid
+
+
+@functools.lru_cache(maxsize=256)
+def compile_range(expression: str) -> TileSet:
+    """
+    :param expression: The range expression, such as "1001-1010,!1005".
+    :return:
+        The compiled tiles.
+    """
+    term: RangeTerm = RangeTerm()
+    if not _parse_terms(expression, term):
+        return TileSet.Empty
+    return term.resolve()
+
+
+@functools.lru_cache(maxsize=256)
+def compile_scope(expression: str) -> Dict[str, RangeTerm]:
+    """
+    :param expression: The scope, such as "*:1001-1010;diffuse:!1005;normal:1020",
+                       or "diffuse:1001-1010 normal:1001".
+    :return:
+        The range terms keyed by channel, the same channel are merged.
+        Do not modify the returned terms, they are cached.
+    """
+    terms: Dict[str, RangeTerm] = {}
+    matches: List[re.Match] = list(_ScopeChannelPattern.finditer(expression))
+    leading: str = expression[:matches[0].start() if matches else len(expression)]
+    if _SeparatorPattern.sub("", leading):
+        warn(f"Invalid scope expression : {leading.strip()}")
+    index: int
+    matcher: re.Match
+    for index, matcher in enumerate(matches):
+        end: int = matches[index + 1].start() if index + 1 < len(matches) else len(expression)
+        channel: str = matcher.group(1)
+        ranges: str = expression[matcher.end():end]
+        if not _ChannelPattern.match(channel):
+            warn(f"Invalid scope expression : {expression[matcher.start():end].strip()}")
+            continue
+        term: RangeTerm = terms.get(channel, RangeTerm())
+        if _parse_terms(ranges, term):
+            terms[channel] = term
+    return terms
+
+
+def resolve_scope(
+        expression: str, channels: Iterable[str]
+) -> Dict[str, TileSet]:
+    """
+    :param expression: The scope expression.
+    :param channels: The channels of texture set, used by wildcard.
+    :return:
+        The tiles keyed by channel, the channels not in scope are not included.
+    """
+    terms: Dict[str, RangeTerm] = compile_scope(expression)
+    wildcard: Optional[RangeTerm] = terms.get("*")
+    scope: Dict[str, TileSet] = {
+        channel: term.resolve(wildcard)
+        for channel, term in terms.items() if channel != "*"
+    }
+    if wildcard is not None:
+        channel: str
+        for channel in channels:
+            if channel not in scope:
+                scope[channel] = wildcard.resolve()
+    return scope
@@ -1,5 +1,5 @@
-from PySide2 import QtWidgets
-from typing import Type
+from PySide2 import QtWidgets, QtCore
+from typing import Callable, Dict, Iterable, List, Set, Type, Union
 
 _QLayoutType = Type[QtWidgets.QLayout]
 _QWidgetType = Type[QtWidgets.QWidget]
@@ -29,3 +29,190 @@ def clean_layout(layout: QtWidgets.QLayout) -> None:
             widget.deleteLater()
         else:
             clean_layout(item.layout())
+
+
+class CheckListModel(QtCore.QAbstractListModel):
+    """
+    The checkable names, the check state is kept in model,
+    the tooltip is built when it's shown first time.
+    How to use :
+        model = CheckListModel(lambda name: f"Tooltip of {name}")
+        model.set_names(["Body", "Head"])
+        model.checked_names()
+    """
+    def __init__(
+            self, tooltip: Union[Callable[[str], str], None] = None, parent=None
+    ) -> None:
+        super().__init__(parent)
+        self.names: List[str] = []
+        self.checked: Set[str] = set()
+        self.tooltip: Union[Callable[[str], str], None] = tooltip
+        self.tooltips: Dict[str, str] = {}
+
+    def set_names(self, names: Iterable[str]) -> None:
+        """
+        :param names: All names, the checked names still exist are kept.
+        """
+        self.beginResetModel()
+        self.names = list(names)
+        self.checked &= set(self.names)
+        self.tooltips.clear()
+        self.endResetModel()
+
+    def patch_names(self, names: Iterable[str]) -> None:
+        """
+        Patch the rows to names, only the added and removed rows change,
+        one removed with one added is renamed and keeps the check state.
+        :param names: All names.
+        """
+        names = list(names)
+        if names == self.names:
+            return
+        exists: Set[str] = set(self.names)
+        remains: Set[str] = set(names)
+        removed: List[str] = [name for name in self.names if name not in remains]
+        added: List[str] = [name for name in names if name not in exists]
+        if len(removed) == 1 and len(added) == 1:
+            self.rename(removed.pop(), added.pop())
+        name: str
+        for name in removed:
+            self.remove_name(name)
+        for name in added:
+            self.insert_name(names.index(name), name)
+        if self.names != names:
+            # Reordered.
+            self.set_names(names)
+
+    def insert_name(self, row: int, name: str) -> None:
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self.names.insert(row, name)
+        self.endInsertRows()
+
+    def remove_name(self, name: str) -> None:
+        row: int = self.names.index(name)
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self.names[row]
+        self.checked.discard(name)
+        self.tooltips.pop(name, None)
+        self.endRemoveRows()
+
+    def rename(self, name: str, new_name: str) -> None:
+        row: int = self.names.index(name)
+        self.names[row] = new_name
+        if name in self.checked:
+            self.checked.discard(name)
+            self.checked.add(new_name)
+        self.tooltips.pop(name, None)
+        self.dataChanged.emit(self.index(row), self.index(row))
+
+    def checked_names(self) -> List[str]:
+        return [name for name in self.names if name in self.checked]
+
+    def set_checked(self, names: Iterable[str], checked: bool) -> None:
+        names = set(names) & set(self.names)
+        if checked:
+            self.checked |= names
+        else:
+            self.checked -= names
+        if self.names:
+            self.dataChanged.emit(
+                self.index(0), self.index(len(self.names) - 1),
+                [QtCore.Qt.CheckStateRole]
+            )
+
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.names)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.names):
+            return None
+        name: str = self.names[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return name
+        if role == QtCore.Qt.CheckStateRole:
+            return QtCore.Qt.Checked if name in self.checked else QtCore.Qt.Unchecked
+        if role == QtCore.Qt.ToolTipRole and self.tooltip is not None:
+            if name not in self.tooltips:
+                self.tooltips[name] = self.tooltip(name)
+            return self.tooltips[name]
+        return None
+
+    def setData(self, index: QtCore.QModelIndex, value, role: int = QtCore.Qt.EditRole) -> bool:
+        if not index.isValid() or role != QtCore.Qt.CheckStateRole:
+            return False
+        name: str = self.names[index.row()]
+        if QtCore.Qt.CheckState(value) == QtCore.Qt.Checked:
+            self.checked.add(name)
+        else:
+            self.checked.discard(name)
+        self.dataChanged.emit(index, index, [QtCore.Qt.CheckStateRole])
+        return True
+
+    def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlags:
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable | \
+            QtCore.Qt.ItemIsUserCheckable
+
+
+class CheckListView(QtWidgets.QWidget):
+    """
+    The filter input and the list view of CheckListModel, only the visible
+    rows are drawn, so hundreds of names cost nothing until scrolled.
+    The filter matches the names contain the text, or the regular expression
+    if "Regex" is checked, case insensitive.
+    How to use :
+        view = CheckListView(model)
+        view.set_visible_checked(True)
+    """
+    def __init__(self, model: CheckListModel, parent=None) -> None:
+        super().__init__(parent)
+        self.model: CheckListModel = model
+        self.proxy = QtCore.QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(model)
+        self.proxy.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
+        self.filter_le = QtWidgets.QLineEdit()
+        self.filter_le.setPlaceholderText("Filter")
+        self.filter_le.setClearButtonEnabled(True)
+        self.regex_cb = QtWidgets.QCheckBox("Regex")
+        self.list_view = QtWidgets.QListView()
+        self.list_view.setModel(self.proxy)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        filter_layout: QtWidgets.QHBoxLayout = QtWidgets.QHBoxLayout()
+        filter_layout.addWidget(self.filter_le)
+        filter_layout.addWidget(self.regex_cb)
+        layout: QtWidgets.QVBoxLayout = QtWidgets.QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(filter_layout)
+        layout.addWidget(self.list_view)
+        self.setLayout(layout)
+        self.filter_le.textChanged.connect(self.apply_filter)
+        self.regex_cb.toggled.connect(self.apply_filter)
+
+    def apply_filter(self, *_) -> None:
+        text: str = self.filter_le.text()
+        syntax = QtCore.QRegExp.RegExp2 if self.regex_cb.isChecked() \
+            else QtCore.QRegExp.FixedString
+        pattern = QtCore.QRegExp(text, QtCore.Qt.CaseInsensitive, syntax)
+        if not pattern.isValid():
+            self.filter_le.setStyleSheet("color: rgb(224, 96, 96)")
+            return
+        self.filter_le.setStyleSheet("")
+        self.proxy.setFilterRegExp(pattern)
+
+    def visible_names(self) -> List[str]:
+        """
+        :return:
+            The names pass the filter.
+        """
+        return [
+            self.model.names[self.proxy.mapToSource(self.proxy.index(row, 0)).row()]
+            for row in range(self.proxy.rowCount())
+        ]
+
+    def set_visible_checked(self, checked: bool) -> None:
+        """
+        Check or uncheck the names pass the filter.
+        """
+        self.model.set_checked(self.visible_names(), checked)
@@ -7,9 +7,17 @@
 # Substance Painter Version : 2020.2.0 (6.2.0)
 #
 
-import substance_painter.logging as splg
+try:
+    import substance_painter.logging as splg
+except ImportError:
+    # Outside painter, such as the benchmarks and converter workers.
+    import logging as splg
+    splg.basicConfig(level=splg.INFO, format="%(levelname)s : %(message)s")
+import subprocess
 import tempfile
+import signal
 import json
+import os
 
 
 def reverse_replace(s, old, new, occurrence):
@@ -27,3 +35,56 @@ def warn(message: str) -> None:
 
 def err(message: str) -> None:
     splg.error(message)
+
+
+def kill_process_tree(process: subprocess.Popen) -> None:
+    """
+    Kill the process and its children.
+    On POSIX, the process must be started with start_new_session=True.
+    :param process: The process.
+    """
+    if process.poll() is not None:
+        return
+    if os.name == "nt":
+        subprocess.call(
+            ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            process.kill()
+
+
+def get_physical_memory() -> int:
+    """
+    :return:
+        The physical memory in bytes, 0 if unknown.
+    """
+    if os.name == "nt":
+        import ctypes
+
+        class MemoryStatus(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong)
+            ]
+
+        status = MemoryStatus()
+        status.dwLength = ctypes.sizeof(MemoryStatus)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return int(status.ullTotalPhys)
+        return 0
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return 0
@@ -0,0 +1,232 @@
+#
+# SurF.watch
+#   Watch the folder recursively, call back when a file is completely written.
+#   Linux uses inotify (close-write and moved-to events) by ctypes,
+#   the others poll the folder, a file is completed if its size and
+#   modified time are stable for a while.
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from SurF.utils import warn, err
+import ctypes.util
+import traceback
+import threading
+import ctypes
+import select
+import struct
+import time
+import sys
+import os
+
+_IN_CLOSE_WRITE: int = 0x00000008
+_IN_MOVED_TO: int = 0x00000080
+_IN_CREATE: int = 0x00000100
+_IN_Q_OVERFLOW: int = 0x00004000
+_IN_ISDIR: int = 0x40000000
+_IN_CLOEXEC: int = 0o2000000
+_IN_NONBLOCK: int = 0o4000
+_EventHeader: struct.Struct = struct.Struct("iIII")
+
+_LibC = None
+
+
+def _get_libc():
+    global _LibC
+    if _LibC is None:
+        _LibC = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    return _LibC
+
+
+def has_inotify() -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        return hasattr(_get_libc(), "inotify_init1")
+    except OSError:
+        return False
+
+
+class FolderWatcher(object):
+    """
+    Call back with the file path once it is completely written,
+    the files existed before start are ignored unless they are rewritten.
+    How to use :
+        watcher = FolderWatcher(directory, callback)
+        watcher.start()
+        ...
+        watcher.stop()
+    """
+    def __init__(
+            self,
+            directory: str,
+            callback: Callable[[str], None],
+            stable_time: float = 1.0,
+            poll_interval: float = 0.25,
+            use_inotify: bool = True
+    ) -> None:
+        self.directory: str = directory
+        self.callback: Callable[[str], None] = callback
+        self.stable_time: float = stable_time
+        self.poll_interval: float = poll_interval
+        self.use_inotify: bool = use_inotify and has_inotify()
+        self.stopped: threading.Event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.reported: Set[str] = set()
+        self._baseline: Dict[str, Tuple[int, int]] = {}
+        self._candidates: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        self._descriptor: int = -1
+        self._watches: Dict[int, str] = {}
+
+    def start(self) -> None:
+        self.stopped.clear()
+        if self.use_inotify:
+            try:
+                self._start_inotify()
+            except OSError as os_error:
+                warn(f"inotify is not available, use polling : {os_error}")
+                self.use_inotify = False
+        if not self.use_inotify:
+            self._baseline = self.scan()
+        self.thread = threading.Thread(
+            target=self._run, name="SurF-Watcher", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Report the completed files then stop watching.
+        """
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _report(self, file: str) -> None:
+        file = file.replace("\\", "/")
+        if file in self.reported:
+            return
+        self.reported.add(file)
+        try:
+            self.callback(file)
+        except Exception as unknown_error:
+            traceback.print_exc()
+            err(f"Watcher callback failed : {unknown_error}")
+
+    def _run(self) -> None:
+        try:
+            if self.use_inotify:
+                self._run_inotify()
+            else:
+                self._run_polling()
+        finally:
+            if self._descriptor >= 0:
+                os.close(self._descriptor)
+                self._descriptor = -1
+
+    # Polling
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """
+        :return:
+            The (size, modified time) of files keyed by path.
+        """
+        files: Dict[str, Tuple[int, int]] = {}
+        folders: List[str] = [self.directory]
+        while folders:
+            try:
+                entries = list(os.scandir(folders.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        folders.append(entry.path)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    continue
+        return files
+
+    def _poll(self) -> None:
+        now: float = time.monotonic()
+        file: str
+        state: Tuple[int, int]
+        for file, state in self.scan().items():
+            if self._baseline.get(file) == state:
+                continue
+            candidate = self._candidates.get(file)
+            if candidate is None or candidate[0] != state:
+                self._candidates[file] = (state, now)
+            elif now - candidate[1] >= self.stable_time:
+                self._baseline[file] = state
+                del self._candidates[file]
+                self._report(file)
+
+    def _run_polling(self) -> None:
+        while not self.stopped.wait(self.poll_interval):
+            self._poll()
+        # The unstable files are left to the caller.
+        self._poll()
+
+    # inotify
+
+    def _add_watch(self, directory: str) -> None:
+        descriptor: int = _get_libc().inotify_add_watch(
+            self._descriptor, os.fsencode(directory),
+            _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        )
+        if descriptor < 0:
+            error: int = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), directory)
+        self._watches[descriptor] = directory
+
+    def _start_inotify(self) -> None:
+        self._descriptor = _get_libc().inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._descriptor < 0:
+            error: int = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._add_watch(self.directory)
+        root: str
+        for root, folders, _ in os.walk(self.directory):
+            for folder in folders:
+                self._add_watch(os.path.join(root, folder))
+
+    def _read_events(self) -> None:
+        try:
+            data: bytes = os.read(self._descriptor, 65536)
+        except BlockingIOError:
+            return
+        offset: int = 0
+        while offset + _EventHeader.size <= len(data):
+            descriptor, mask, _, length = _EventHeader.unpack_from(data, offset)
+            offset += _EventHeader.size
+            name: str = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                warn("Watcher event queue overflowed, some files will be missed.")
+                continue
+            directory: Optional[str] = self._watches.get(descriptor)
+            if directory is None or not name:
+                continue
+            path: str = os.path.join(directory, name)
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    try:
+                        self._add_watch(path)
+                    except OSError:
+                        continue
+            elif mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO):
+                self._report(path)
+
+    def _run_inotify(self) -> None:
+        while not self.stopped.is_set():
+            readable = select.select([self._descriptor], [], [], self.poll_interval)[0]
+            if readable:
+                self._read_events()
+        # Drain the events queued before stop.
+        self._read_events()
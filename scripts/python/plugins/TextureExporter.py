@@ -12,15 +12,32 @@
 #
 
 from PySide2 import QtWidgets, QtGui, QtCore
-from typing import List, Dict, Tuple, Set, Union, Type, cast
+from typing import List, Dict, Tuple, Set, Union, Type, Callable, Mapping, cast
+from types import MappingProxyType
 from os.path import dirname, basename, join, isdir, isfile, realpath
 import SurF.ui
 import SurF.meta
+from SurF.pipeline import Pipeline, Stage
+from SurF.convert import ConverterPool, ConvertBatch, ConvertJob, ConvertResult
+from SurF.convert import ConvertCache, get_converter_version, get_backend
+from SurF.spool import SpoolQueue, SpoolBatch
+from SurF.watch import FolderWatcher
+from SurF.udim import TileSet, compile_scope, resolve_scope
+from SurF.derive import DeriveBackend, DeriveJob, expand_name, get_oiiotool
+import SurF.derive
+import SurF.imaging
+from SurF.plan import ExportPlan, PlanItem, RunHistory, format_bytes
+from SurF.packing import PackedMap, validate_packing
+from SurF.history import ExportHistory
+from SurF.trace import Tracer, span, traced
 from SurF.utils import reverse_replace, log, warn, err
 import subprocess
+import threading
 import traceback
-import tempfile
+import hashlib
+import functools
 import json
+import time
 import os
 import re
 import substance_painter.ui as spui
@@ -29,6 +46,11 @@ import substance_painter.export as spex
 import substance_painter.project as sppj
 import substance_painter.exception as sper
 import substance_painter.textureset as spts
+try:
+    # Painter 2021.1 or later.
+    import substance_painter.baking as spbk
+except ImportError:
+    spbk = None
 
 # -----------------------------------------
 __Version__: str = "0.1.21 (beta)"
@@ -84,20 +106,26 @@ _GlobalLineEditStyle: str = """
     min-height: 16px
 """
 
-_MeshMaps: List[str] = [
-    "ambient_occlusion",
-    "id",
-    "curvature",
-    "normal_base",
-    "world_space_normals",
-    "position",
-    "thickness"
-]
+# The default (bit-depth, channel count) of mesh maps.
+_MeshMaps: Dict[str, Tuple[int, int]] = {
+    "ambient_occlusion": (8, 1),
+    "id": (8, 3),
+    "curvature": (8, 1),
+    "normal_base": (16, 3),
+    "world_space_normals": (16, 3),
+    "position": (16, 3),
+    "thickness": (16, 1)
+}
 
 
 ExportChannelRangeKeeper = SurF.meta.Metadata("te_Channel_Ranges")
 ForceEightBitKeeper = SurF.meta.Metadata("te_Force_Eight_Bit")
 ConvertAfterKeeper = SurF.meta.Metadata("te_Convert_After")
+BatchExportKeeper = SurF.meta.Metadata("te_Batch_Export")
+ChangedOnlyKeeper = SurF.meta.Metadata("te_Changed_Only")
+ProfilesKeeper = SurF.meta.Metadata("te_Profiles")
+DirtyStateKeeper = SurF.meta.Metadata("te_Dirty_States")
+MeshMapStateKeeper = SurF.meta.Metadata("te_Mesh_Map_States")
 
 
 def is_udim(name: str) -> bool:
@@ -120,41 +148,254 @@ def get_script_path() -> str:
 
 class ExportSettingNoFoundError(Exception):
     def __init__(self, message):
+        super().__init__(message)
         self._message = message
 
     def __repr__(self):
         return self._message
 
 
+class ExportConfigError(ExportSettingNoFoundError):
+    """
+    The export config is invalid, all invalid keys are reported at once.
+    """
+    def __init__(self, errors: List[str]) -> None:
+        self.errors: List[str] = errors
+        super().__init__(
+            "Invalid export config :\n" + "\n".join(f"    {error}" for error in errors)
+        )
+
+
+class ExportProfile(object):
+    """
+    The delivery target, such as 16 bits TIF for film and 8 bits PNG
+    for realtime, the keys not defined in profile are from config.
+    Painter renders the highest profile, the others are derived from it.
+    """
+    Keys: Tuple[str, ...] = (
+        "export_name", "legacy_name", "export_path", "convert_path",
+        "export_format", "convert_format", "output_size"
+    )
+    BitDepths: Tuple[int, ...] = (0, 8, 16, 32)
+
+    def __init__(self, name: str, values: Mapping, defaults: Mapping) -> None:
+        self.name: str = name
+        self.export_name: str = values.get("export_name", defaults["export_name"])
+        self.legacy_name: str = values.get("legacy_name", defaults["legacy_name"])
+        self.export_path: str = values.get("export_path", defaults["export_path"])
+        self.convert_path: str = values.get("convert_path", defaults["convert_path"])
+        self.export_format: str = values.get("export_format", defaults["export_format"])
+        self.convert_format: str = values.get("convert_format", defaults["convert_format"])
+        self.output_size: int = values.get("output_size", defaults["output_size"])
+        # 0 is the channel's bit-depth.
+        self.bit_depth: int = values.get("bit_depth", 0)
+        self.convert: bool = bool(values.get("convert", 1))
+
+    def __repr__(self) -> str:
+        return f"ExportProfile({self.name!r})"
+
+    @property
+    def rank(self) -> Tuple[int, int]:
+        """
+        The (size, bit-depth) requirement, the channel's bit-depth is highest.
+        """
+        return self.output_size, self.bit_depth or 64
+
+    def get_signature(self) -> tuple:
+        return (
+            self.name, self.export_name, self.legacy_name,
+            self.export_format, self.output_size, self.bit_depth
+        )
+
+
+class ConfigSnapshot(object):
+    """
+    The immutable validated export config, the nested settings are
+    read-only mappings. Get the current snapshot from get_config(),
+    keep the snapshot during one export so the values are consistent.
+    How to use :
+        config = get_config()
+        config.export_path
+    """
+    config_name: str
+    converter: str
+    naming: re.Pattern
+    export_name: str
+    legacy_name: str
+    meshmap_name: str
+    preset: str
+    export_path: str
+    convert_path: str
+    meshmap_path: str
+    manifest_path: str
+    export_format: str
+    convert_format: str
+    normal_map: str
+    padding_algorithm: str
+    output_size: int
+    dilation_distance: int
+    color_correct: bool
+    dithering: bool
+    export_shader_params: bool
+    convert_cache: bool
+    history: bool
+    trace: bool
+    watch_export: bool
+    converter_backend: str
+    publisher: str
+    pipeline: Mapping[str, int]
+    spool: Mapping[str, Union[str, int]]
+    maps: Mapping[str, str]
+    meshmaps: Mapping[str, Mapping]
+    oiiotool: str
+    derive: Mapping[str, str]
+    profiles: Mapping[str, ExportProfile]
+    packing: Mapping[str, PackedMap]
+    # The output names keyed by label, the channels and packed maps.
+    outputs: Mapping[str, str]
+    digest: str
+
+    def __init__(self, values: dict, digest: str) -> None:
+        key: str
+        for key, value in values.items():
+            object.__setattr__(self, key, self.freeze(value))
+        object.__setattr__(self, "digest", digest)
+
+    def __setattr__(self, key: str, value) -> None:
+        raise AttributeError(f"The export config is read-only : {key}")
+
+    @staticmethod
+    def freeze(value):
+        if isinstance(value, dict):
+            return MappingProxyType({
+                key: ConfigSnapshot.freeze(item) for key, item in value.items()
+            })
+        if isinstance(value, list):
+            return tuple(ConfigSnapshot.freeze(item) for item in value)
+        return value
+
+    @property
+    def is_combined_mesh_maps(self) -> bool:
+        return bool(self.meshmaps["settings"]["combined"])
+
+    def converter_is_exists(self) -> bool:
+        """
+        :return:
+            Get the converter is executable.
+        """
+        return ExportConfig.is_executable(self.converter)
+
+    def get_profiles(self, names: List[str]) -> List[ExportProfile]:
+        """
+        :param names: The profile names, the unknown names are ignored.
+        :return:
+            The profiles in config order, the first profile if none matched.
+        """
+        profiles: List[ExportProfile] = [
+            profile for name, profile in self.profiles.items() if name in names
+        ]
+        return profiles or [next(iter(self.profiles.values()))]
+
+    def get_oiiotool(self) -> str:
+        """
+        :return:
+            The oiiotool path, next to converter if not specified.
+        """
+        return self.oiiotool or get_oiiotool(self.converter)
+
+    def get_packed_maps(self, target: str) -> List[PackedMap]:
+        """
+        :param target: "textures" or "meshmaps".
+        :return:
+            The packed maps of target in config order.
+        """
+        return [packed for packed in self.packing.values() if packed.target == target]
+
+    def get_mesh_map_settings(self) -> Dict[str, Tuple[int, int]]:
+        """
+        :return:
+            The (bit-depth, channel count) of mesh maps to export keyed by name,
+            all mesh maps with default settings if meshmaps.maps not specified.
+        """
+        maps: Union[Mapping[str, Mapping], None] = self.meshmaps.get("maps")
+        if maps is None:
+            return dict(_MeshMaps)
+        return {
+            name: (
+                settings.get("bit_depth", _MeshMaps[name][0]),
+                settings.get("channels", _MeshMaps[name][1])
+            )
+            for name, settings in maps.items()
+        }
+
+
+_Required = object()
+
+
 class ExportConfig(object):
+    """
+    Load ExportConfig.json lazily into ConfigSnapshot, the snapshot is cached
+    by file modified time and content hash, so it reloads when the file changed.
+    If the changed file is invalid, the errors are reported and the previous
+    snapshot is kept.
+    How to use :
+        config = Config.get()
+        Config.listeners.append(on_config_reloaded)
+    """
     Limits: Dict[str, List[Union[str, int]]] = {
         "output_size": [512, 1024, 2048, 8192, 4096],
         "export_format": ["png", "tga", "jpg", "tif"],
         "normal_map": ["directx", "open_gl"],
-        "color_correct": [0, 1],
-        "export_shader_params": [0, 1],
-        "dithering": [0, 1],
-        "padding_algorithm": [
+        "paddingAlgorithm": [
             "passthrough", "color", "transparent", "diffusion", "infinite"
-        ]
+        ],
+        "converter_backend": ["maketx", "oiio", "numpy", "auto"]
     }
 
-    def __init__(self) -> None:
-        self.settings: dict = {}
-        config_file: str = join(get_script_path(), _ExportConfigFile)
-        if isfile(config_file):
-            with open(config_file, 'r') as file_handle:
-                try:
-                    data = json.load(file_handle)
-                except Exception as unknown_error:
-                    err(str(unknown_error))
-                    raise
-                else:
-                    self.settings = data
-        else:
-            message: str = f"Can't get export config file : {config_file}"
-            err(message)
-            raise ExportSettingNoFoundError(message)
+    # (JSON key, snapshot attribute, type, default)
+    Keys: List[Tuple[str, str, type, object]] = [
+        ("configName", "config_name", str, _Required),
+        ("converter", "converter", str, _Required),
+        ("naming", "naming", re.Pattern, _Required),
+        ("export_name", "export_name", str, _Required),
+        ("legacy_name", "legacy_name", str, _Required),
+        ("meshmap_name", "meshmap_name", str, _Required),
+        ("preset", "preset", str, _Required),
+        ("export_path", "export_path", str, _Required),
+        ("convert_path", "convert_path", str, _Required),
+        ("meshmap_path", "meshmap_path", str, _Required),
+        ("export_format", "export_format", str, _Required),
+        ("convert_format", "convert_format", str, _Required),
+        ("normal_map", "normal_map", str, _Required),
+        ("paddingAlgorithm", "padding_algorithm", str, _Required),
+        ("output_size", "output_size", int, _Required),
+        ("dilationDistance", "dilation_distance", int, _Required),
+        ("color_correct", "color_correct", bool, _Required),
+        ("dithering", "dithering", bool, _Required),
+        ("export_shader_params", "export_shader_params", bool, _Required),
+        ("maps", "maps", dict, _Required),
+        ("meshmaps", "meshmaps", dict, _Required),
+        ("manifest_path", "manifest_path", str, "Manifest"),
+        ("publisher", "publisher", str, ""),
+        ("convert_cache", "convert_cache", bool, 1),
+        ("history", "history", bool, 1),
+        ("trace", "trace", bool, 0),
+        ("watch_export", "watch_export", bool, 0),
+        ("converter_backend", "converter_backend", str, "maketx"),
+        ("pipeline", "pipeline", dict, {}),
+        ("spool", "spool", dict, {}),
+        ("oiiotool", "oiiotool", str, ""),
+        ("derive", "derive", dict, {}),
+        ("profiles", "profiles", dict, {}),
+        ("packing", "packing", dict, {})
+    ]
+
+    def __init__(self, file: str = "") -> None:
+        self.file: str = file or join(get_script_path(), _ExportConfigFile)
+        self.snapshot: Union[ConfigSnapshot, None] = None
+        self.stat: Tuple[int, int] = (0, 0)
+        self.listeners: List[Callable[[ConfigSnapshot], None]] = []
+        self.lock: threading.Lock = threading.Lock()
 
     @staticmethod
     def is_executable(file: str) -> bool:
@@ -165,118 +406,321 @@ class ExportConfig(object):
         """
         return isfile(file) and os.access(file, os.X_OK)
 
-    def value(self, key: str) -> Union[str, int]:
+    def get(self) -> ConfigSnapshot:
         """
-        :param key: The setting keyword.
         :return:
-            Get the value (string or integer) from keyword.
+            Get the current config snapshot, reload if the file changed.
         """
-        if key not in self.settings:
-            raise ExportSettingNoFoundError(f"Failed to get setting : {key}")
-        value: Union[str, int] = self.settings[key]
-        if key in ExportConfig.Limits.keys():
-            if value not in ExportConfig.Limits[key]:
-                value = ExportConfig.Limits[key][-1]
-        return value
+        try:
+            stat: os.stat_result = os.stat(self.file)
+        except OSError:
+            if self.snapshot is not None:
+                return self.snapshot
+            message: str = f"Can't get export config file : {self.file}"
+            err(message)
+            raise ExportSettingNoFoundError(message)
+        key: Tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            previous: Union[ConfigSnapshot, None] = self.snapshot
+            if previous is not None and key == self.stat:
+                return previous
+            with open(self.file, "rb") as file_handle:
+                content: bytes = file_handle.read()
+            self.stat = key
+            digest: str = hashlib.sha1(content).hexdigest()
+            if previous is not None and digest == previous.digest:
+                return previous
+            try:
+                snapshot: ConfigSnapshot = self.load(content, digest)
+            except ExportConfigError as config_error:
+                err(str(config_error))
+                if previous is None:
+                    raise
+                warn("Keep the previous export config.")
+                return previous
+            self.snapshot = snapshot
+        if previous is not None:
+            log(f"Export config reloaded : {self.file}")
+            listener: Callable[[ConfigSnapshot], None]
+            for listener in self.listeners:
+                listener(snapshot)
+        return snapshot
 
-    def is_true(self, key: str) -> bool:
+    @staticmethod
+    def load(content: bytes, digest: str) -> ConfigSnapshot:
+        """
+        :param content: The config file content.
+        :param digest: The content hash.
+        :return:
+            The validated config snapshot.
+        """
+        try:
+            data = json.loads(content.decode("utf-8"))
+        except (ValueError, UnicodeDecodeError) as value_error:
+            raise ExportConfigError([f"Can't parse JSON : {value_error}"])
+        if not isinstance(data, dict):
+            raise ExportConfigError(["The config must be a JSON object"])
+        values, errors = ExportConfig.validate(data)
+        if errors:
+            raise ExportConfigError(errors)
+        values["profiles"] = {
+            name: ExportProfile(name, profile, values)
+            for name, profile in values["profiles"].items()
+        } or {"default": ExportProfile("default", {}, values)}
+        values["packing"] = {
+            name: PackedMap(name, packed) for name, packed in values["packing"].items()
+        }
+        values["outputs"] = dict(values["maps"], **{
+            packed.label: packed.name for packed in values["packing"].values()
+            if packed.target == "textures"
+        })
+        return ConfigSnapshot(values, digest)
+
+    @staticmethod
+    def validate(data: dict) -> Tuple[dict, List[str]]:
         """
-        :param key: The setting keyword.
+        :param data: The parsed config.
         :return:
-            Get the value is True or False from keyword,
-            If value is 0, return False, otherwise return True.
+            The (values keyed by snapshot attribute, errors), check all keys
+            without stopping at the first error.
         """
-        if key not in self.settings:
-            raise ExportSettingNoFoundError(f"Failed to get setting : {key}")
-        value: int = self.settings[key]
-        return not value == 0
+        values: dict = {}
+        errors: List[str] = []
+        key: str
+        attribute: str
+        kind: type
+        for key, attribute, kind, default in ExportConfig.Keys:
+            if key not in data:
+                if default is _Required:
+                    errors.append(f"{key} : missing")
+                else:
+                    values[attribute] = bool(default) if kind is bool else default
+                continue
+            value = data[key]
+            if kind is re.Pattern:
+                try:
+                    value = re.compile(value)
+                except (re.error, TypeError) as pattern_error:
+                    errors.append(f"{key} : invalid pattern, {pattern_error}")
+                    continue
+            elif kind is bool:
+                if value not in (0, 1):
+                    errors.append(f"{key} : must be 0 or 1, got {value!r}")
+                    continue
+                value = bool(value)
+            elif kind is int and (isinstance(value, bool) or not isinstance(value, int)):
+                errors.append(f"{key} : must be integer, got {value!r}")
+                continue
+            elif not isinstance(value, kind):
+                errors.append(f"{key} : must be {kind.__name__}, got {value!r}")
+                continue
+            if key in ExportConfig.Limits and value not in ExportConfig.Limits[key]:
+                errors.append(
+                    f"{key} : {value!r} is not one of {ExportConfig.Limits[key]}"
+                )
+                continue
+            values[attribute] = value
+        if values.get("dilation_distance", 0) < 0:
+            errors.append("dilationDistance : must not be negative")
+        meshmaps = values.get("meshmaps", {"settings": {"combined": 0}})
+        if not isinstance(meshmaps.get("settings"), dict) or \
+                "combined" not in meshmaps["settings"]:
+            errors.append("meshmaps : settings.combined is missing")
+        label: str
+        for label, name in values.get("maps", {}).items():
+            if not isinstance(name, str):
+                errors.append(f"maps : {label} must be string, got {name!r}")
+        for key, value in values.get("pipeline", {}).items():
+            if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+                errors.append(f"pipeline : {key} must be non-negative integer")
+        derive: dict = values.get("derive", {})
+        if derive.get("method", "auto") not in SurF.derive.Methods:
+            errors.append(f"derive : method is not one of {SurF.derive.Methods}")
+        if derive.get("filter", "lanczos") not in SurF.imaging.Filters:
+            errors.append(f"derive : filter is not one of {list(SurF.imaging.Filters)}")
+        errors.extend(ExportConfig.validate_profiles(values.get("profiles", {})))
+        errors.extend(ExportConfig.validate_mesh_maps(meshmaps.get("maps", {})))
+        if isinstance(values.get("maps"), dict):
+            errors.extend(validate_packing(
+                values.get("packing", {}), values["maps"], _MeshMaps
+            ))
+        return values, errors
 
-    def get_setting(self, key: str) -> dict:
+    @staticmethod
+    def validate_mesh_maps(maps: dict) -> List[str]:
         """
-        :param key: The setting keyword.
+        :param maps: The mesh map settings keyed by mesh map name.
         :return:
-            Get the complex settings (dict)
+            The errors of mesh map settings.
         """
-        if key not in self.settings:
-            raise ExportSettingNoFoundError(f"Failed to get setting : {key}")
-        setting: dict = self.settings[key]
-        return setting
+        if not isinstance(maps, dict):
+            return [f"meshmaps : maps must be object, got {maps!r}"]
+        errors: List[str] = []
+        name: str
+        for name, settings in maps.items():
+            if name not in _MeshMaps:
+                errors.append(f"meshmaps : {name} is not one of {list(_MeshMaps)}")
+            elif not isinstance(settings, dict):
+                errors.append(f"meshmaps : {name} must be object, got {settings!r}")
+            elif settings.get("bit_depth", 8) not in (8, 16, 32):
+                errors.append(f"meshmaps : {name}.bit_depth is not one of [8, 16, 32]")
+            elif settings.get("channels", 1) not in (1, 3):
+                errors.append(f"meshmaps : {name}.channels is not one of [1, 3]")
+        return errors
 
-    def converter_is_exists(self) -> bool:
+    @staticmethod
+    def validate_profiles(profiles: dict) -> List[str]:
         """
+        :param profiles: The profiles keyed by name.
         :return:
-            Get the converter is executable.
+            The errors of profiles.
+        """
+        errors: List[str] = []
+        name: str
+        for name, profile in profiles.items():
+            if not isinstance(profile, dict):
+                errors.append(f"profiles : {name} must be object, got {profile!r}")
+                continue
+            key: str
+            for key, value in profile.items():
+                if key in ("bit_depth", "convert"):
+                    continue
+                if key not in ExportProfile.Keys:
+                    errors.append(f"profiles : {name}.{key} is unknown")
+                elif key == "output_size" and (
+                        isinstance(value, bool) or not isinstance(value, int)
+                ):
+                    errors.append(f"profiles : {name}.{key} must be integer, got {value!r}")
+                elif key != "output_size" and not isinstance(value, str):
+                    errors.append(f"profiles : {name}.{key} must be str, got {value!r}")
+                elif key in ExportConfig.Limits and value not in ExportConfig.Limits[key]:
+                    errors.append(
+                        f"profiles : {name}.{key} {value!r} is not one of "
+                        f"{ExportConfig.Limits[key]}"
+                    )
+            if profile.get("bit_depth", 0) not in ExportProfile.BitDepths:
+                errors.append(
+                    f"profiles : {name}.bit_depth is not one of {list(ExportProfile.BitDepths)}"
+                )
+            if profile.get("convert", 1) not in (0, 1):
+                errors.append(f"profiles : {name}.convert must be 0 or 1")
+        return errors
+
+
+Config: ExportConfig = ExportConfig()
+
+
+def get_config() -> ConfigSnapshot:
+    """
+    :return:
+        Get the current export config snapshot.
+    """
+    return Config.get()
+
+
+class PresetCache(object):
+    """
+    Cache the compiled export presets keyed by channel-format signature,
+    the texture sets have the same channel layout share one preset.
+    The config digest is part of signature, so config changed or channel
+    stack changed will get a new preset.
+    How to use :
+        cached = Presets.get(signature)
+        if cached is None:
+            cached = Presets.put(signature, build())
+    """
+    Limit: int = 256
+
+    def __init__(self) -> None:
+        self.presets: Dict[tuple, tuple] = {}
+
+    def get(self, signature: tuple) -> Union[tuple, None]:
+        return self.presets.get(signature)
+
+    def put(self, signature: tuple, preset: tuple) -> tuple:
+        if len(self.presets) >= PresetCache.Limit:
+            self.presets.clear()
+        self.presets[signature] = preset
+        return preset
+
+    def clear(self) -> None:
+        self.presets.clear()
+
+    @staticmethod
+    def get_name(signature: tuple) -> str:
         """
-        return self.is_executable(self.value("converter"))
+        :param signature: The preset signature.
+        :return:
+            Get the short name from signature.
+        """
+        return hashlib.sha1(repr(signature).encode()).hexdigest()[:8]
 
 
-Converter: str = ""
-Color_Correct: bool = False
+Presets: PresetCache = PresetCache()
 
-try:
-    Settings: ExportConfig = ExportConfig()
-    ProjectNameMatcher: re.Pattern = re.compile(Settings.value("naming"))
-    Python: str = Settings.value("python")
-    ConfigName: str = Settings.value("configName")
-    Converter: str = Settings.value("converter")
-    ExportName: str = Settings.value("export_name")
-    LegacyName: str = Settings.value("legacy_name")
-    MeshMapName: str = Settings.value("meshmap_name")
-    ExportDirectory: str = Settings.value("export_path")
-    ConvertDirectory: str = Settings.value("convert_path")
-    MeshMapDirectory: str = Settings.value("meshmap_path")
-    OutputSize: int = Settings.value("output_size")
-    ExportFormat: str = Settings.value("export_format")
-    ConvertFormat: str = Settings.value("convert_format")
-    NormalMapFormat: str = Settings.value("normal_map")
-    ExportPreset: str = Settings.value("preset")
-    DilationDistance: str = Settings.value("dilationDistance")
-    PaddingAlgorithm: str = Settings.value("paddingAlgorithm")
-    ExportShaderParams: bool = Settings.is_true("export_shader_params")
-    Dithering: bool = Settings.is_true("dithering")
-    Color_Correct: bool = Settings.is_true("color_correct")
-    ChannelMaps: dict = Settings.get_setting("maps")
-    MeshMapSettings: dict = Settings.get_setting("meshmaps")
-    Is_Combined_Mesh_Maps: bool = MeshMapSettings["settings"]["combined"]
-except ExportSettingNoFoundError as e:
-    err(str(e))
-except Exception as e:
-    traceback.print_exc()
-    err(str(e))
-
-Color_Correct_Option: str = '--colorconvert sRGB "scene-linear Rec 709/sRGB"'
-
-_MakeTxOptions: str = " ".join([
+Color_Correct_Option: List[str] = [
+    "--colorconvert", "sRGB", "scene-linear Rec 709/sRGB"
+]
+
+_MakeTxOptions: List[str] = [
     "-oiio",
     "-u",
     "--checknan",
     "--constant-color-detect",
     "--monochrome-detect",
     "--opaque-detect"
-])
+]
 
-_MultiProcessConvertPoolScript: str = """
-import subprocess
-import multiprocessing
-MakeTx = r"{0}"
-ColorCorrect = {3}
-def work(pairs):
-    raw_process = '"%s" {1} -o "%s" "%s"'
-    srgb_process= '"%s" {1} {2} -o "%s" "%s"'
-    arguments = raw_process
-    if ColorCorrect:
-        for channel in convert_channels:
-            if pairs[0].split("/")[-1].find(channel) > 0:
-                arguments = srgb_process
-                break
-    process = subprocess.Popen(arguments % (MakeTx, pairs[1], pairs[0]))
-    process.communicate()
-
-if __name__ == "__main__":
-    cpu_count = multiprocessing.cpu_count()
-    pool = multiprocessing.Pool(cpu_count)
-    pool.map(work, targets)
-""".format(Converter, _MakeTxOptions, Color_Correct_Option, str(Color_Correct))
+
+class ConvertPoolHolder(object):
+    """
+    Keep one converter pool, it will be rebuilt if the converter settings
+    of config changed, the running jobs of previous pool are finished.
+    """
+    def __init__(self) -> None:
+        self.pool: Union[ConverterPool, None] = None
+        self.key: tuple = ()
+        self.lock: threading.Lock = threading.Lock()
+
+    def get(self, config: ConfigSnapshot) -> ConverterPool:
+        key: tuple = (
+            config.converter_backend,
+            config.pipeline.get("convert_memory", 0),
+            config.pipeline.get("convert_adaptive", 1)
+        )
+        with self.lock:
+            if self.pool is None or key != self.key:
+                if self.pool is not None:
+                    self.pool.shutdown()
+                self.pool = ConverterPool(
+                    backend=get_backend(config.converter_backend),
+                    memory_budget=int(key[1]) * 1024 ** 2,
+                    adaptive=bool(key[2])
+                )
+                self.key = key
+            return self.pool
+
+    def shutdown(self) -> None:
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+
+
+ConvertPool: ConvertPoolHolder = ConvertPoolHolder()
+
+DerivePool: ConverterPool = ConverterPool(backend=DeriveBackend())
+
+
+def get_convert_queue(config: ConfigSnapshot) -> Union[ConverterPool, SpoolQueue]:
+    """
+    :param config: The config snapshot.
+    :return:
+        The spool queue if spool path is set, otherwise the converter pool.
+    """
+    if config.spool.get("path"):
+        return SpoolQueue(config.spool["path"], detached=not config.spool.get("wait", 1))
+    return ConvertPool.get(config)
 
 
 class ExportSettings(object):
@@ -288,12 +732,16 @@ class ExportSettings(object):
         export_setting.force8bits = True
         export_setting.combined = False
         export_setting.color_correct = False
+        export_setting.batch = True
+        export_setting.changed_only = False
         export_setting.get()
         => Get {
             "with_convert" : True,
             "is_force_8bits" : True,
             "is_combined" : False,
-            "is_color_correct" : False
+            "is_color_correct" : False,
+            "is_batch" : True,
+            "is_changed_only" : False
         }
     """
 
@@ -303,7 +751,10 @@ class ExportSettings(object):
         self.is_combined: bool = False
         self.is_color_correct: bool = False
         self.is_mesh_map: bool = False
+        self.is_batch: bool = False
+        self.is_changed_only: bool = False
         self.scope: str = ""
+        self.profiles: List[str] = []
 
     @property
     def convert(self) -> bool:
@@ -345,12 +796,34 @@ class ExportSettings(object):
     def mesh_map(self, toggle: bool) -> None:
         self.is_mesh_map = toggle
 
+    @property
+    def batch(self) -> bool:
+        return self.is_batch
+
+    @batch.setter
+    def batch(self, toggle: bool) -> None:
+        self.is_batch = toggle
+
+    @property
+    def changed_only(self) -> bool:
+        return self.is_changed_only
+
+    @changed_only.setter
+    def changed_only(self, toggle: bool) -> None:
+        self.is_changed_only = toggle
+
     def set_scope_map(self, _scope: str) -> None:
         self.scope = _scope
 
     def get_scope_map(self) -> str:
         return self.scope
 
+    def set_profiles(self, _profiles: List[str]) -> None:
+        self.profiles = list(_profiles)
+
+    def get_profiles(self) -> List[str]:
+        return self.profiles
+
     def get(self) -> Dict[str, bool]:
         """
         :return:
@@ -360,8 +833,178 @@ class ExportSettings(object):
             "with_convert": self.convert,
             "is_force_8bits": self.force8bits,
             "is_combined": self.combined,
-            "is_color_correct": self.color_correct
+            "is_color_correct": self.color_correct,
+            "is_batch": self.batch,
+            "is_changed_only": self.changed_only
+        }
+
+
+class DirtyTracker(object):
+    """
+    Track the texture sets and channels changed since last successful export.
+    The states are kept in project metadata :
+        {
+            texture set name : {
+                "formats" : {lower-case channel label : channel format},
+                "dirty" : [channel label, ...] or "*" (all channels)
+            }
+        }
+    A texture set never exported is dirty, a channel is dirty if it's format
+    changed or it's new. Painter doesn't tell which channel was painted,
+    so layer stack changes make the whole active texture set dirty.
+    """
+    def __init__(self) -> None:
+        self.states: Union[dict, None] = None
+
+    def load(self) -> dict:
+        if self.states is None:
+            states = DirtyStateKeeper.get("states")
+            self.states = {
+                name: self.lower_labels(state) for name, state in states.items()
+            } if isinstance(states, dict) else {}
+        return self.states
+
+    @staticmethod
+    def lower_labels(state: dict) -> dict:
+        """
+        :param state: The state of texture set.
+        :return:
+            The state keyed by lower-case channel labels, the states saved
+            before kept the case of user channel labels.
+        """
+        dirty = state.get("dirty", "*")
+        return {
+            "formats": {
+                label.lower(): channel_format
+                for label, channel_format in state.get("formats", {}).items()
+            },
+            "dirty": dirty if dirty == "*" else sorted({label.lower() for label in dirty})
+        }
+
+    def save(self) -> None:
+        DirtyStateKeeper.set("states", self.states)
+
+    def reset(self) -> None:
+        """
+        Reload states from metadata next time, called when project changed.
+        """
+        self.states = None
+
+    def mark_dirty(self, name: str, labels: Union[List[str], None] = None) -> None:
+        """
+        :param name: The texture set name.
+        :param labels: The channel labels, None is all channels.
+        """
+        state: Union[dict, None] = self.load().get(name)
+        if state is None or state["dirty"] == "*":
+            return
+        if labels is None:
+            state["dirty"] = "*"
+        else:
+            dirty: List[str] = sorted(set(state["dirty"]) | set(labels))
+            if dirty == state["dirty"]:
+                return
+            state["dirty"] = dirty
+        self.save()
+
+    def mark_clean(self, name: str, formats: Dict[str, str], labels: Set[str]) -> None:
+        """
+        :param name: The texture set name.
+        :param formats: The channel formats of texture set, keyed by label.
+        :param labels: The channel labels exported successfully.
+        """
+        state: dict = self.load().setdefault(name, {"formats": {}, "dirty": "*"})
+        dirty: Set[str] = set(formats) if state["dirty"] == "*" else set(state["dirty"])
+        label: str
+        for label in labels:
+            if label in formats:
+                state["formats"][label] = formats[label]
+        state["dirty"] = sorted(dirty - labels)
+        self.save()
+
+    def dirty_channels(self, name: str, formats: Dict[str, str]) -> Set[str]:
+        """
+        :param name: The texture set name.
+        :param formats: The channel formats of texture set, keyed by label.
+        :return:
+            Get the channel labels need to export.
+        """
+        state: Union[dict, None] = self.load().get(name)
+        if state is None or state["dirty"] == "*":
+            return set(formats)
+        changed: Set[str] = {
+            label for label, channel_format in formats.items()
+            if state["formats"].get(label) != channel_format
+        }
+        return (set(state["dirty"]) & set(formats)) | changed
+
+    def on_layer_stacks_changed(self, *_) -> None:
+        """
+        The layer stack event doesn't say which stack, the active stack is
+        the one artist working on.
+        """
+        try:
+            stack: spts.Stack = spts.get_active_stack()
+            self.mark_dirty(stack.material().name())
+        except Exception as unknown_error:
+            warn(f"Can't track the active texture set : {unknown_error}")
+
+
+Tracker: DirtyTracker = DirtyTracker()
+
+
+class MeshMapTracker(object):
+    """
+    Track the bake inputs of exported mesh maps in project metadata :
+        {
+            texture set name : {
+                mesh map name : {
+                    "signature" : hash of bake inputs and export settings,
+                    "files" : [exported file, ...]
+                }
+            }
         }
+    A mesh map is changed if the signature changed or any file is missing.
+    """
+    @staticmethod
+    def load() -> dict:
+        states = MeshMapStateKeeper.get("states")
+        return states if isinstance(states, dict) else {}
+
+    def changed_maps(self, name: str, signatures: Dict[str, str]) -> List[str]:
+        """
+        :param name: The texture set name.
+        :param signatures: The signatures keyed by mesh map name.
+        :return:
+            The changed mesh map names.
+        """
+        states: dict = self.load().get(name, {})
+        changed: List[str] = []
+        mesh_map: str
+        signature: str
+        for mesh_map, signature in signatures.items():
+            state: Union[dict, None] = states.get(mesh_map)
+            if state is None or state["signature"] != signature or \
+                    not state["files"] or not all(isfile(file) for file in state["files"]):
+                changed.append(mesh_map)
+        return changed
+
+    def mark_exported(self, name: str, exported: Dict[str, Tuple[str, List[str]]]) -> None:
+        """
+        :param name: The texture set name.
+        :param exported: The (signature, files) keyed by mesh map name.
+        """
+        if not exported:
+            return
+        states: dict = self.load()
+        state: dict = states.setdefault(name, {})
+        mesh_map: str
+        for mesh_map, (signature, files) in exported.items():
+            state[mesh_map] = {"signature": signature, "files": files}
+        MeshMapStateKeeper.set("states", states)
+
+
+MeshMapStates: MeshMapTracker = MeshMapTracker()
 
 
 class TextureSetWrapper(object):
@@ -387,8 +1030,29 @@ class TextureSetWrapper(object):
             raise AssertionError(
                 "TextureSetWrapper must create from string or TextureSet object"
             )
-        self.channels: Dict[str, spts.Channel] = self.get_channels()
 
+    @traced("TextureSetWrapper.get_uv_tiles", "painter")
+    def get_uv_tiles(self) -> Union[TileSet, None]:
+        """
+        :return:
+            Get the populated UV tiles, None if unknown (painter before
+            2021.1 has no UV tile API, or the texture set is not UDIM).
+        """
+        has_uv_tiles = getattr(self.texture_set, "has_uv_tiles", None)
+        if has_uv_tiles is None or not has_uv_tiles():
+            return None
+        return TileSet.from_uv_tiles(
+            (tile.u, tile.v) for tile in self.texture_set.all_uv_tiles()
+        )
+
+    @property
+    def channels(self) -> Dict[str, spts.Channel]:
+        """
+        The channels cached by project snapshot.
+        """
+        return Snapshot.get_channels(self.name)
+
+    @traced("TextureSetWrapper.get_channels", "painter")
     def get_channels(self) -> Dict[str, spts.Channel]:
         """
         Members : BaseColor, Height, Specular, Opacity, Emmissive,
@@ -429,10 +1093,10 @@ class TextureSetWrapper(object):
         def replace(source: str) -> str:
             return source.replace("$textureSet", self.name)
 
-        workflow: Workflow = Workflow()
-        title: str = workflow.get_title() + "_" + self.name
-        name: str = replace(LegacyName) if is_udim(self.name)\
-            else replace(ExportName)
+        config: ConfigSnapshot = get_config()
+        title: str = Snapshot.get_workflow().get_title() + "_" + self.name
+        name: str = replace(config.legacy_name) if is_udim(self.name)\
+            else replace(config.export_name)
         full_name: str = name.format(title, "(CHANNEL)")
         return full_name
 
@@ -449,7 +1113,7 @@ class TextureSetWrapper(object):
 
     @staticmethod
     def all_texture_set() -> List[str]:
-        return [texture_set.name() for texture_set in spts.all_texture_sets()]
+        return Snapshot.get_texture_sets()
 
 
 class Workflow(object):
@@ -462,6 +1126,7 @@ class Workflow(object):
 
     def __init__(self):
         self.title = ""
+        self.config: ConfigSnapshot = get_config()
         if sppj.is_open():
             self.project: str = sppj.file_path()
             self.basename: str = basename(self.project)
@@ -470,9 +1135,8 @@ class Workflow(object):
             self.project: str = ""
             self.basename: str = ""
             self.valid: bool = False
-        matcher = ProjectNameMatcher.match(self.basename)
-        if matcher:
-            matched = matcher.groups()
+        matched: Tuple[str, ...] = Workflow.parse_name(self.basename)
+        if matched:
             self.title = matched[0]
             if len(matched) > 1:
                 self.proj_typ = matched[1]
@@ -483,6 +1147,17 @@ class Workflow(object):
             err(f"The project name is incorrect : {self.basename}")
             self.valid = False
 
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def parse_name(name: str) -> Tuple[str, ...]:
+        """
+        :param name: The project base name.
+        :return:
+            Get the captured groups of project name, empty if not matched.
+        """
+        matcher = get_config().naming.match(name)
+        return matcher.groups() if matcher else ()
+
     def name(self) -> str:
         """
         :return:
@@ -542,8 +1217,8 @@ class Workflow(object):
             * If no project opened, It will return empty string.
         """
         prev_directory: str = self.get_previous_directory()
-        if "ExportDirectory" in globals() and prev_directory:
-            return join(prev_directory, ExportDirectory).replace('\\', '/')
+        if prev_directory:
+            return join(prev_directory, self.config.export_path).replace('\\', '/')
         return ""
 
     def get_convert_directory(self) -> str:
@@ -560,57 +1235,295 @@ class Workflow(object):
             * If no project opened, It will return empty string.
         """
         prev_directory: str = self.get_previous_directory()
-        if "ConvertDirectory" in globals() and prev_directory:
-            return join(prev_directory, ConvertDirectory).replace("\\", "/")
+        if prev_directory:
+            return join(prev_directory, self.config.convert_path).replace("\\", "/")
         return ""
 
     def get_meshmap_directory(self) -> str:
         prev_directory: str = self.get_previous_directory()
-        if "MeshMapDirectory" in globals() and prev_directory:
-            return join(prev_directory, MeshMapDirectory).replace("\\", "/")
+        if prev_directory:
+            return join(prev_directory, self.config.meshmap_path).replace("\\", "/")
         return ""
 
+    def get_sub_directory(self, path: str) -> str:
+        """
+        :param path: The sub-folder name, such as the export path of profile.
+        :return:
+            The sub-folder under root directory, empty if no project opened.
+        """
+        prev_directory: str = self.get_previous_directory()
+        if prev_directory:
+            return join(prev_directory, path).replace("\\", "/")
+        return ""
 
-class Exporter(Workflow):
-    def __init__(
-            self, shader: TextureSetWrapper, _settings: ExportSettings
-    ) -> None:
-        super().__init__()
-        self.settings: ExportSettings = _settings
-        self.need_color_correct_channels: List[str] = []
-        self.texture_set: TextureSetWrapper = shader
-        self.channel_maps = self.texture_set.get_channels()
-        self.output_path: str = self.get_output_directory()
-        self.convert_path: str = self.get_convert_directory()
-        self.mesh_map_path: str = self.get_meshmap_directory()
-        self.create_directory(self.output_path)
+    def get_history(self) -> Union[ExportHistory, None]:
+        """
+        :return:
+            The export history in root directory,
+            None if no project opened or history is off.
+        """
+        prev_directory: str = self.get_previous_directory()
+        if prev_directory and self.config.history:
+            return ExportHistory.get(prev_directory)
+        return None
 
-    def get_title(self) -> str:
+
+class ProjectSnapshot(object):
+    """
+    Cache the texture sets, channels, the parsed project title and
+    directories read from painter, it will be invalidated by painter's
+    project events, the texture set names are patched after layer stack
+    events, the channels are read again when exporting.
+    How to use :
+        Snapshot.get_texture_sets()
+        Snapshot.get_channels("Body")
+        Snapshot.get_workflow().get_output_directory()
+    """
+    def __init__(self) -> None:
+        self.texture_sets: Union[List[str], None] = None
+        self.wrappers: Dict[str, TextureSetWrapper] = {}
+        self.channels: Dict[str, Dict[str, spts.Channel]] = {}
+        self.uv_tiles: Dict[str, Union[TileSet, None]] = {}
+        self.workflow: Union[Workflow, None] = None
+
+    def invalidate(self, *_) -> None:
+        """
+        Project opened, created or closed.
+        """
+        self.workflow = None
+        self.invalidate_texture_sets()
+
+    def invalidate_texture_sets(self, *_) -> None:
+        """
+        Texture sets or channels changed.
+        """
+        self.texture_sets = None
+        self.wrappers.clear()
+        self.invalidate_channels()
+
+    def invalidate_channels(self) -> None:
+        """
+        Channels or UV tiles may be changed, the texture set names are kept.
         """
+        self.channels.clear()
+        self.uv_tiles.clear()
+
+    def patch_texture_sets(self) -> List[str]:
+        """
+        Read the texture set names again, only the caches of added, removed
+        or renamed texture sets are dropped.
         :return:
-            If texture set name is Udim, get LegacyName as title.
+            Get all texture set names.
         """
-        return self.title
+        names: List[str] = [
+            texture_set.name() for texture_set in spts.all_texture_sets()
+        ]
+        if self.texture_sets is not None and names != self.texture_sets:
+            name: str
+            for name in set(names).symmetric_difference(self.texture_sets):
+                self.wrappers.pop(name, None)
+                self.channels.pop(name, None)
+                self.uv_tiles.pop(name, None)
+        self.texture_sets = names
+        return names[:]
+
+    def get_texture_sets(self) -> List[str]:
+        """
+        :return:
+            Get all texture set names.
+        """
+        if self.texture_sets is None:
+            self.texture_sets = [
+                texture_set.name() for texture_set in spts.all_texture_sets()
+            ]
+        return self.texture_sets[:]
 
-    def get_export_name(self, ch: str) -> str:
+    def get_wrapper(self, name: str) -> TextureSetWrapper:
         """
-        :param ch:
-            The channel's name, for example : Color, Bump, Normal...
+        :param name: The texture set name.
         :return:
-            The full export name,
-            If title or export name is empty return empty string.
+            Get the cached TextureSetWrapper.
         """
-        title: str = self.get_title()
-        export_n: str = LegacyName if is_udim(self.texture_set.name) else ExportName
-        full_name: str = export_n.format(title, ch) if title and export_n else ""
-        return full_name
+        if name not in self.wrappers:
+            self.wrappers[name] = TextureSetWrapper(name)
+        return self.wrappers[name]
 
-    def get_channel_maps(self) -> list:
+    def get_channels(self, name: str) -> Dict[str, spts.Channel]:
         """
+        :param name: The texture set name.
         :return:
-            Get export channel maps.
+            Get the cached channels of texture set.
         """
-        channel_maps: list = []
+        if name not in self.channels:
+            self.channels[name] = self.get_wrapper(name).get_channels()
+        return self.channels[name]
+
+    def get_uv_tiles(self, name: str) -> Union[TileSet, None]:
+        """
+        :param name: The texture set name.
+        :return:
+            Get the cached populated UV tiles, None if unknown.
+        """
+        if name not in self.uv_tiles:
+            self.uv_tiles[name] = self.get_wrapper(name).get_uv_tiles()
+        return self.uv_tiles[name]
+
+    def get_workflow(self) -> Workflow:
+        """
+        :return:
+            Get the cached Workflow of current project.
+        """
+        if self.workflow is None:
+            self.workflow = Workflow()
+        return self.workflow
+
+
+Snapshot: ProjectSnapshot = ProjectSnapshot()
+
+
+def on_config_reloaded(_: ConfigSnapshot) -> None:
+    """
+    Drop the caches built from previous config, the parsed project name,
+    the workflow and the compiled presets.
+    """
+    Workflow.parse_name.cache_clear()
+    Presets.clear()
+    Snapshot.invalidate()
+
+
+Config.listeners.append(on_config_reloaded)
+
+
+class Exporter(Workflow):
+    def __init__(
+            self, shader: TextureSetWrapper, _settings: ExportSettings
+    ) -> None:
+        super().__init__()
+        self.settings: ExportSettings = _settings
+        self.need_color_correct_channels: List[str] = []
+        self.texture_set: TextureSetWrapper = shader
+        # Read on main thread, the convert and publish threads use them
+        # instead of painter's API.
+        self.texture_set_name: str = shader.name
+        self.is_udim_set: bool = is_udim(self.texture_set_name)
+        self.profiles: List[ExportProfile] = self.config.get_profiles(
+            _settings.get_profiles()
+        )
+        # Painter renders the highest profile, the others are derived.
+        self.profile: ExportProfile = max(self.profiles, key=lambda profile: profile.rank)
+        self.derived_profiles: List[ExportProfile] = [
+            profile for profile in self.profiles if profile is not self.profile
+        ]
+        self.preset_name: str = self.config.preset
+        self.export_list: List[dict] = []
+        self.dropped_tiles: Dict[str, TileSet] = {}
+        self.bit_depths: Dict[str, str] = {}
+        self.convert_results: Dict[str, dict] = {}
+        # The convert job signatures keyed by source.
+        self.convert_signatures: Dict[str, str] = {}
+        # The export parameters hash keyed by profile name, set on main thread.
+        self.params_hashes: Dict[str, str] = {}
+        self.export_duration: float = 0.0
+        # The texture sets exported by the same painter call,
+        # export_duration is the share of this texture set.
+        self.export_batch: int = 1
+        # The (channel label, pattern) pairs built once by get_output_patterns.
+        self.output_patterns: Union[List[Tuple[str, re.Pattern]], None] = None
+        self.manifest: Union[ExportManifest, None] = None
+        self.on_converted: Union[Callable[[dict], None], None] = None
+        self.batches: List[Union[ConvertBatch, SpoolBatch]] = []
+        self.derive_batches: List[ConvertBatch] = []
+        self.early_sources: Set[str] = set()
+        self.batch_lock: threading.Lock = threading.Lock()
+        self.cancelled: bool = False
+        self.channel_maps = self.texture_set.channels
+        self.output_path: str = self.get_sub_directory(self.profile.export_path)
+        self.convert_path: str = self.get_sub_directory(self.profile.convert_path)
+        self.mesh_map_path: str = self.get_meshmap_directory()
+        self.create_directory(self.output_path)
+
+    def get_title(self) -> str:
+        """
+        :return:
+            If texture set name is Udim, get legacy name as title.
+        """
+        return self.title
+
+    def get_export_name(self, ch: str, profile: Union[ExportProfile, None] = None) -> str:
+        """
+        :param ch:
+            The channel's name, for example : Color, Bump, Normal...
+        :param profile: The profile, default is the rendered profile.
+        :return:
+            The full export name,
+            If title or export name is empty return empty string.
+        """
+        profile = profile or self.profile
+        title: str = self.get_title()
+        export_n: str = profile.legacy_name \
+            if self.is_udim_set else profile.export_name
+        full_name: str = export_n.format(title, ch) if title and export_n else ""
+        return full_name
+
+    def get_preset_signature(self) -> tuple:
+        """
+        :return:
+            Get the signature of channel layout and export settings.
+        """
+        return (
+            tuple(self.channel_maps.keys()),
+            tuple(str(channel.format()) for channel in self.channel_maps.values()),
+            tuple(channel.label() for channel in self.channel_maps.values()),
+            self.settings.force8bits,
+            self.config.normal_map,
+            self.is_udim_set,
+            self.get_title(),
+            self.profile.get_signature(),
+            self.config.digest
+        )
+
+    def hash_params(self) -> None:
+        """
+        Hash the preset signature of each profile for the manifest,
+        it reads the channels from painter so it must run on main thread.
+        """
+        signature: tuple = self.get_preset_signature()
+        profile: ExportProfile
+        for profile in self.profiles:
+            profile_signature: tuple = signature
+            if profile is not self.profile:
+                profile_signature += (profile.get_signature(), tuple(self.config.derive.items()))
+            self.params_hashes[profile.name] = \
+                hashlib.sha1(repr(profile_signature).encode()).hexdigest()
+
+    @traced("Exporter.get_channel_maps", "export")
+    def get_channel_maps(self) -> list:
+        """
+        :return:
+            Get export channel maps, the texture sets with same signature share
+            the same channel maps, do not modify it.
+        """
+        signature: tuple = self.get_preset_signature()
+        cached: Union[tuple, None] = Presets.get(signature)
+        if cached is None:
+            self.need_color_correct_channels.clear()
+            self.bit_depths.clear()
+            cached = Presets.put(signature, (
+                self.build_channel_maps(),
+                tuple(self.need_color_correct_channels),
+                dict(self.bit_depths)
+            ))
+        channel_maps, color_correct_channels, bit_depths = cached
+        self.need_color_correct_channels[:] = color_correct_channels
+        self.bit_depths = dict(bit_depths)
+        return channel_maps
+
+    def build_channel_maps(self) -> list:
+        """
+        :return:
+            Build export channel maps.
+        """
+        channel_maps: list = []
         unique_names: Set[str] = set()
         bit_depth_8_list: Tuple[str, str, str] = (
             "ChannelFormat.sRGB8", "ChannelFormat.L8", "ChannelFormat.RGB8"
@@ -622,25 +1535,34 @@ class Exporter(Workflow):
         bit_depth_32_list: Tuple[str, str] = (
             "ChannelFormat.L32F", "ChannelFormat.RGB32F"
         )
+        packed_maps: List[PackedMap] = self.config.get_packed_maps("textures")
+        # The channels exported in packed maps only.
+        packed_labels: Set[str] = set().union(*(
+            packed.channel_labels for packed in packed_maps if packed.exclusive
+        ))
+        source_maps: Dict[str, Tuple[str, str]] = {}
         for label, channel in self.channel_maps.items():
             user_channel: str = ""
             if label.find("#") > 0:
                 user_channel, label = label.split("#")
-            if label.lower() not in ChannelMaps:
+            src_map_name: str = label.lower()
+            src_map_type: str = "virtualMap" if src_map_name == "normal" else "documentMap"
+            if src_map_name == "normal":
+                src_map_name = ("Normal_OpenGL", "Normal_DirectX")[self.config.normal_map == "open_gl"]
+            src_map_name = user_channel if channel.label() else src_map_name
+            source_maps[label.lower()] = (src_map_type, src_map_name)
+            if label.lower() not in self.config.maps:
                 warn(f"{label} not in channel lists")
                 continue
-            channel_name: str = ChannelMaps.get(label.lower(), "")
+            channel_name: str = self.config.maps.get(label.lower(), "")
             if not channel_name:
                 warn(f"Can't found channel label : {label}")
                 continue
             if channel_name in unique_names:
                 warn(f"Duplicated channel name : {channel_name}")
                 continue
-            src_map_name: str = label.lower()
-            src_map_type: str = "virtualMap" if src_map_name == "normal" else "documentMap"
-            if src_map_name == "normal":
-                src_map_name = ("Normal_OpenGL", "Normal_DirectX")[NormalMapFormat == "open_gl"]
-            src_map_name = user_channel if channel.label() else src_map_name
+            if label.lower() in packed_labels:
+                continue
             channel_format: str = channel.format()
             elements: tuple = ("L",) if str(channel_format).startswith("L") else ("R", "G", "B")
             ch_describe: dict = dict()
@@ -651,6 +1573,8 @@ class Exporter(Workflow):
             fmt_value: str = str(channel.format())
             if self.settings.force8bits:
                 parameters["bitDepth"] = "8"
+            elif self.profile.bit_depth:
+                parameters["bitDepth"] = str(self.profile.bit_depth)
             else:
                 if fmt_value in bit_depth_8_list:
                     parameters["bitDepth"] = "8"
@@ -658,6 +1582,7 @@ class Exporter(Workflow):
                     parameters["bitDepth"] = "16"
                 elif fmt_value in bit_depth_32_list:
                     parameters["bitDepth"] = "32"
+            self.bit_depths[label.lower()] = parameters.get("bitDepth", "")
             if fmt_value == "ChannelFormat.sRGB8":
                 self.need_color_correct_channels.append(channel_name)
             for component in elements:
@@ -670,328 +1595,1744 @@ class Exporter(Workflow):
             ch_describe['channels'] = channels
             ch_describe['parameters'] = parameters
             channel_maps.append(ch_describe)
+        packed: PackedMap
+        for packed in packed_maps:
+            missing: List[str] = packed.get_missing(source_maps)
+            if missing:
+                warn(f"Skip packed map {packed.name}, missing channels : {', '.join(missing)}")
+                continue
+            ch_describe = packed.build(
+                self.get_export_name(packed.name), source_maps,
+                8 if self.settings.force8bits else None
+            )
+            self.bit_depths[packed.label] = ch_describe["parameters"]["bitDepth"]
+            channel_maps.append(ch_describe)
         return channel_maps
 
+    def get_channel_formats(self) -> Dict[str, str]:
+        """
+        :return:
+            Get the channel formats, keyed by lower-case channel label,
+            the same label of config maps.
+        """
+        return {
+            key.split("#")[-1].lower(): str(channel.format())
+            for key, channel in self.channel_maps.items()
+        }
+
+    @traced("Exporter.get_export_list", "export")
     def get_export_list(self) -> List[dict]:
-        export_list: List[dict] = []
+        export_list: List[dict] = self.get_scope_export_list()
+        if self.settings.changed_only:
+            export_list = self.filter_changed(export_list)
+        return export_list
+
+    def filter_changed(self, export_list: List[dict]) -> List[dict]:
+        """
+        :param export_list: The export list.
+        :return:
+            Get the export list only contains the changed channels.
+        """
+        formats: Dict[str, str] = self.get_channel_formats()
+        dirty: Set[str] = Tracker.dirty_channels(self.texture_set_name, formats)
+        dirty |= self.get_stale_labels() & set(formats)
+        if dirty == set(formats):
+            return export_list
+        names: List[str] = [
+            name for name, labels in self.get_output_labels().items() if labels & dirty
+        ]
+        filtered: List[dict] = []
+        entry: dict
+        for entry in export_list:
+            entry_filter: dict = entry.get("filter", {})
+            output_maps: List[str] = entry_filter.get("outputMaps", [])
+            if not output_maps:
+                # One entry of all changed maps, painter resolves the preset once.
+                if names:
+                    filtered.append(dict(entry, filter=dict(
+                        entry_filter, outputMaps=names
+                    )))
+            elif set(output_maps) & set(names):
+                filtered.append(dict(entry, filter=dict(
+                    entry_filter, outputMaps=[
+                        name for name in output_maps if name in names
+                    ]
+                )))
+        return filtered
+
+    def get_stale_labels(self) -> Set[str]:
+        """
+        :return:
+            The channel labels whose outputs recorded in export history are
+            missing or modified since exported, the packed map's channels
+            for a packed output.
+        """
+        history: Union[ExportHistory, None] = self.get_history()
+        if history is None:
+            return set()
+        packing: Dict[str, PackedMap] = {
+            packed.label: packed for packed in self.config.get_packed_maps("textures")
+        }
+        stale: Set[str] = set()
+        label: str
+        outputs: List[str]
+        for label, outputs in history.get_stale_outputs(
+                self.texture_set_name, self.profile.name
+        ).items():
+            # The outputs of former export path or name are not exported any more.
+            if not any(
+                    self.is_current_output(output) and self.match_output(output)[0] == label
+                    for output in outputs
+            ):
+                continue
+            stale |= packing[label].channel_labels if label in packing else {label}
+        if stale:
+            log(f"Outputs missing or modified : {self.texture_set_name} {sorted(stale)}")
+        return stale
+
+    def is_current_output(self, image: str) -> bool:
+        """
+        :param image: The exported image path.
+        :return:
+            The image is in the output directory and format of rendered profile.
+        """
+        image = image.replace("\\", "/")
+        return image.startswith(self.output_path + "/") and \
+            image.lower().endswith("." + self.profile.export_format.lower())
+
+    def get_exported_labels(self, export_list: List[dict]) -> Set[str]:
+        """
+        :param export_list: The export list.
+        :return:
+            Get the channel labels fully exported (not limited by UV tiles).
+        """
+        labels: Set[str] = set(self.get_channel_formats())
+        names: Dict[str, Set[str]] = self.get_output_labels()
+        exported: Set[str] = set()
+        entry: dict
+        for entry in export_list:
+            entry_filter: dict = entry.get("filter", {})
+            if "uvTiles" in entry_filter:
+                continue
+            output_maps: List[str] = entry_filter.get("outputMaps", [])
+            if not output_maps:
+                return labels
+            exported.update(*(names[name] for name in output_maps if name in names))
+        return exported & labels
+
+    def get_output_labels(self) -> Dict[str, Set[str]]:
+        """
+        :return:
+            The channel labels of each output keyed by export name, a channel
+            packed exclusively is in its packed maps only.
+        """
+        labels: Set[str] = set(self.get_channel_formats())
+        packed_maps: List[PackedMap] = [
+            packed for packed in self.config.get_packed_maps("textures")
+            if not packed.get_missing(labels)
+        ]
+        packed_labels: Set[str] = set().union(*(
+            packed.channel_labels for packed in packed_maps if packed.exclusive
+        ))
+        outputs: Dict[str, Set[str]] = {
+            self.get_export_name(self.config.maps[label]): {label}
+            for label in labels if label in self.config.maps and label not in packed_labels
+        }
+        packed: PackedMap
+        for packed in packed_maps:
+            outputs[self.get_export_name(packed.name)] = packed.channel_labels
+        return outputs
+
+    @traced("Exporter.mark_exported", "export")
+    def mark_exported(self) -> None:
+        """
+        Mark the exported channels are clean.
+        """
+        Tracker.mark_clean(
+            self.texture_set_name,
+            self.get_channel_formats(),
+            self.get_exported_labels(self.export_list)
+        )
+
+    def get_scope_export_list(self) -> List[dict]:
+        """
+        :return:
+            The export list limited by scope and populated tiles,
+            the channels with the same tiles share one entry,
+            uvTiles filter is omitted if all populated tiles.
+        """
+        self.dropped_tiles.clear()
+        whole: List[dict] = [{
+            "rootPath": self.texture_set_name,
+            "exportPreset": self.preset_name
+        }]
         scope: str = self.settings.get_scope_map()
-        if scope:
-            scope_map: Dict[str, list] = self.get_scope(scope)
-            if not scope_map:
-                export_list = [{"rootPath": self.texture_set.name}]
-                return export_list
-            wildcard_range = scope_map.pop("*", [])
-            for channel in list(scope_map):
-                if channel not in ChannelMaps:
-                    continue
-                uv_tiles: List[int] = scope_map.pop(channel, [])
-                short_name: str = ChannelMaps.get(channel, "")
-                export_list.append({
-                    "rootPath": self.texture_set.name,
-                    "filter": {
-                        "outputMaps": [self.get_export_name(short_name)]
-                    }
-                })
-                if uv_tiles:
-                    export_list[-1]["filter"][""] = uv_tiles[:]
-                elif wildcard_range:
-                    export_list[-1]["filter"]["uvTiles"] = wildcard_range[:]
-        else:
-            export_list = [{"rootPath": self.texture_set.name}]
+        if not scope.strip():
+            return whole
+        if not compile_scope(scope):
+            err(f"Invalid export range, nothing exported : {scope}")
+            return []
+        scope_map: Dict[str, TileSet] = self.get_scope(scope)
+        if not scope_map:
+            log(f"No channels in export range : {self.texture_set_name}")
+            return []
+        occupied: Union[TileSet, None] = Snapshot.get_uv_tiles(self.texture_set_name)
+        channel_tiles: Dict[str, TileSet] = {}
+        channel: str
+        tiles: TileSet
+        for channel, tiles in scope_map.items():
+            if occupied is not None:
+                if not tiles.is_all and tiles - occupied:
+                    self.dropped_tiles[channel] = tiles - occupied
+                covered: TileSet = tiles & occupied
+                tiles = TileSet.All if covered == occupied else covered
+            channel_tiles[channel] = tiles
+        groups: Dict[TileSet, List[str]] = {}
+        name: str
+        labels: Set[str]
+        for name, labels in self.get_output_labels().items():
+            # A packed map is exported in the tiles of any packed channel.
+            tiles = TileSet()
+            for channel in labels & channel_tiles.keys():
+                tiles = tiles | channel_tiles[channel]
+            if tiles:
+                groups.setdefault(tiles, []).append(name)
+        export_list: List[dict] = []
+        names: List[str]
+        for tiles, names in groups.items():
+            entry_filter: dict = {"outputMaps": names}
+            if not tiles.is_all:
+                entry_filter["uvTiles"] = tiles.to_uv_tiles()
+            export_list.append({
+                "rootPath": self.texture_set_name,
+                "exportPreset": self.preset_name,
+                "filter": entry_filter
+            })
         return export_list
 
-    @staticmethod
-    def get_size() -> int:
+    def get_size(self) -> int:
         return {
             4096: 12,
             2048: 11,
             1024: 10,
             512: 9
-        }.get(OutputSize, 2048)
-
-    def get_scope(self, expression: str) -> Dict[str, list]:
-        def normalize_u(num: int) -> int:
-            return (num - 1001) % 10
-
-        def normalize_v(num: int) -> int:
-            return (num - 1001) // 10
-
-        def normalize(num: int) -> List[int]:
-            return [normalize_u(num), normalize_v(num)]
-
-        range_maps: Dict[str, list] = {}
-        if not expression:
-            return range_maps
-        channel_expression: str = r"(\*|\w[\w\d]+)"
-        num_expression: str = r"(\*|(?:[1-9]\d{3})(?:-[1-9]\d{3})?)"
-        parser: str = f"{channel_expression}:{num_expression}"
-        expressions: List[Tuple[str, str]] = re.findall(parser, expression)
-        if not expressions:
-            return range_maps
-        is_wildcard_setup: bool = False
-        all_range_buffers: List[int] = []
+        }.get(self.profile.output_size, 2048)
+
+    def get_scope(self, expression: str) -> Dict[str, TileSet]:
+        """
+        :param expression: The scope, such as "*:1001-1010;diffuse:!1005".
+        :return:
+            The tiles keyed by channel label, the wildcard is expanded
+            to the channels of this texture set.
+        """
         channel: str
-        numbers: str
-        for channel, numbers in expressions:
-            if channel == "*":
-                is_wildcard_setup = True
-            elif channel not in ChannelMaps.keys():
+        for channel in compile_scope(expression):
+            if channel != "*" and channel not in self.config.maps:
                 warn(f"The channel is not in list : {channel}")
-                continue
-            number_range_buffers: List[List[int, int]] = []
-            if is_wildcard_setup:
-                all_range_buffers: List[List[int, int]] = number_range_buffers
-            if re.match(r"[1-9]\d{3}-[1-9]\d{3}", numbers):
-                start, end = [int(from_to) for from_to in numbers.split("-")]
-                if end <= start:
-                    warn(f"Invalid UDIM range : {start}-{end}")
-                    continue
-                numbers: List[int] = list(range(start, end + 1))
-                number_range_buffers: List[List[int, int]] = [
-                    [normalize_u(num), normalize_v(num)] for num in numbers
-                ]
-            elif re.match(r"[1-9]\d{3}", numbers):
-                number: int = int(numbers)
-                number_range_buffers = [normalize(number)]
-            # A wildcard matched : diffuse:*
-            elif numbers == "*":
-                number_range_buffers = []
-            else:
-                warn(f"Invalid range expression : {numbers}")
-            if channel in range_maps:
-                range_maps[channel].extend(number_range_buffers)
-            else:
-                range_maps[channel] = number_range_buffers[:]
-        if is_wildcard_setup:
-            for channel in self.channel_maps:
-                if channel not in range_maps:
-                    range_maps[channel] = all_range_buffers
-        return range_maps
-
-    def get_mesh_maps(self) -> List[dict]:
-        maps: List[dict] = []
+        return {
+            channel: tiles for channel, tiles
+            in resolve_scope(expression, self.get_channel_formats()).items()
+            if channel in self.config.maps
+        }
+
+    def get_mesh_map_outputs(self) -> Dict[str, dict]:
+        """
+        :return:
+            The mesh map descriptions keyed by output name (mesh map name or
+            packed map name), the bit-depth and channels are from config.
+        """
+        outputs: Dict[str, dict] = {}
         title: str = self.get_title()
+        settings: Dict[str, Tuple[int, int]] = self.config.get_mesh_map_settings()
         # Combined mesh map
         if self.settings.combined:
-            ch_describe: dict = dict()
-            ch_describe["fileName"] = MeshMapName.format(title, "CombinedMap")
-            ch_describe["channels"] = [{
-                "destChannel": "R",
-                "srcChannel": "L",
-                "srcMapType": "meshMap",
-                "srcMapName": "ambient_occlusion"
-            }, {
-                "destChannel": "G",
-                "srcChannel": "L",
-                "srcMapType": "meshMap",
-                "srcMapName": "curvature"
-            }, {
-                "destChannel": "B",
-                "srcChannel": "L",
-                "srcMapType": "meshMap",
-                "srcMapName": "thickness"
-            }]
-            ch_describe['parameters'] = dict(fileFormat=ExportFormat, bitDepth="8")
-            maps.append(ch_describe)
+            packed: PackedMap
+            for packed in self.config.get_packed_maps("meshmaps") or [
+                self.get_default_combined_map()
+            ]:
+                outputs[packed.name] = packed.build(
+                    self.config.meshmap_name.format(title, packed.name), {}
+                )
+                outputs[packed.name]["parameters"]["fileFormat"] = self.config.export_format
         # Not combined mesh map
         else:
-            for mesh_map in _MeshMaps:
-                ch_describe: dict = dict()
-                ch_describe["fileName"] = MeshMapName.format(title, mesh_map)
-                channels: List[dict] = []
-                for ch in ["R", "G", "B"]:
-                    channel_description = {
-                        "destChannel": ch,
-                        "srcChannel": ch,
+            mesh_map: str
+            for mesh_map, (bit_depth, channel_count) in settings.items():
+                components: Tuple[str, ...] = ("L",) if channel_count == 1 else ("R", "G", "B")
+                outputs[mesh_map] = {
+                    "fileName": self.config.meshmap_name.format(title, mesh_map),
+                    "channels": [{
+                        "destChannel": component,
+                        "srcChannel": component,
                         "srcMapType": "meshMap",
                         "srcMapName": mesh_map
-                    }
-                    channels.append(channel_description)
-                ch_describe["channels"] = channels
-                ch_describe['parameters'] = dict(fileFormat=ExportFormat, bitDepth="8")
-                maps.append(ch_describe)
-        return maps
+                    } for component in components],
+                    "parameters": dict(
+                        fileFormat=self.config.export_format, bitDepth=str(bit_depth)
+                    )
+                }
+        return outputs
+
+    @staticmethod
+    def get_default_combined_map() -> PackedMap:
+        """
+        :return:
+            The combined map if no meshmaps target in packing,
+            ambient occlusion, curvature and thickness in R, G, B of 8 bits.
+        """
+        combined: Tuple[str, ...] = ("ambient_occlusion", "curvature", "thickness")
+        return PackedMap("CombinedMap", {
+            "target": "meshmaps",
+            "channels": {
+                component: f"mesh:{mesh_map}"
+                for component, mesh_map in zip(("R", "G", "B"), combined)
+            },
+            "bit_depth": 8
+        })
+
+    def get_bake_inputs(self) -> list:
+        """
+        :return:
+            The inputs of baked mesh maps known by painter, the mesh file,
+            texture set resolution and bake parameters (painter 2021.1 or later).
+        """
+        inputs: list = []
+        last_mesh = getattr(sppj, "last_imported_mesh_path", None)
+        mesh: str = last_mesh() if last_mesh is not None else ""
+        try:
+            stat: os.stat_result = os.stat(mesh)
+            inputs.append([mesh, stat.st_mtime_ns, stat.st_size])
+        except (OSError, TypeError, ValueError):
+            inputs.append([mesh])
+        get_resolution = getattr(self.texture_set.texture_set, "get_resolution", None)
+        if get_resolution is not None:
+            resolution = get_resolution()
+            inputs.append([resolution.width, resolution.height])
+        if spbk is not None:
+            try:
+                parameters = spbk.BakingParameters.from_texture_set(self.texture_set.texture_set)
+                inputs.append(sorted(
+                    f"{key}={value}" for key, value in parameters.get().items()
+                ))
+            except Exception as unknown_error:
+                warn(f"Can't read bake parameters : {unknown_error}")
+        return inputs
+
+    def get_mesh_map_signatures(self, outputs: Dict[str, dict]) -> Dict[str, str]:
+        """
+        :param outputs: The mesh map descriptions keyed by output name.
+        :return:
+            The hash of bake inputs and export settings keyed by output name.
+        """
+        common: list = [
+            self.get_bake_inputs(), self.get_size(), self.config.padding_algorithm,
+            self.config.dilation_distance, self.config.dithering
+        ]
+        return {
+            name: hashlib.sha1(
+                json.dumps([common, description], sort_keys=True, default=str).encode()
+            ).hexdigest()
+            for name, description in outputs.items()
+        }
+
+    def get_export_texture_presets(self) -> dict:
+        return {"name": self.preset_name, "maps": self.get_channel_maps()}
+
+    def get_export_path(self) -> str:
+        return self.output_path
+
+    @traced("Exporter.get_parameters", "export")
+    def get_parameters(self) -> dict:
+        export_format: str = self.profile.export_format
+        export_path: str = self.get_export_path()
+        presets: dict = self.get_export_texture_presets()
+        self.export_list = self.get_export_list()
+        return {
+            "exportPath": export_path,
+            "exportShaderParams": self.config.export_shader_params,
+            "defaultExportPreset": self.preset_name,
+            "exportPresets": [presets],
+            "exportList": self.export_list,
+            "exportParameters": [{
+                "parameters": {
+                    "fileFormat": export_format,
+                    "dithering": self.config.dithering,
+                    "sizeLog2": self.get_size(),
+                    "paddingAlgorithm": self.config.padding_algorithm,
+                    "dilationDistance": self.config.dilation_distance
+                }
+            }]
+        }
+
+    def get_output_patterns(self) -> List[Tuple[str, re.Pattern]]:
+        """
+        :return:
+            Get the (channel label, pattern) pairs to match the exported file,
+            the pattern captures the UDIM number as group "udim".
+            The pairs are built once per exporter.
+        """
+        if self.output_patterns is None:
+            self.output_patterns = [
+                (label, self.get_name_pattern(self.get_export_name(name, profile)))
+                for profile in [self.profile] + self.derived_profiles
+                for label, name in self.config.outputs.items()
+            ]
+        return self.output_patterns
+
+    def get_name_pattern(self, template: str) -> re.Pattern:
+        """
+        :param template: The export name template, such as "$textureSet/C1(_$udim)".
+        :return:
+            The pattern to match the exported file of this texture set,
+            it captures the UDIM number as group "udim".
+        """
+        pattern: str = re.escape(template)
+        pattern = pattern.replace(re.escape("("), "(?:")
+        pattern = pattern.replace(re.escape(")"), ")?")
+        pattern = pattern.replace(
+            re.escape("$textureSet"), re.escape(self.texture_set_name)
+        )
+        pattern = pattern.replace(re.escape("$udim"), r"(?P<udim>\d{4})")
+        pattern = re.sub(r"\\\$[A-Za-z]+", ".+?", pattern)
+        return re.compile(r"(?:^|/)" + pattern + r"\.\w+$")
+
+    def match_output(self, image: str) -> Tuple[str, Union[int, None]]:
+        """
+        :param image: The exported image path.
+        :return:
+            Get the (channel label, UDIM number) of exported image,
+            label is empty string if no matched.
+        """
+        udim: Union[int, None] = int(self.texture_set_name) \
+            if self.is_udim_set else None
+        label: str
+        pattern: re.Pattern
+        for label, pattern in self.get_output_patterns():
+            matcher = pattern.search(image)
+            if matcher:
+                if "udim" in pattern.groupindex and matcher.group("udim"):
+                    udim = int(matcher.group("udim"))
+                return label, udim
+        return "", udim
+
+    @traced("Exporter.fetch_textures", "export")
+    def fetch_textures(self, textures: Dict[Tuple[str, str], List[str]]) -> List[str]:
+        """
+        :param textures: The export result textures, keyed by (texture set, stack).
+        :return:
+            Get the exported files belong to this texture set.
+        """
+        images: List[str] = []
+        key: Tuple[str, str]
+        for key, files in textures.items():
+            if key[0] == self.texture_set_name:
+                images.extend(texture.replace("\\", "/") for texture in files)
+        return images
+
+    def fetch_convert_path(
+            self, image: str, profile: Union[ExportProfile, None] = None
+    ) -> Tuple[str, str]:
+        """
+        :param image: The exported image path.
+        :param profile: The profile of image, default is the rendered profile.
+        :return:
+            Get the (source, destination) convert pair.
+        """
+        profile = profile or self.profile
+        output_path = reverse_replace(
+            dirname(image), profile.export_path, profile.convert_path, 1
+        )
+        output_file = reverse_replace(
+            basename(image), profile.export_format, profile.convert_format, 1
+        )
+        return image, join(output_path, output_file).replace("\\", "/")
+
+    def check_status(
+            self, status: spex.ExportStatus, message: str, textures: List[str]
+    ) -> bool:
+        """
+        Log the export status.
+        :param status: The export status.
+        :param message: The export message.
+        :param textures: The exported files of this texture set.
+        :return:
+            If export successful and any texture exported, return True.
+        """
+        assert isinstance(status, spex.ExportStatus)
+        if not textures:
+            log("Skip : {0}".format(self.texture_set_name))
+        if status == spex.ExportStatus.Success:
+            return bool(textures)
+        elif status == spex.ExportStatus.Cancelled:
+            log("Export process has been cancelled.")
+        elif status == spex.ExportStatus.Warning:
+            warn(message)
+        elif status == spex.ExportStatus.Error:
+            err(message)
+        return False
+
+    def export_textures(self) -> List[str]:
+        """
+        Export this texture set only, without converting.
+        :return:
+            The exported files, empty if failed.
+        """
+        self.need_color_correct_channels.clear()
+        if not self.valid:
+            err("Project name is incorrect!")
+            return []
+        output_parameters: dict = self.get_parameters()
+        if not output_parameters["exportList"]:
+            log(f"No channels to export : {self.texture_set_name}")
+            return []
+        self.hash_params()
+        start: float = time.perf_counter()
+        with ExportWatch([self]), span(
+                "spex.export_project_textures", "painter", texture_set=self.texture_set_name
+        ):
+            export_result = spex.export_project_textures(output_parameters)
+        self.export_duration = time.perf_counter() - start
+        textures: List[str] = self.fetch_textures(export_result.textures)
+        if self.check_status(export_result.status, export_result.message, textures):
+            self.mark_exported()
+            return textures
+        return []
+
+    @traced("Exporter.convert_textures", "convert")
+    def convert_textures(self, textures: List[str]) -> List[str]:
+        """
+        Derive the other profiles, then convert the profiles need convert.
+        :param textures: The exported files of this texture set.
+        :return:
+            The converted files, if convert is off, return the textures.
+        """
+        outputs: List[Tuple[ExportProfile, List[str]]] = \
+            [(self.profile, textures)] + self.derive_textures(textures)
+        files: List[str] = []
+        convert_pairs: List[Tuple[str, str]] = []
+        profile: ExportProfile
+        images: List[str]
+        for profile, images in outputs:
+            if self.settings.convert and profile.convert:
+                pairs: List[Tuple[str, str]] = [
+                    self.fetch_convert_path(image, profile) for image in images
+                ]
+                convert_pairs.extend(pairs)
+                files.extend(destination for _, destination in pairs)
+            else:
+                files.extend(images)
+        if convert_pairs and self.multiprocess_convert(convert_pairs) != 0:
+            files = []
+        if self.manifest is not None:
+            for profile, images in outputs:
+                self.manifest.add(self, images, profile)
+        return files
+
+    def get_derive_path(self, image: str, profile: ExportProfile) -> str:
+        """
+        :param image: The exported image of rendered profile.
+        :param profile: The derived profile.
+        :return:
+            The derived image path named by profile, empty if not matched.
+        """
+        label, udim = self.match_output(image)
+        if not label:
+            return ""
+        name: str = expand_name(
+            self.get_export_name(self.config.outputs[label], profile), {
+                "textureSet": self.texture_set_name,
+                "udim": "" if udim is None or self.is_udim_set else str(udim)
+            }
+        )
+        return join(
+            self.get_sub_directory(profile.export_path),
+            f"{name}.{profile.export_format}"
+        ).replace("\\", "/")
+
+    @traced("Exporter.derive_textures", "derive")
+    def derive_textures(self, textures: List[str]) -> List[Tuple[ExportProfile, List[str]]]:
+        """
+        Resize and re-format the rendered textures into the derived profiles,
+        all profiles are submitted at once to derive pool.
+        :param textures: The exported files of rendered profile.
+        :return:
+            The (profile, derived files) pairs, the failed files are excluded.
+        """
+        if not self.derived_profiles or not textures or self.cancelled:
+            return []
+        tool: str = self.config.get_oiiotool()
+        filter_name: str = self.config.derive.get("filter", "lanczos")
+        method: str = self.config.derive.get("method", "auto")
+        submitted: List[Tuple[ExportProfile, ConvertBatch, Union[ConvertCache, None]]] = []
+        profile: ExportProfile
+        for profile in self.derived_profiles:
+            if profile.bit_depth > (self.profile.bit_depth or 64):
+                warn(
+                    f"Profile {profile.name} is derived from lower bit-depth "
+                    f"{self.profile.bit_depth} bits of {self.profile.name}."
+                )
+            scale: float = profile.output_size / self.profile.output_size
+            jobs: List[ConvertJob] = []
+            image: str
+            for image in textures:
+                destination: str = self.get_derive_path(image, profile)
+                if not destination:
+                    warn(f"Can't derive unknown channel : {image}")
+                    continue
+                os.makedirs(dirname(destination), exist_ok=True)
+                srgb: bool = self.config.outputs.get(self.match_output(image)[0]) \
+                    in self.need_color_correct_channels
+                jobs.append(DeriveJob(
+                    image, destination, scale, profile.bit_depth, tool,
+                    filter_name, srgb, method
+                ))
+            cache: Union[ConvertCache, None] = ConvertCache.get(
+                self.get_sub_directory(profile.export_path)
+            ) if self.config.convert_cache else None
+            batch: ConvertBatch = DerivePool.submit(jobs, cache)
+            with self.batch_lock:
+                self.derive_batches.append(batch)
+            submitted.append((profile, batch, cache))
+        if self.cancelled:
+            for _, batch, _ in submitted:
+                batch.cancel()
+        outputs: List[Tuple[ExportProfile, List[str]]] = []
+        for profile, batch, cache in submitted:
+            results: List[ConvertResult] = batch.wait()
+            if cache is not None:
+                cache.save()
+            result: ConvertResult
+            for result in results:
+                if not result.successful:
+                    warn(f"Failed to derive : {result.destination}\n{result.stderr}")
+            derived: List[str] = [
+                result.destination for result in results if result.successful
+            ]
+            log(f"Derived : {self.texture_set_name} {profile.name} {len(derived)} files")
+            outputs.append((profile, derived))
+        with self.batch_lock:
+            self.derive_batches.clear()
+        return outputs
+
+    @traced("Exporter.publish_textures", "publish")
+    def publish_textures(self, files: List[str]) -> int:
+        """
+        Run the publisher with texture set name and the output files.
+        :param files: The output files.
+        :return:
+            The publisher's return code.
+        """
+        if not self.config.publisher or not files:
+            return 0
+        process: subprocess.Popen = subprocess.Popen(
+            [self.config.publisher, self.texture_set_name] + files
+        )
+        return_code: int = process.wait()
+        if return_code == 0:
+            log(f"Published : {self.texture_set_name}")
+        else:
+            warn(f"Publish error occurred : {self.texture_set_name}")
+        return return_code
+
+    def plan_textures(self, plan: ExportPlan, textures: List[str]) -> None:
+        """
+        Add the files of this texture set into plan, the exported files of
+        rendered profile, the derived files and the converted files.
+        :param plan: The export plan.
+        :param textures: The files listed by painter for this texture set.
+        """
+        formats: Dict[str, str] = self.get_channel_formats()
+        dirty: Set[str] = Tracker.dirty_channels(self.texture_set_name, formats) | \
+            self.get_stale_labels()
+        packed_labels: Dict[str, Set[str]] = {
+            packed.label: packed.channel_labels
+            for packed in self.config.get_packed_maps("textures")
+        }
+        outputs: List[Tuple[ExportProfile, PlanItem]] = []
+        image: str
+        for image in textures:
+            label, udim = self.match_output(image)
+            channel_format: str = formats.get(label, "").split(".")[-1]
+            item: PlanItem = plan.add(PlanItem(
+                self.texture_set_name, self.profile.name, label, udim, image, "export",
+                self.profile.output_size, self.profile.output_size,
+                1 if channel_format.startswith("L") else 3,
+                int(self.bit_depths.get(label) or 8)
+            ))
+            item.dirty = bool(packed_labels.get(label, {label}) & dirty)
+            outputs.append((self.profile, item))
+            profile: ExportProfile
+            for profile in self.derived_profiles:
+                destination: str = self.get_derive_path(image, profile)
+                if destination:
+                    outputs.append((profile, plan.add(PlanItem(
+                        item.texture_set, profile.name, label, udim, destination,
+                        "derive", profile.output_size, profile.output_size,
+                        item.channels, profile.bit_depth or item.bit_depth, image
+                    ))))
+        if not self.settings.convert:
+            return
+        source: PlanItem
+        for profile, source in outputs:
+            if profile.convert:
+                plan.add(PlanItem(
+                    source.texture_set, profile.name, source.channel, source.udim,
+                    self.fetch_convert_path(source.file, profile)[1], "convert",
+                    source.width, source.height, source.channels, source.bit_depth,
+                    source.file
+                ))
+
+    def report_dropped_tiles(self) -> None:
+        """
+        Log the requested tiles not populated in this texture set.
+        """
+        channel: str
+        tiles: TileSet
+        for channel, tiles in sorted(self.dropped_tiles.items()):
+            log(
+                f"Dropped empty tiles : {self.texture_set_name} "
+                f"{channel} {tiles.to_expression()}"
+            )
+
+    @staticmethod
+    @traced("Exporter.create_directory", "io")
+    def create_directory(directory: str) -> str:
+        if isdir(directory):
+            return ""
+        try:
+            os.mkdir(directory)
+        except FileExistsError as file_exists_error:
+            # Created by another conversion at the same time.
+            if isdir(directory):
+                return ""
+            warn(f"The directory is exists : {file_exists_error}")
+            raise
+        except Exception as unknown_error:
+            err(f"Can't create directory : {unknown_error}")
+            raise
+        else:
+            log(f"Created : {directory}")
+        return directory
+
+    def get_convert_command(self, source: str, destination: str) -> List[str]:
+        """
+        :param source: The exported image.
+        :param destination: The converted image.
+        :return:
+            The converter command, color correct if the channel is sRGB.
+        """
+        command: List[str] = [self.config.converter] + _MakeTxOptions
+        if self.need_color_convert(source):
+            command = command + Color_Correct_Option
+        return command + ["-o", destination, source]
+
+    def need_color_convert(self, source: str) -> bool:
+        """
+        :param source: The exported image.
+        :return:
+            Color correct is on and the channel is sRGB.
+        """
+        if not self.settings.color_correct:
+            return False
+        label: str = self.match_output(source)[0]
+        return self.config.outputs.get(label) in self.need_color_correct_channels
+
+    @traced("Exporter.multiprocess_convert", "convert")
+    def multiprocess_convert(self, convert_pairs: List[Tuple[str, str]]) -> int:
+        """
+        Convert the images by converter pool or spool directory.
+        :param convert_pairs: The (source, destination) pairs.
+        :return:
+            0 if all converted successful (or spooled without waiting),
+            otherwise 1.
+        """
+        def converted(result: ConvertResult) -> None:
+            self.convert_results[result.source] = result.to_dict()
+            if not result.successful:
+                warn(f"Failed to convert : {result.source}\n{result.stderr}")
+            if self.on_converted is not None:
+                self.on_converted(result.to_dict())
+
+        if self.cancelled:
+            return 1
+        convert_queue: Union[ConverterPool, SpoolQueue] = get_convert_queue(self.config)
+        with self.batch_lock:
+            early_sources: Set[str] = self.early_sources
+            self.early_sources = set()
+        jobs: List[ConvertJob] = [
+            self.get_convert_job(source, destination, convert_queue.name)
+            for source, destination in convert_pairs if source not in early_sources
+        ]
+        cache: Union[ConvertCache, None] = \
+            ConvertCache.get(self.convert_path) if self.config.convert_cache else None
+        with self.batch_lock:
+            self.batches.append(convert_queue.submit(jobs, cache))
+            batches: List[Union[ConvertBatch, SpoolBatch]] = self.batches
+            self.batches = []
+        expected: int = len(jobs) + len(early_sources)
+        if self.cancelled:
+            for batch in batches:
+                batch.cancel()
+        if isinstance(convert_queue, SpoolQueue) and not self.config.spool.get("wait", 1):
+            log(f"Convert spooled : {self.texture_set_name} {expected} jobs")
+            return 0
+        results: List[ConvertResult] = []
+        for batch in batches:
+            results.extend(batch.wait(converted))
+        if cache is not None:
+            cache.save()
+            self.report_cache(results)
+        if len(results) == expected and all(result.successful for result in results):
+            log("Convert successful.")
+            return 0
+        warn("Convert error occurred.")
+        return 1
+
+    def get_convert_job(self, source: str, destination: str, queue_name: str) -> ConvertJob:
+        """
+        :param source: The exported image.
+        :param destination: The converted image.
+        :param queue_name: The backend name of converter pool, or "spool".
+        :return:
+            The convert job, the destination directory will be created.
+        """
+        self.create_directory(dirname(destination))
+        command: List[str] = self.get_convert_command(source, destination)
+        # Backend, options, color correct and converter version, without paths.
+        signature: str = "|".join(
+            (queue_name, " ".join(command[1:-3]), get_converter_version(self.config.converter))
+        )
+        color_convert: Union[Tuple[str, str], None] = \
+            tuple(Color_Correct_Option[1:]) if self.need_color_convert(source) else None
+        self.convert_signatures[source] = signature
+        return ConvertJob(source, destination, command, signature, color_convert)
+
+    def convert_early(self, image: str) -> bool:
+        """
+        Convert one exported image while painter is exporting the others,
+        called by watcher thread, painter's API must not be called here.
+        :param image: The written image.
+        :return:
+            True if the image belongs to this texture set.
+        """
+        if self.cancelled or not self.match_output(image)[0]:
+            return False
+        with self.batch_lock:
+            if image in self.early_sources:
+                return True
+            self.early_sources.add(image)
+        convert_queue: Union[ConverterPool, SpoolQueue] = get_convert_queue(self.config)
+        source, destination = self.fetch_convert_path(image)
+        cache: Union[ConvertCache, None] = \
+            ConvertCache.get(self.convert_path) if self.config.convert_cache else None
+        batch = convert_queue.submit(
+            [self.get_convert_job(source, destination, convert_queue.name)], cache
+        )
+        with self.batch_lock:
+            self.batches.append(batch)
+        return True
+
+    def report_cache(self, results: List[ConvertResult]) -> None:
+        """
+        Log the convert cache hit rate and time saved.
+        """
+        if not results:
+            return
+        hits: int = sum(1 for result in results if result.cached)
+        saved: float = sum(result.saved for result in results)
+        log(
+            f"Convert cache : {self.texture_set_name} "
+            f"{hits}/{len(results)} hits ({hits / len(results):.0%}), "
+            f"saved {saved:.2f}s"
+        )
+
+    def cancel_convert(self) -> None:
+        """
+        Cancel the pending conversion and kill the running converters.
+        """
+        self.cancelled = True
+        with self.batch_lock:
+            batches: List[Union[ConvertBatch, SpoolBatch]] = \
+                list(self.batches) + list(self.derive_batches)
+        for batch in batches:
+            batch.cancel()
+
+
+class ExportManifest(object):
+    """
+    Machine-readable record of an export run, one record per exported file.
+    The manifest will be written as JSON into the manifest directory,
+    next to the export and convert directories.
+    """
+    def __init__(self, workflow: Workflow) -> None:
+        self.workflow: Workflow = workflow
+        self.started: float = time.time()
+        self.records: List[dict] = []
+        self.lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def get_size(file: str) -> Union[int, None]:
+        try:
+            return os.path.getsize(file)
+        except OSError:
+            return None
+
+    def add(
+            self,
+            exporter: Exporter,
+            textures: List[str],
+            profile: Union[ExportProfile, None] = None
+    ) -> None:
+        """
+        :param exporter: The exporter exported the textures.
+        :param textures: The exported files.
+        :param profile: The profile of files, default is the rendered profile.
+        """
+        profile = profile or exporter.profile
+        params_hash: Union[str, None] = exporter.params_hashes.get(profile.name)
+        records: List[dict] = []
+        image: str
+        for image in textures:
+            label, udim = exporter.match_output(image)
+            converted: Union[str, None] = None
+            convert_duration: Union[float, None] = None
+            convert_cached: bool = False
+            result: Union[dict, None] = exporter.convert_results.get(image)
+            convert_params: Union[str, None] = None
+            if image in exporter.convert_signatures:
+                convert_params = hashlib.sha1(
+                    exporter.convert_signatures[image].encode()
+                ).hexdigest()
+            if result is not None:
+                convert_duration = result["duration"]
+                convert_cached = result.get("cached", False)
+                if result["return_code"] == 0:
+                    converted = result["destination"]
+            records.append({
+                "texture_set": exporter.texture_set_name,
+                "profile": profile.name,
+                "derived": profile is not exporter.profile,
+                "channel": label,
+                "udim": udim,
+                "source": image,
+                "converted": converted,
+                "source_bytes": self.get_size(image),
+                "converted_bytes": self.get_size(converted) if converted else None,
+                "bit_depth": str(profile.bit_depth)
+                if profile is not exporter.profile and profile.bit_depth
+                else exporter.bit_depths.get(label, ""),
+                "export_duration": exporter.export_duration,
+                "export_batch": exporter.export_batch,
+                "convert_duration": convert_duration,
+                "convert_cached": convert_cached,
+                "params_hash": params_hash,
+                "convert_params": convert_params
+            })
+        with self.lock:
+            self.records.extend(records)
+
+    def get_manifest_directory(self) -> str:
+        prev_directory: str = self.workflow.get_previous_directory()
+        if prev_directory:
+            return join(prev_directory, self.workflow.config.manifest_path).replace("\\", "/")
+        return ""
+
+    @traced("ExportManifest.write", "io")
+    def write(self) -> str:
+        """
+        Write the manifest, and record the run into export history in background.
+        :return:
+            The manifest file path, empty string if nothing written.
+        """
+        if self.records:
+            self.record_history()
+        directory: str = self.get_manifest_directory()
+        if not directory or not self.records:
+            return ""
+        Exporter.create_directory(directory)
+        stamp: str = time.strftime("%Y%m%d_%H%M%S", time.localtime(self.started))
+        manifest_file: str = join(
+            directory, f"{self.workflow.get_title()}_{stamp}.json"
+        ).replace("\\", "/")
+        data: dict = {
+            "config": self.workflow.config.config_name,
+            "project": self.workflow.name(),
+            "title": self.workflow.get_title(),
+            "started": self.started,
+            "finished": time.time(),
+            "export_directory": self.workflow.get_output_directory(),
+            "convert_directory": self.workflow.get_convert_directory(),
+            "records": self.records
+        }
+        try:
+            with open(manifest_file, "w") as file_handle:
+                json.dump(data, file_handle, indent=4)
+        except OSError as os_error:
+            err(f"Failed to write manifest : {os_error}")
+            return ""
+        log(f"Manifest : {manifest_file}")
+        return manifest_file
+
+    def record_history(self) -> Union[threading.Thread, None]:
+        """
+        Hash the outputs and write the jobs into export history by a thread,
+        the files are not read in main thread.
+        :return:
+            The started thread, None if history is off.
+        """
+        history: Union[ExportHistory, None] = self.workflow.get_history()
+        if history is None:
+            return None
+        run: dict = {
+            "project": self.workflow.name(),
+            "title": self.workflow.get_title(),
+            "config": self.workflow.config.config_name,
+            "started": self.started,
+            "finished": time.time()
+        }
+        thread: threading.Thread = threading.Thread(
+            target=history.add_run, args=(run, list(self.records)),
+            name="SurF-History", daemon=True
+        )
+        thread.start()
+        return thread
+
+
+def start_trace() -> bool:
+    """
+    :return:
+        Tracing is started, the trace config is on.
+    """
+    if get_config().trace:
+        Tracer.start()
+        return True
+    return False
+
 
-    def get_export_texture_presets(self) -> dict:
-        return {"name": ExportPreset, "maps": self.get_channel_maps()}
+def finish_trace(workflow: Workflow) -> str:
+    """
+    Stop tracing, write the Chrome trace into "Traces" of manifest directory
+    and log the summary of each phase.
+    :param workflow: The workflow of project.
+    :return:
+        The trace file, empty if not tracing or nothing traced.
+    """
+    if not Tracer.enabled:
+        return ""
+    Tracer.stop()
+    directory: str = ExportManifest(workflow).get_manifest_directory()
+    if not directory:
+        return ""
+    trace_file: str = join(
+        directory, "Traces", f"{workflow.get_title()}_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    ).replace("\\", "/")
+    try:
+        trace_file = Tracer.write(trace_file)
+    except OSError as os_error:
+        err(f"Failed to write trace : {os_error}")
+        return ""
+    if trace_file:
+        Tracer.log_summary()
+        log(f"Trace : {trace_file}")
+    return trace_file
 
-    def get_export_mesh_map_presets(self) -> dict:
-        return {"name": ExportPreset, "maps": self.get_mesh_maps()}
 
-    def get_export_path(self) -> str:
-        return self.output_path
+class ExportWatch(object):
+    """
+    Convert each exported file as soon as painter finished writing it,
+    so converting overlaps the export of remaining files.
+    The files not caught by watcher are converted after export as usual.
+    The watcher thread never calls painter's API, it only reads the texture
+    set name and output patterns captured on main thread.
+    How to use :
+        with ExportWatch([exporter]):
+            spex.export_project_textures(parameters)
+    """
+    def __init__(self, exporters: List["Exporter"]) -> None:
+        self.exporters: List[Exporter] = [
+            exporter for exporter in exporters
+            if exporter.config.watch_export and exporter.settings.convert
+            and exporter.profile.convert and not exporter.settings.mesh_map
+        ]
+        exporter: Exporter
+        for exporter in self.exporters:
+            # Built on main thread before watching, the watcher thread
+            # only matches the captured name and patterns.
+            exporter.get_output_patterns()
+        self.watchers: List[FolderWatcher] = [
+            FolderWatcher(directory, self.written)
+            for directory in sorted({exporter.output_path for exporter in self.exporters})
+        ]
+
+    def written(self, image: str) -> None:
+        exporter: Exporter
+        for exporter in self.exporters:
+            if exporter.convert_early(image):
+                return
+
+    def __enter__(self) -> "ExportWatch":
+        watcher: FolderWatcher
+        for watcher in self.watchers:
+            watcher.start()
+        return self
 
+    def __exit__(self, *_) -> None:
+        watcher: FolderWatcher
+        for watcher in self.watchers:
+            watcher.stop()
+
+
+class BatchExporter(object):
+    """
+    Export all texture sets by one export_project_textures call.
+    The texture sets with same channel layout share one preset,
+    the export list and presets are combined into one parameters,
+    the export result will be split back to each texture set.
+    """
+    def __init__(
+            self,
+            shaders: List[TextureSetWrapper],
+            _settings: ExportSettings,
+            manifest: Union[ExportManifest, None] = None
+    ) -> None:
+        self.settings: ExportSettings = _settings
+        self.config: ConfigSnapshot = get_config()
+        self.exporters: List[Exporter] = []
+        shader: TextureSetWrapper
+        for shader in shaders:
+            exporter: Exporter = Exporter(shader, _settings)
+            exporter.preset_name = "{0}_{1}".format(
+                self.config.preset, Presets.get_name(exporter.get_preset_signature())
+            )
+            exporter.manifest = manifest
+            self.exporters.append(exporter)
+
+    @property
+    def valid(self) -> bool:
+        return bool(self.exporters) and all(
+            exporter.valid for exporter in self.exporters
+        )
+
+    @traced("BatchExporter.get_parameters", "export")
     def get_parameters(self) -> dict:
-        export_format: str = ExportFormat
-        export_path: str = self.get_export_path()
-        if self.settings.mesh_map:
-            export_path: str = self.mesh_map_path
-            self.create_directory(export_path)
-            presets = self.get_export_mesh_map_presets()
-        else:
-            presets = self.get_export_texture_presets()
+        """
+        :return:
+            Get the combined parameters of all texture sets.
+        """
+        parameters: dict = {}
+        preset_names: Set[str] = set()
+        exporter: Exporter
+        for exporter in self.exporters:
+            exporter.need_color_correct_channels.clear()
+            exporter_parameters: dict = exporter.get_parameters()
+            if not exporter_parameters["exportList"]:
+                log(f"No channels to export : {exporter.texture_set_name}")
+                continue
+            if not parameters:
+                parameters = dict(
+                    exporter_parameters,
+                    defaultExportPreset=exporter.preset_name,
+                    exportPresets=[],
+                    exportList=[]
+                )
+            if exporter.preset_name not in preset_names:
+                preset_names.add(exporter.preset_name)
+                parameters["exportPresets"].extend(
+                    exporter_parameters["exportPresets"]
+                )
+            parameters["exportList"].extend(exporter_parameters["exportList"])
+        return parameters
+
+    def export_textures(self) -> List[Tuple[Exporter, List[str]]]:
+        """
+        Export all texture sets by one call, without converting.
+        :return:
+            The (exporter, exported files) pairs of successful texture sets.
+        """
+        if not self.valid:
+            err("Project name is incorrect!")
+            return []
+        output_parameters: dict = self.get_parameters()
+        if not output_parameters:
+            return []
+        exporter: Exporter
+        for exporter in self.exporters:
+            if exporter.export_list:
+                exporter.hash_params()
+        log(f"Batch export : {len(self.exporters)} texture sets")
+        start: float = time.perf_counter()
+        with ExportWatch(self.exporters), span(
+                "spex.export_project_textures", "painter", texture_sets=len(self.exporters)
+        ):
+            export_result = spex.export_project_textures(output_parameters)
+        duration: float = time.perf_counter() - start
+        exported: List[Exporter] = [
+            exporter for exporter in self.exporters if exporter.export_list
+        ]
+        pairs: List[Tuple[Exporter, List[str]]] = []
+        for exporter in exported:
+            # The batch duration is recorded once, shared by texture sets.
+            exporter.export_duration = duration / len(exported)
+            exporter.export_batch = len(exported)
+            textures: List[str] = exporter.fetch_textures(export_result.textures)
+            if exporter.check_status(
+                    export_result.status, export_result.message, textures
+            ):
+                exporter.mark_exported()
+                pairs.append((exporter, textures))
+        return pairs
+
+
+class MeshMapExporter(object):
+    """
+    Export the mesh maps of all texture sets by one export_project_textures
+    call, the bit-depth and channel count of each mesh map are from config.
+    In changed only mode, the mesh maps whose bake inputs and export settings
+    are unchanged since last export are skipped.
+    How to use :
+        files = MeshMapExporter(texture_sets, settings).export()
+    """
+    def __init__(self, shaders: List[TextureSetWrapper], _settings: ExportSettings) -> None:
+        self.settings: ExportSettings = _settings
+        self.settings.mesh_map = True
+        self.config: ConfigSnapshot = get_config()
+        self.exporters: List[Exporter] = [
+            Exporter(shader, _settings) for shader in shaders
+        ]
+        # The (output name, file name template, signature) of exported mesh maps.
+        self.outputs: Dict[str, List[Tuple[str, str, str]]] = {}
+
+    @traced("MeshMapExporter.get_parameters", "export")
+    def get_parameters(self) -> dict:
+        """
+        :return:
+            The parameters of all texture sets, the texture sets with the same
+            mesh maps share one preset, empty if nothing changed.
+        """
+        presets: Dict[str, dict] = {}
+        export_list: List[dict] = []
+        self.outputs.clear()
+        exporter: Exporter
+        for exporter in self.exporters:
+            outputs: Dict[str, dict] = exporter.get_mesh_map_outputs()
+            signatures: Dict[str, str] = exporter.get_mesh_map_signatures(outputs)
+            names: List[str] = list(outputs)
+            if self.settings.changed_only:
+                names = MeshMapStates.changed_maps(exporter.texture_set_name, signatures)
+            if not names:
+                log(f"No changed mesh maps : {exporter.texture_set_name}")
+                continue
+            maps: List[dict] = list(outputs.values())
+            key: str = json.dumps(maps, sort_keys=True)
+            if key not in presets:
+                presets[key] = {
+                    "name": f"{self.config.preset}_MeshMaps_{len(presets)}", "maps": maps
+                }
+            entry: dict = {
+                "rootPath": exporter.texture_set_name,
+                "exportPreset": presets[key]["name"]
+            }
+            if len(names) < len(outputs):
+                entry["filter"] = {
+                    "outputMaps": [outputs[name]["fileName"] for name in names]
+                }
+            export_list.append(entry)
+            self.outputs[exporter.texture_set_name] = [
+                (name, outputs[name]["fileName"], signatures[name]) for name in names
+            ]
+        if not export_list:
+            return {}
         return {
-            "exportPath": export_path,
-            "exportShaderParams": ExportShaderParams,
-            "defaultExportPreset": ExportPreset,
-            "exportPresets": [presets],
-            "exportList": self.get_export_list(),
+            "exportPath": self.exporters[0].mesh_map_path,
+            "exportShaderParams": False,
+            "defaultExportPreset": next(iter(presets.values()))["name"],
+            "exportPresets": list(presets.values()),
+            "exportList": export_list,
             "exportParameters": [{
                 "parameters": {
-                    "fileFormat": export_format,
-                    "dithering": Dithering,
-                    "sizeLog2": self.get_size(),
-                    "paddingAlgorithm": PaddingAlgorithm,
-                    "dilationDistance": DilationDistance
+                    "fileFormat": self.config.export_format,
+                    "dithering": self.config.dithering,
+                    "sizeLog2": self.exporters[0].get_size(),
+                    "paddingAlgorithm": self.config.padding_algorithm,
+                    "dilationDistance": self.config.dilation_distance
                 }
             }]
         }
 
-    def output_mesh_map(self):
-        output_parameters = self.get_parameters()
-        spex.export_project_textures(output_parameters)
+    def export(self) -> List[str]:
+        """
+        :return:
+            The exported mesh map files, empty if failed or nothing changed.
+        """
+        if not self.exporters or not all(exporter.valid for exporter in self.exporters):
+            err("Project name is incorrect!")
+            return []
+        parameters: dict = self.get_parameters()
+        if not parameters:
+            return []
+        Exporter.create_directory(parameters["exportPath"])
+        log(f"Mesh map export : {len(parameters['exportList'])} texture sets")
+        with span("spex.export_project_textures", "painter", mesh_maps=True):
+            export_result = spex.export_project_textures(parameters)
+        files: List[str] = []
+        exporter: Exporter
+        for exporter in self.exporters:
+            if exporter.texture_set_name not in self.outputs:
+                continue
+            textures: List[str] = exporter.fetch_textures(export_result.textures)
+            if not exporter.check_status(
+                    export_result.status, export_result.message, textures
+            ):
+                continue
+            files.extend(textures)
+            exported: Dict[str, Tuple[str, List[str]]] = {}
+            name: str
+            template: str
+            signature: str
+            for name, template, signature in self.outputs[exporter.texture_set_name]:
+                pattern: re.Pattern = exporter.get_name_pattern(template)
+                matched: List[str] = [file for file in textures if pattern.search(file)]
+                if matched:
+                    exported[name] = (signature, matched)
+            MeshMapStates.mark_exported(exporter.texture_set_name, exported)
+        return files
+
+
+class ExportPlanner(object):
+    """
+    Dry-run of export, resolve the files painter would export, the derived
+    and converted files, then compare them with the disk and estimate the
+    bytes and time from the export history (or manifests) of past runs.
+    Painter's API is called from main thread, the files are stat in parallel.
+    How to use :
+        plan = ExportPlanner(texture_sets, settings).build()
+    """
+    def __init__(self, shaders: List[TextureSetWrapper], _settings: ExportSettings) -> None:
+        self.shaders: List[TextureSetWrapper] = shaders
+        self.settings: ExportSettings = _settings
 
-    def output_textures(self) -> spex.ExportStatus:
-        def fetch_convert_path(image: str) -> Tuple[str, str]:
-            output_path = reverse_replace(
-                dirname(image), ExportDirectory, ConvertDirectory, 1
-            )
-            output_file = reverse_replace(
-                basename(image), ExportFormat, ConvertFormat, 1
-            )
-            return image, join(output_path, output_file).replace("\\", "/")
+    def list_textures(self) -> Tuple[List[Exporter], dict]:
+        """
+        :return:
+            The exporters and the files listed by painter,
+            keyed by (texture set, stack).
+        """
+        if self.settings.batch:
+            batch: BatchExporter = BatchExporter(self.shaders, self.settings)
+            if not batch.valid:
+                err("Project name is incorrect!")
+                return [], {}
+            parameters: dict = batch.get_parameters()
+            return batch.exporters, spex.list_project_textures(parameters) if parameters else {}
+        exporters: List[Exporter] = []
+        textures: dict = {}
+        shader: TextureSetWrapper
+        for shader in self.shaders:
+            exporter: Exporter = Exporter(shader, self.settings)
+            if not exporter.valid:
+                err("Project name is incorrect!")
+                return [], {}
+            exporters.append(exporter)
+            parameters = exporter.get_parameters()
+            if not parameters["exportList"]:
+                log(f"No channels to export : {exporter.texture_set_name}")
+                continue
+            textures.update(spex.list_project_textures(parameters))
+        return exporters, textures
 
-        self.need_color_correct_channels.clear()
-        if not self.valid:
-            err("Project name is incorrect!")
+    @traced("ExportPlanner.build", "plan")
+    def build(self) -> Union[ExportPlan, None]:
+        """
+        :return:
+            The resolved plan, None if the project name is incorrect.
+        """
+        exporters, textures = self.list_textures()
+        if not exporters:
             return None
-        output_parameters = self.get_parameters()
-        export_result = spex.export_project_textures(output_parameters)
-        status: spex.ExportStatus = export_result.status
-        message: str = export_result.message
-        if (self.texture_set.name, "") not in export_result.textures.keys():
-            log("Skip : {0}".format(self.texture_set.name))
-        textures: List[str] = export_result.textures[(self.texture_set.name, "")]
-        assert isinstance(status, spex.ExportStatus)
-        if status == spex.ExportStatus.Success:
-            if self.settings.convert:
-                sources: List[str] = [
-                    texture.replace("\\", "/") for texture in textures
-                ]
-                self.multiprocess_convert([
-                    fetch_convert_path(image) for image in sources
-                ])
-        elif status == spex.ExportStatus.Cancelled:
-            log("Export process has been cancelled.")
-        elif status == spex.ExportStatus.Warning:
-            warn(message)
-        elif status == spex.ExportStatus.Error:
-            err(message)
-        return status
+        plan: ExportPlan = ExportPlan(exporters[0].get_title())
+        exporter: Exporter
+        for exporter in exporters:
+            exporter.report_dropped_tiles()
+            exporter.plan_textures(plan, exporter.fetch_textures(textures))
+        manifest_directory: str = ExportManifest(exporters[0]).get_manifest_directory()
+        plan.resolve(self.get_run_history(exporters[0], manifest_directory))
+        plan_file: str = self.write(plan, manifest_directory)
+        if plan_file:
+            log(f"Plan : {plan_file}")
+        warning: str
+        for warning in plan.get_warnings():
+            warn(warning)
+        return plan
 
-    def preview_output_textures(self) -> int:
-        if not self.valid:
-            err("Project name is incorrect!")
-            return 0
-        output_parameters: dict = self.get_parameters()
-        output_textures: dict = spex.list_project_textures(output_parameters)
-        texture_set: Tuple[str, str]
-        textures: list
-        for texture_set, textures in output_textures.items():
-            if textures:
-                log("Texture Set : {0}:\n{1}".format(texture_set[0], "\n".join(textures)))
-        return len(output_textures)
+    @staticmethod
+    def get_run_history(workflow: Workflow, manifest_directory: str) -> RunHistory:
+        """
+        :return:
+            The latest runs of export history, or of manifests if no history.
+        """
+        history: Union[ExportHistory, None] = workflow.get_history()
+        runs: List[List[dict]] = history.get_runs(RunHistory.Limit) if history else []
+        if runs:
+            return RunHistory.from_runs(runs)
+        return RunHistory.load(manifest_directory)
 
     @staticmethod
-    def create_directory(directory: str) -> str:
-        if isdir(directory):
+    def write(plan: ExportPlan, manifest_directory: str) -> str:
+        """
+        :return:
+            The plan file in "Plans" of manifest directory, empty if not written.
+        """
+        if not manifest_directory or not plan.items:
             return ""
+        directory: str = join(manifest_directory, "Plans").replace("\\", "/")
         try:
-            os.mkdir(directory)
-        except FileExistsError as file_exists_error:
-            warn(f"The directory is exists : {file_exists_error}")
-            raise
-        except Exception as unknown_error:
-            err(f"Can't create directory : {unknown_error}")
-            raise
-        else:
-            log(f"Created : {directory}")
-        return directory
+            os.makedirs(directory, exist_ok=True)
+            plan_file: str = join(
+                directory, f"{plan.title}_{time.strftime('%Y%m%d_%H%M%S')}.json"
+            ).replace("\\", "/")
+            plan.write(plan_file)
+        except OSError as os_error:
+            err(f"Failed to write plan : {os_error}")
+            return ""
+        return plan_file
 
-    def convert(self, convert_pairs: List[Tuple[str, str]]) -> List[str]:
-        convert_commands: List[list] = []
-        successful: List[str] = []
-        source: str
-        destination: str
-        for source, destination in convert_pairs:
-            if not isfile(source):
-                warn(f"{source} is not found.")
-                continue
-            destination_directory: str = dirname(destination)
-            try:
-                self.create_directory(destination_directory)
-            except FileExistsError as file_exists_error:
-                err(str(file_exists_error))
-                return []
-            except Exception as unknown_error:
-                err(str(unknown_error))
-                return []
-            convert_commands.append([Converter, '-o', destination, source])
-        if not convert_commands:
-            warn("No images need to convert.")
-            return []
-        startup_info = subprocess.STARTUPINFO()
-        startup_info.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        for command in convert_commands:
-            process = subprocess.Popen(command, startupinfo=startup_info)
-            return_code = process.communicate()
-            if not return_code:
-                log('Converted : {0}'.format(command[2]))
-            else:
-                successful.append(command[2])
-        return successful
 
-    def multiprocess_convert(self, convert_pairs: List[Tuple[str, str]]) -> int:
-        def write_multiprocess_script() -> str:
-            tab = "\t"
-            newline = "\n"
-            script: str = join(tempfile.gettempdir(), "substance_painter_mp.py")
-            length: int = len(convert_pairs) - 1
-            line_counter: int = 0
-            try:
-                with open(script, "w") as file_handle:
-                    if self.settings.color_correct:
-                        buffer: str = ""
-                        channel: str
-                        for channel in self.need_color_correct_channels:
-                            buffer = buffer + f'"{channel}", '
-                        file_handle.write(f"convert_channels = [{buffer}]{newline}")
-                    else:
-                        file_handle.write(f"convert_channels = []{newline}")
-                    file_handle.write(f"targets = [{newline}")
-                    src: str
-                    dest: str
-                    for src, dest in convert_pairs:
-                        self.create_directory(dirname(dest))
-                        if line_counter == length:
-                            line = f'{tab}("{src}", "{dest}"){newline}]{newline}'
-                        else:
-                            line = f'{tab}("{src}", "{dest}"){newline},{newline}'
-                        file_handle.write(line)
-                        line_counter = line_counter + 1
-                    file_handle.write(_MultiProcessConvertPoolScript)
-            except Exception as unknown_error:
-                warn(str(unknown_error))
-                warn("Failed to write script : {0}".format(script))
-            return '\"' + script.replace("\\", "/") + '\"'
-        py_script: str = write_multiprocess_script()
-        process: subprocess.Popen = subprocess.Popen(py_script, shell=True)
-        return_code: int = process.wait()
-        if return_code == 0:
-            log("Convert successful.")
+class ExportJob(QtCore.QObject):
+    """
+    Export texture sets in background.
+    The export runs in main thread one texture set per event loop turn,
+    (painter's API must be called from main thread), conversion and publish
+    run in worker threads, the status of files are sent by signals.
+    How to use :
+        job = ExportJob(texture_sets, settings, manifest)
+        job.file_status.connect(...)
+        job.finished.connect(...)
+        job.start()
+        job.cancel()
+    """
+    file_status = QtCore.Signal(str, str)
+    sets_progress = QtCore.Signal(int, int)
+    finished = QtCore.Signal()
+    Interval: int = 100
+
+    def __init__(
+            self,
+            texture_sets: List[TextureSetWrapper],
+            settings: ExportSettings,
+            manifest: Union[ExportManifest, None] = None,
+            parent: Union[QtCore.QObject, None] = None
+    ) -> None:
+        super().__init__(parent)
+        self.texture_sets: List[TextureSetWrapper] = list(texture_sets)
+        self.total: int = len(self.texture_sets)
+        self.exported: int = 0
+        self.settings: ExportSettings = settings
+        self.manifest: Union[ExportManifest, None] = manifest
+        self.exporters: List[Exporter] = []
+        self.is_cancelled: bool = False
+        self.lock: threading.Lock = threading.Lock()
+        self.config: ConfigSnapshot = get_config()
+        self.pipeline: Pipeline = Pipeline(
+            self.get_stages(), self.config.pipeline.get("queue_size", 2)
+        )
+
+    def get_stages(self) -> List[Stage]:
+        def export(texture_set: TextureSetWrapper) -> Tuple[Exporter, List[str]]:
+            exporter: Exporter = Exporter(texture_set, self.settings)
+            self.add_exporter(exporter)
+            textures: List[str] = exporter.export_textures()
+            return self.exported_textures(exporter, textures)
+
+        def convert(pair: Tuple[Exporter, List[str]]) -> Tuple[Exporter, List[str]]:
+            exporter, textures = pair
+            if self.settings.convert:
+                for texture in textures:
+                    self.file_status.emit(texture, "converting")
+            files: List[str] = exporter.convert_textures(textures)
+            return (exporter, files) if files else None
+
+        def publish(pair: Tuple[Exporter, List[str]]) -> Tuple[Exporter, List[str]]:
+            exporter, files = pair
+            return pair if exporter.publish_textures(files) == 0 else None
+
+        stages: List[Stage] = [
+            Stage("export", (lambda pair: pair) if self.settings.batch else export),
+            Stage("convert", convert, self.config.pipeline.get("convert_workers", 1))
+        ]
+        if self.config.publisher:
+            stages.append(Stage(
+                "publish", publish, self.config.pipeline.get("publish_workers", 1)
+            ))
+        return stages
+
+    def add_exporter(self, exporter: Exporter) -> None:
+        exporter.manifest = self.manifest
+        exporter.on_converted = self.converted
+        with self.lock:
+            self.exporters.append(exporter)
+
+    def exported_textures(
+            self, exporter: Exporter, textures: List[str]
+    ) -> Union[Tuple[Exporter, List[str]], None]:
+        status: str = "queued" if self.settings.convert else "exported"
+        texture: str
+        for texture in textures:
+            self.file_status.emit(texture, status)
+        return (exporter, textures) if textures else None
+
+    def converted(self, result: dict) -> None:
+        status: str = "converted" if result["return_code"] == 0 else "failed"
+        self.file_status.emit(result["source"], status)
+
+    def start(self) -> None:
+        self.pipeline.start()
+        if self.settings.batch:
+            batch_exporter = BatchExporter(self.texture_sets, self.settings)
+            self.texture_sets.clear()
+            exporter: Exporter
+            for exporter in batch_exporter.exporters:
+                self.add_exporter(exporter)
+            pairs: List[Tuple[Exporter, List[str]]] = batch_exporter.export_textures()
+            self.exported = self.total
+            self.sets_progress.emit(self.exported, self.total)
+            for exporter, textures in pairs:
+                self.exported_textures(exporter, textures)
+            self.submit_pairs(pairs)
         else:
-            warn("Convert error occurred.")
-        return return_code
+            QtCore.QTimer.singleShot(0, self.export_next)
+
+    def submit_pairs(self, pairs: List[Tuple[Exporter, List[str]]]) -> None:
+        """
+        Submit the exported pairs without blocking the main thread.
+        """
+        if self.is_cancelled or not pairs:
+            self.finish()
+            return
+        if self.pipeline.is_full():
+            QtCore.QTimer.singleShot(
+                ExportJob.Interval, lambda: self.submit_pairs(pairs)
+            )
+            return
+        self.pipeline.submit(pairs[0])
+        QtCore.QTimer.singleShot(0, lambda: self.submit_pairs(pairs[1:]))
+
+    def export_next(self) -> None:
+        """
+        Export next texture set, wait if the converting queue is full.
+        """
+        if self.is_cancelled or not self.texture_sets:
+            self.finish()
+            return
+        if self.pipeline.is_full():
+            QtCore.QTimer.singleShot(ExportJob.Interval, self.export_next)
+            return
+        self.pipeline.submit(self.texture_sets.pop(0))
+        self.exported += 1
+        self.sets_progress.emit(self.exported, self.total)
+        QtCore.QTimer.singleShot(0, self.export_next)
+
+    def finish(self) -> None:
+        """
+        Wait the workers in another thread, emit finished when all done.
+        """
+        def wait() -> None:
+            self.pipeline.close()
+            self.pipeline.report()
+            self.finished.emit()
+        threading.Thread(target=wait, name="SurF-ExportJob", daemon=True).start()
+
+    def cancel(self) -> None:
+        """
+        Drop the queued texture sets, kill the running converter processes.
+        """
+        self.is_cancelled = True
+        self.pipeline.cancel()
+        with self.lock:
+            exporter: Exporter
+            for exporter in self.exporters:
+                exporter.cancel_convert()
+        log("Export job has been cancelled.")
+
+
+class ExportProgressPanel(QtWidgets.QWidget):
+    """
+    Show the status of each file, throughput and ETA of an export job,
+    and the cancel button.
+    """
+    FinalStatus: Tuple[str, ...] = ("exported", "converted", "failed", "cancelled")
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.job: Union[ExportJob, None] = None
+        self.items: Dict[str, QtWidgets.QTreeWidgetItem] = {}
+        self.started: float = 0.0
+        self.done: int = 0
+        self.done_bytes: int = 0
+        self.sets_done: int = 0
+        self.sets_total: int = 0
+        self.files_tree = QtWidgets.QTreeWidget()
+        self.files_tree.setHeaderLabels(["File", "Status"])
+        self.files_tree.setRootIsDecorated(False)
+        self.summary_label = QtWidgets.QLabel()
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.cancel_btn = QtWidgets.QPushButton("Cancel")
+        self.cancel_btn.setStyleSheet(_GlobalButtonStyle)
+        layout: QtWidgets.QVBoxLayout = QtWidgets.QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(QtWidgets.QLabel("PROGRESS"))
+        layout.addWidget(self.files_tree)
+        layout.addWidget(self.progress_bar)
+        bottom_layout: QtWidgets.QHBoxLayout = QtWidgets.QHBoxLayout()
+        bottom_layout.addWidget(self.summary_label)
+        bottom_layout.addWidget(self.cancel_btn)
+        layout.addLayout(bottom_layout)
+        self.setLayout(layout)
+        self.cancel_btn.clicked.connect(self.cancel)
+        self.hide()
+
+    def attach(self, job: ExportJob) -> None:
+        """
+        :param job: The export job, call before the job started.
+        """
+        self.job = job
+        self.items.clear()
+        self.files_tree.clear()
+        self.started = time.perf_counter()
+        self.done = 0
+        self.done_bytes = 0
+        self.sets_done = 0
+        self.sets_total = job.total
+        self.cancel_btn.setEnabled(True)
+        job.file_status.connect(self.set_file_status)
+        job.sets_progress.connect(self.set_sets_progress)
+        job.finished.connect(self.finish)
+        self.update_summary()
+        self.show()
+
+    def set_file_status(self, file: str, status: str) -> None:
+        item: Union[QtWidgets.QTreeWidgetItem, None] = self.items.get(file)
+        if item is None:
+            item = QtWidgets.QTreeWidgetItem([basename(file), status])
+            item.setToolTip(0, file)
+            self.items[file] = item
+            self.files_tree.addTopLevelItem(item)
+        elif item.text(1) in ExportProgressPanel.FinalStatus:
+            return
+        item.setText(1, status)
+        if status in ExportProgressPanel.FinalStatus:
+            self.done += 1
+            if isfile(file):
+                self.done_bytes += os.path.getsize(file)
+        self.update_summary()
+
+    def set_sets_progress(self, done: int, total: int) -> None:
+        self.sets_done = done
+        self.sets_total = total
+        self.update_summary()
+
+    def update_summary(self) -> None:
+        elapsed: float = max(time.perf_counter() - self.started, 1e-6)
+        total: int = len(self.items)
+        # Estimate the files of texture sets not exported yet.
+        if self.sets_done and self.sets_done < self.sets_total:
+            total = int(total * self.sets_total / self.sets_done)
+        self.progress_bar.setMaximum(max(total, 1))
+        self.progress_bar.setValue(self.done)
+        rate: float = self.done / elapsed
+        megabytes: float = self.done_bytes / elapsed / (1024 * 1024)
+        eta: str = "--:--"
+        if rate > 0:
+            minutes, seconds = divmod(int((total - self.done) / rate), 60)
+            eta = f"{minutes:02d}:{seconds:02d}"
+        self.summary_label.setText(
+            f"Sets {self.sets_done}/{self.sets_total}  "
+            f"Files {self.done}/{total}  "
+            f"{rate:.2f} files/s  {megabytes:.1f} MB/s  ETA {eta}"
+        )
+
+    def cancel(self) -> None:
+        if self.job is None:
+            return
+        self.job.cancel()
+        self.cancel_btn.setEnabled(False)
+        file: str
+        for file in list(self.items):
+            if self.items[file].text(1) not in ExportProgressPanel.FinalStatus:
+                self.set_file_status(file, "cancelled")
+
+    def finish(self) -> None:
+        self.cancel_btn.setEnabled(False)
+        self.update_summary()
+        self.job = None
+
+
+class ExportPlanDialog(QtWidgets.QDialog):
+    """
+    Show the export plan, one row per planned file, and the totals,
+    free disk space and warnings.
+    """
+    Columns: Tuple[str, ...] = (
+        "Texture Set", "Profile", "Channel", "UDIM", "Kind", "Resolution",
+        "Bits", "Status", "Size", "Seconds", "File"
+    )
+    StatusColors: Dict[str, str] = {
+        "new": "#7fbf7f", "changed": "#e0c060", "unchanged": "#909090"
+    }
+
+    def __init__(self, plan: ExportPlan, parent=None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle(f"Export Plan : {plan.title}")
+        self.resize(1000, 480)
+        self.plan_table = QtWidgets.QTableWidget(len(plan.items), len(self.Columns))
+        self.plan_table.setHorizontalHeaderLabels(list(self.Columns))
+        self.plan_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.plan_table.verticalHeader().hide()
+        self.summary_label = QtWidgets.QLabel()
+        self.summary_label.setWordWrap(True)
+        layout: QtWidgets.QVBoxLayout = QtWidgets.QVBoxLayout()
+        layout.addWidget(self.plan_table)
+        layout.addWidget(self.summary_label)
+        self.setLayout(layout)
+        self.set_plan(plan)
+
+    def set_plan(self, plan: ExportPlan) -> None:
+        row: int
+        item: PlanItem
+        for row, item in enumerate(plan.items):
+            values: Tuple[str, ...] = (
+                item.texture_set, item.profile, item.channel,
+                "" if item.udim is None else str(item.udim), item.kind,
+                f"{item.width}x{item.height}", str(item.bit_depth), item.status,
+                format_bytes(item.bytes),
+                "" if item.seconds is None else f"{item.seconds:.1f}",
+                basename(item.file)
+            )
+            column: int
+            value: str
+            for column, value in enumerate(values):
+                cell = QtWidgets.QTableWidgetItem(value)
+                cell.setToolTip(item.file)
+                self.plan_table.setItem(row, column, cell)
+            self.plan_table.item(row, self.Columns.index("Status")).setForeground(
+                QtGui.QColor(self.StatusColors.get(item.status, "#ffffff"))
+            )
+        self.plan_table.setSortingEnabled(True)
+        self.plan_table.resizeColumnsToContents()
+        totals: dict = plan.get_totals()
+        lines: List[str] = [
+            f"Files {totals['files']}  "
+            f"New {totals['status']['new']}  Changed {totals['status']['changed']}  "
+            f"Unchanged {totals['status']['unchanged']}  "
+            f"Size {format_bytes(totals['bytes'])} (+{format_bytes(totals['growth'])})  "
+            f"Time {totals['seconds']:.0f}s"
+            + (f" ({totals['unknown_seconds']} files unknown)" if totals["unknown_seconds"] else "")
+        ]
+        lines.extend(
+            f"Free {format_bytes(free)} on {directory}"
+            for directory, _, free in plan.spaces
+        )
+        lines.extend(f"<font color='#e06060'>{warning}</font>" for warning in plan.get_warnings())
+        self.summary_label.setText("<br>".join(lines))
 
 
 class TextureExporterDialog(QtWidgets.QDialog):
@@ -1003,10 +3344,21 @@ class TextureExporterDialog(QtWidgets.QDialog):
         self.export_texture_btn = QtWidgets.QPushButton("Export Textures")
         self.force_8bits_cb = QtWidgets.QCheckBox("Force 8bits")
         self.convert_cb: QtWidgets.QCheckBox = QtWidgets.QCheckBox("Convert")
+        self.batch_cb: QtWidgets.QCheckBox = QtWidgets.QCheckBox("Batch")
+        self.progress_panel: ExportProgressPanel = ExportProgressPanel()
+        self.plan_dialog: Union[ExportPlanDialog, None] = None
+        self.job: Union[ExportJob, None] = None
+        self.changed_only_cb: QtWidgets.QCheckBox = QtWidgets.QCheckBox("Changed Only")
         self.limited_range_le = QtWidgets.QLineEdit()
         self.switch_range_cb = QtWidgets.QCheckBox('Range')
-        # Layouts
-        self.selections_layout: QtWidgets.QVBoxLayout = QtWidgets.QVBoxLayout()
+        self.profile_cbs: Dict[str, QtWidgets.QCheckBox] = {}
+        # Texture sets
+        self.texture_set_model: SurF.ui.CheckListModel = SurF.ui.CheckListModel(
+            self.get_texture_set_tooltip
+        )
+        self.texture_set_view: SurF.ui.CheckListView = SurF.ui.CheckListView(
+            self.texture_set_model
+        )
         # Buttons
         self.uncheck_all_btn = QtWidgets.QPushButton('Uncheck All')
         self.check_all_btn = QtWidgets.QPushButton('Check All')
@@ -1023,29 +3375,117 @@ class TextureExporterDialog(QtWidgets.QDialog):
         self.setWindowTitle(__Title__ + " " + __Version__)
         if isfile(_IconImageFile):
             self.setWindowIcon(QtGui.QIcon(_IconImageFile))
-        ts_bind_type = Dict[TextureSetWrapper, QtWidgets.QCheckBox]
-        self.texture_set_binds: ts_bind_type = {}
-        self.convert_tx_commands: List[str] = []
-        self.is_convert_tx: bool = False
-        self.shader_name: str = ""
-        self.workflow: Workflow = Workflow()
-        status: int = self.workflow.status()
-        (   # Launch window
-            self.launch_main_window,
-            self.launch_invalid_window,
-            self.launch_no_project_window
-        )[status]()
-
-    def texture_set_check_change(self, status: bool) -> None:
-        check_box: QtWidgets.QCheckBox
-        for check_box in self.texture_set_binds.values():
-            assert not isinstance(check_box, QtWidgets.QCheckBox)
-            check_box.setChecked(status)
+        self.workflow: Workflow = Snapshot.get_workflow()
+        # Config dependent widgets, updated when project switched.
+        self.config_name_label: QtWidgets.QLabel = QtWidgets.QLabel()
+        self.maps_model: QtCore.QStringListModel = QtCore.QStringListModel(self)
+        self.profile_box: QtWidgets.QWidget = QtWidgets.QWidget()
+        self.profile_layout: QtWidgets.QHBoxLayout = QtWidgets.QHBoxLayout()
+        self.invalid_label: QtWidgets.QLabel = QtWidgets.QLabel()
+        # Texture sets changed events are merged into one patch.
+        self.patch_timer: QtCore.QTimer = QtCore.QTimer(self)
+        self.patch_timer.setSingleShot(True)
+        self.patch_timer.setInterval(200)
+        self.patch_timer.timeout.connect(self.patch_selections)
+        # Pages : main, invalid project name, no project (Workflow.status).
+        self.pages: QtWidgets.QStackedLayout = QtWidgets.QStackedLayout()
+        self.pages.addWidget(self.build_main_page())
+        self.pages.addWidget(self.build_invalid_page())
+        self.pages.addWidget(self.build_no_project_page())
+        self.setLayout(self.pages)
+        self.set_project()
+
+    def set_project(self, status: Union[int, None] = None) -> None:
+        """
+        Show the page of current project, called when project opened,
+        created or closed, the dialog is never rebuilt.
+        :param status: The Workflow status, None is the current project's.
+        """
+        self.patch_timer.stop()
+        self.workflow = Snapshot.get_workflow()
+        if status is None:
+            status = self.workflow.status()
+        self.pages.setCurrentIndex(status)
+        if status == Workflow.NameIsNotCorrect:
+            self.invalid_label.setText(
+                "Project Name incorrect : {0}\n{1}".format(
+                    self.workflow.name(), self.workflow.config.naming.pattern
+                )
+            )
+        elif status == Workflow.Successful:
+            self.update_config()
+            self.texture_set_model.set_checked(self.texture_set_model.names, False)
+            self.refresh_selections()
+            self.reset_metadata()
+
+    def update_config(self) -> None:
+        """
+        Update the widgets built from config, the profile check boxes are
+        rebuilt only if the profiles changed.
+        """
+        config: ConfigSnapshot = get_config()
+        self.config_name_label.setText(config.config_name)
+        self.maps_model.setStringList(list(config.maps.keys()))
+        self.convert_cb.setToolTip(config.converter)
+        self.convert_cb.setEnabled(config.converter_is_exists())
+        profiles: Mapping[str, ExportProfile] = config.profiles
+        if list(profiles) != list(self.profile_cbs):
+            check_box: QtWidgets.QCheckBox
+            for check_box in self.profile_cbs.values():
+                self.profile_layout.removeWidget(check_box)
+                check_box.deleteLater()
+            self.profile_cbs.clear()
+            profile: ExportProfile
+            for profile in profiles.values():
+                check_box = QtWidgets.QCheckBox(profile.name)
+                self.profile_cbs[profile.name] = check_box
+                self.profile_layout.addWidget(check_box)
+        for profile in profiles.values():
+            self.profile_cbs[profile.name].setToolTip(
+                f"{profile.export_format} {profile.output_size} "
+                f"{profile.bit_depth or 'channel'} bits, {profile.export_path}"
+            )
+        self.profile_box.setVisible(len(profiles) > 1)
+
+    def schedule_patch(self) -> None:
+        """
+        Texture sets may be added, removed or renamed, patch the list later.
+        """
+        if self.pages.currentIndex() == Workflow.Successful:
+            self.patch_timer.start()
+
+    def get_checked_texture_sets(self) -> List[TextureSetWrapper]:
+        """
+        The channels and UV tiles are read again once per export, layer stack
+        events do not tell the channel changes.
+        :return:
+            The checked texture sets still in project.
+        """
+        Snapshot.invalidate_channels()
+        all_texture_sets: List[str] = TextureSetWrapper.all_texture_set()
+        return [
+            Snapshot.get_wrapper(name) for name in self.texture_set_model.checked_names()
+            if name in all_texture_sets
+        ]
+
+    @staticmethod
+    def get_texture_set_tooltip(name: str) -> str:
+        """
+        :return:
+            The output name of texture set, built when the tooltip is shown.
+        """
+        try:
+            return Snapshot.get_wrapper(name).get_output_name()
+        except Exception as unknown_error:
+            return str(unknown_error)
 
     def store_metadata(self) -> None:
         ExportChannelRangeKeeper.set("store", self.limited_range_le.text())
         ForceEightBitKeeper.set("boolean", self.force_8bits_cb.isChecked())
         ConvertAfterKeeper.set("boolean", self.convert_cb.isChecked())
+        BatchExportKeeper.set("boolean", self.batch_cb.isChecked())
+        ChangedOnlyKeeper.set("boolean", self.changed_only_cb.isChecked())
+        ProfilesKeeper.set("store", ",".join(self.get_checked_profiles()))
 
     def reset_metadata(self) -> None:
         self.limited_range_le.setText(ExportChannelRangeKeeper.get("store"))
@@ -1057,6 +3497,29 @@ class TextureExporterDialog(QtWidgets.QDialog):
             self.convert_cb.setChecked(True)
         else:
             self.convert_cb.setChecked(False)
+        if BatchExportKeeper.get("boolean"):
+            self.batch_cb.setChecked(True)
+        else:
+            self.batch_cb.setChecked(False)
+        if ChangedOnlyKeeper.get("boolean"):
+            self.changed_only_cb.setChecked(True)
+        else:
+            self.changed_only_cb.setChecked(False)
+        profiles: List[str] = (ProfilesKeeper.get("store") or "").split(",")
+        name: str
+        check_box: QtWidgets.QCheckBox
+        for name, check_box in self.profile_cbs.items():
+            check_box.setChecked(name in profiles)
+
+    def get_checked_profiles(self) -> List[str]:
+        """
+        :return:
+            The checked profile names, empty is the first profile.
+        """
+        return [
+            name for name, check_box in self.profile_cbs.items()
+            if check_box.isChecked()
+        ]
 
     def get_settings(self) -> ExportSettings:
         """
@@ -1066,37 +3529,79 @@ class TextureExporterDialog(QtWidgets.QDialog):
         settings: ExportSettings = ExportSettings()
         settings.convert = self.convert_cb.isChecked()
         settings.force8bits = self.convert_cb.isChecked()
-        settings.color_correct = Color_Correct
-        settings.combined = Is_Combined_Mesh_Maps
+        config: ConfigSnapshot = get_config()
+        settings.color_correct = config.color_correct
+        settings.combined = config.is_combined_mesh_maps
+        settings.batch = self.batch_cb.isChecked()
+        settings.changed_only = self.changed_only_cb.isChecked()
+        settings.set_profiles(self.get_checked_profiles())
         if self.switch_range_cb.isChecked():
             settings.set_scope_map(self.limited_range_le.text())
         return settings
 
+    @staticmethod
+    def check_scope(settings: ExportSettings) -> bool:
+        """
+        :param settings: The export settings.
+        :return:
+            False if the export range is given but no valid channel range.
+        """
+        scope: str = settings.get_scope_map()
+        if scope.strip() and not compile_scope(scope):
+            err(f"Invalid export range : {scope}")
+            return False
+        return True
+
     def export_texture(self) -> None:
         """
-        Export texture function, and saving metadata after export.
+        Export texture function in background, and saving metadata.
         """
-        texture_set: TextureSetWrapper
         settings: ExportSettings = self.get_settings()
-        all_texture_sets: List[str] = TextureSetWrapper.all_texture_set()
-        for texture_set, ui in self.texture_set_binds.items():
-            if ui.isChecked() and texture_set.name in all_texture_sets:
-                exporter = Exporter(texture_set, settings)
-                exporter.output_textures()
+        texture_sets: List[TextureSetWrapper] = self.get_checked_texture_sets()
         self.store_metadata()
+        if self.job is not None or not texture_sets or not self.check_scope(settings):
+            return
+        manifest: ExportManifest = ExportManifest(self.workflow)
+        start_trace()
+        self.job = ExportJob(texture_sets, settings, manifest, self)
+        self.job.finished.connect(self.export_finished)
+        self.progress_panel.attach(self.job)
+        self.set_exporting(True)
+        self.job.start()
+
+    def export_finished(self) -> None:
+        """
+        The background export job finished.
+        """
+        if self.job is not None and self.job.manifest is not None:
+            self.job.manifest.write()
+        finish_trace(self.workflow)
+        self.job = None
+        self.set_exporting(False)
+
+    def set_exporting(self, toggle: bool) -> None:
+        """
+        Disable the export buttons while the export job running.
+        """
+        self.export_texture_btn.setEnabled(not toggle)
+        self.export_mesh_map_btn.setEnabled(not toggle)
+        self.preview_export_btn.setEnabled(not toggle)
+        self.refresh_btn.setEnabled(not toggle)
+
+    def cancel_job(self) -> None:
+        if self.job is not None:
+            self.job.cancel()
 
     def export_mesh_map(self) -> None:
         """
         Export mesh map function.
         :return:
         """
-        texture_set: TextureSetWrapper
-        settings: ExportSettings = self.get_settings()
-        ui: QtWidgets.QCheckBox
-        for texture_set, ui in self.texture_set_binds.items():
-            if ui.isChecked():
-                exporter = Exporter(texture_set, settings)
-                exporter.output_mesh_map()
+        texture_sets: List[TextureSetWrapper] = self.get_checked_texture_sets()
+        if texture_sets:
+            start_trace()
+            MeshMapExporter(texture_sets, self.get_settings()).export()
+            finish_trace(self.workflow)
 
     def explore_directory(self) -> None:
         """
@@ -1108,35 +3613,37 @@ class TextureExporterDialog(QtWidgets.QDialog):
 
     def preview_export(self) -> None:
         """
-        Print the all texture ready to export.
+        Plan the export of checked texture sets without exporting,
+        show the planned files and estimate in plan dialog.
         """
-        texture_set: TextureSetWrapper
-        all_texture_sets = TextureSetWrapper.all_texture_set()
-        for texture_set, ui in self.texture_set_binds.items():
-            if ui.isChecked() and texture_set.name in all_texture_sets:
-                exporter = Exporter(texture_set,  self.get_settings())
-                exporter.preview_output_textures()
+        settings: ExportSettings = self.get_settings()
+        texture_sets: List[TextureSetWrapper] = self.get_checked_texture_sets()
+        if not texture_sets or not self.check_scope(settings):
+            return
+        start_trace()
+        plan: Union[ExportPlan, None] = ExportPlanner(texture_sets, settings).build()
+        finish_trace(self.workflow)
+        if plan is None:
+            return
+        self.plan_dialog = ExportPlanDialog(plan, self)
+        self.plan_dialog.show()
 
     def refresh_selections(self) -> None:
         """
-        Refresh all texture set list and QCheckBox selections.
+        Refresh the texture set names, the checked names still exist are kept.
         """
-        def get_all() -> List[str]:
-            return TextureSetWrapper.all_texture_set()
+        Snapshot.invalidate_texture_sets()
+        self.texture_set_model.set_names(TextureSetWrapper.all_texture_set())
 
-        def wrapper(texture_set) -> TextureSetWrapper:
-            return TextureSetWrapper(texture_set)
-        SurF.ui.clean_layout(self.selections_layout)
-        self.texture_set_binds.clear()
-        for texture_set_wrapper in [wrapper(ts) for ts in get_all()]:
-            name: str = texture_set_wrapper.name
-            check_box: QtWidgets.QCheckBox = QtWidgets.QCheckBox(name)
-            self.texture_set_binds[texture_set_wrapper] = check_box
-            check_box.setToolTip(texture_set_wrapper.get_output_name())
-            check_box.setChecked(False)
-            self.selections_layout.addWidget(check_box)
+    def patch_selections(self) -> None:
+        """
+        Patch the added, removed and renamed texture sets only.
+        """
+        if self.pages.currentIndex() == Workflow.Successful:
+            self.texture_set_model.patch_names(Snapshot.patch_texture_sets())
 
-    def launch_no_project_window(self) -> None:
+    @staticmethod
+    def build_no_project_page() -> QtWidgets.QWidget:
         """
         If project is not opened.
         """
@@ -1144,32 +3651,27 @@ class TextureExporterDialog(QtWidgets.QDialog):
         info: QtWidgets.QLabel = QtWidgets.QLabel("No Project has been opened")
         info.setStyleSheet(_GlobalLabelStyle)
         main_layout.addWidget(info)
-        self.setLayout(main_layout)
+        page: QtWidgets.QWidget = QtWidgets.QWidget()
+        page.setLayout(main_layout)
+        return page
 
-    def launch_invalid_window(self) -> None:
+    def build_invalid_page(self) -> QtWidgets.QWidget:
         """
         If project name is incorrect.
         """
         main_layout: QtWidgets = QtWidgets.QVBoxLayout()
-        info_label: QtWidgets.QLabel = QtWidgets.QLabel(
-            "Project Name incorrect : {0}\n{1}".format(
-                self.workflow.name(), ProjectNameMatcher
-            )
-        )
-        info_label.setStyleSheet(_GlobalLabelStyle)
-        main_layout.addWidget(info_label)
-        self.setLayout(main_layout)
+        self.invalid_label.setStyleSheet(_GlobalLabelStyle)
+        main_layout.addWidget(self.invalid_label)
+        page: QtWidgets.QWidget = QtWidgets.QWidget()
+        page.setLayout(main_layout)
+        return page
 
-    def launch_main_window(self):
+    def build_main_page(self) -> QtWidgets.QWidget:
         def check_all():
-            check_box: QtWidgets.QCheckBox
-            for check_box in self.texture_set_binds.values():
-                check_box.setChecked(True)
+            self.texture_set_view.set_visible_checked(True)
 
         def check_none():
-            check_box: QtWidgets.QCheckBox
-            for check_box in self.texture_set_binds.values():
-                check_box.setChecked(False)
+            self.texture_set_view.set_visible_checked(False)
 
         def _add_line(layout: QtWidgets.QLayout) -> None:
             layout.addWidget(SurF.ui.make_separator())
@@ -1203,29 +3705,20 @@ class TextureExporterDialog(QtWidgets.QDialog):
         title_layout = _get_layout("H", "l")
         check_layout = _get_layout("H")
         executable_layout = _get_layout("V")
-        config_name_label = QtWidgets.QLabel(ConfigName)
-        config_name_label.setStyleSheet("font: bold 16px")
-        title_layout.addWidget(config_name_label)
+        self.config_name_label.setStyleSheet("font: bold 16px")
+        title_layout.addWidget(self.config_name_label)
         main_layout.addLayout(title_layout)
         _add_line(main_layout)
         # Add Buttons --------------------------------------------------------
+        self.check_all_btn.setToolTip("Check the texture-sets pass the filter.")
+        self.uncheck_all_btn.setToolTip("Uncheck the texture-sets pass the filter.")
         check_layout.addWidget(self.refresh_btn)
         check_layout.addWidget(self.check_all_btn)
         check_layout.addWidget(self.uncheck_all_btn)
         # --------------------------------------------------------------------
-        # Scroll Layout and Area ---------------------------------------------
-        scroll_layout = _get_layout("V", "t")
-        scroll_layout.addLayout(check_layout)
-        _add_line(scroll_layout)
-        scroll_layout.addLayout(self.selections_layout)
-        _add_line(scroll_layout)
-        scroll_area: QtWidgets.QScrollArea = QtWidgets.QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_content: QtWidgets.QWidget = QtWidgets.QWidget(scroll_area)
-        scroll_content.setLayout(scroll_layout)
-        scroll_area.setWidget(scroll_content)
-        self.refresh_selections()
-        main_layout.addWidget(scroll_area)
+        # Texture Set List -------------------------------------------------
+        main_layout.addLayout(check_layout)
+        main_layout.addWidget(self.texture_set_view)
         # -----------------------------------------------------------
         # Range Input -----------------------------------------------
         limited_range_layout = QtWidgets.QHBoxLayout()
@@ -1234,10 +3727,10 @@ class TextureExporterDialog(QtWidgets.QDialog):
         self.limited_range_le.setEnabled(False)
         self.limited_range_le.setStyleSheet(_GlobalLineEditStyle)
         self.limited_range_le.setToolTip(
-            "Channel:Start-End, \"*\" is wildcard set for all."
+            "Channel:Start-End,Single,!Excluded separated by \";\" or space, "
+            "\"*\" is wildcard set for all."
         )
-        self.limited_range_le.setText(ExportChannelRangeKeeper.get("store"))
-        completer = QtWidgets.QCompleter(list(ChannelMaps.keys()), self)
+        completer = QtWidgets.QCompleter(self.maps_model, self)
         completer.setCaseSensitivity(QtCore.Qt.CaseInsensitive)
         self.limited_range_le.setCompleter(completer)
         _add_line(main_layout)
@@ -1248,14 +3741,28 @@ class TextureExporterDialog(QtWidgets.QDialog):
         # -----------------------------------------------------------
         format_layout = QtWidgets.QHBoxLayout()
         format_layout.setAlignment(QtCore.Qt.AlignLeft)
-        self.convert_cb.setToolTip(Converter)
-        if not Settings.converter_is_exists():
-            self.convert_cb.setEnabled(False)
         _add_line(main_layout)
         main_layout.addWidget(QtWidgets.QLabel("FORMATS"))
         format_layout.addWidget(self.force_8bits_cb)
         format_layout.addWidget(self.convert_cb)
+        self.batch_cb.setToolTip(
+            "Export all checked texture-sets by one export call."
+        )
+        format_layout.addWidget(self.batch_cb)
+        self.changed_only_cb.setToolTip(
+            "Export the texture-sets and channels changed since last export."
+        )
+        format_layout.addWidget(self.changed_only_cb)
         main_layout.addLayout(format_layout)
+        # Profiles --------------------------------------------------
+        profile_box_layout = _get_layout("V")
+        profile_box_layout.setContentsMargins(0, 0, 0, 0)
+        self.profile_layout.setAlignment(QtCore.Qt.AlignLeft)
+        _add_line(profile_box_layout)
+        profile_box_layout.addWidget(QtWidgets.QLabel("PROFILES"))
+        profile_box_layout.addLayout(self.profile_layout)
+        self.profile_box.setLayout(profile_box_layout)
+        main_layout.addWidget(self.profile_box)
         # Executable buttons ----------------------------------------
         _add_line(executable_layout)
         executable_layout.addWidget(self.export_texture_btn)
@@ -1263,6 +3770,7 @@ class TextureExporterDialog(QtWidgets.QDialog):
         executable_layout.addWidget(self.explore_directory_btn)
         executable_layout.addWidget(self.preview_export_btn)
         main_layout.addLayout(executable_layout)
+        main_layout.addWidget(self.progress_panel)
         # -----------------------------------------------------------
         # Connections -----------------------------------------------
         self.refresh_btn.clicked.connect(self.refresh_selections)
@@ -1274,34 +3782,90 @@ class TextureExporterDialog(QtWidgets.QDialog):
         self.explore_directory_btn.clicked.connect(self.explore_directory)
         self.preview_export_btn.clicked.connect(self.preview_export)
         # -----------------------------------------------------------
-        self.setLayout(main_layout)
-        # -----------------------------------------------------------
-        self.reset_metadata()
+        page: QtWidgets.QWidget = QtWidgets.QWidget()
+        page.setLayout(main_layout)
+        return page
 
 
 def start_plugin():
+    if hasattr(spev, "LayerStacksModelDataChanged"):
+        spev.DISPATCHER.connect(
+            spev.LayerStacksModelDataChanged, Tracker.on_layer_stacks_changed
+        )
+        spev.DISPATCHER.connect(
+            spev.LayerStacksModelDataChanged, on_texture_sets_changed
+        )
     spev.DISPATCHER.connect(spev.ProjectOpened, refresh_ui)
     spev.DISPATCHER.connect(spev.ProjectCreated, refresh_ui)
-    spev.DISPATCHER.connect(spev.ProjectAboutToClose, clean_ui)
+    spev.DISPATCHER.connect(spev.ProjectAboutToClose, close_project)
     refresh_ui()
 
 
 def close_plugin():
+    if hasattr(spev, "LayerStacksModelDataChanged"):
+        spev.DISPATCHER.disconnect(
+            spev.LayerStacksModelDataChanged, Tracker.on_layer_stacks_changed
+        )
+        spev.DISPATCHER.disconnect(
+            spev.LayerStacksModelDataChanged, on_texture_sets_changed
+        )
     spev.DISPATCHER.disconnect(spev.ProjectOpened, refresh_ui)
     spev.DISPATCHER.disconnect(spev.ProjectCreated, refresh_ui)
-    spev.DISPATCHER.disconnect(spev.ProjectAboutToClose, clean_ui)
+    spev.DISPATCHER.disconnect(spev.ProjectAboutToClose, close_project)
     clean_ui()
+    ConvertPool.shutdown()
+    DerivePool.shutdown()
 
 
-def refresh_ui():
-    clean_ui()
+def refresh_ui(*_):
+    """
+    Project opened or created, the dock is created once and switched to
+    the new project's snapshot.
+    """
+    Tracker.reset()
+    Snapshot.invalidate()
+    try:
+        get_config()
+    except (ExportSettingNoFoundError, ExportConfigError):
+        return
+    widget: QtWidgets.QWidget
+    for widget in PluginWidgets:
+        if isinstance(widget, TextureExporterDialog):
+            widget.set_project()
+            return
     texture_exporter_widget = TextureExporterDialog()
     spui.add_dock_widget(texture_exporter_widget)
     PluginWidgets.append(texture_exporter_widget)
 
 
-def clean_ui():
+def close_project(*_):
+    """
+    Project about to close, cancel the export and show no project page.
+    """
+    widget: QtWidgets.QWidget
+    for widget in PluginWidgets:
+        if isinstance(widget, TextureExporterDialog):
+            widget.cancel_job()
+    Tracker.reset()
+    Snapshot.invalidate()
+    for widget in PluginWidgets:
+        if isinstance(widget, TextureExporterDialog):
+            widget.set_project(Workflow.ProjectNotOpened)
+
+
+def on_texture_sets_changed(*_):
+    widget: QtWidgets.QWidget
+    for widget in PluginWidgets:
+        if isinstance(widget, TextureExporterDialog):
+            widget.schedule_patch()
+
+
+def clean_ui(*_):
+    Tracker.reset()
+    Snapshot.invalidate()
     for widget in PluginWidgets:
+        if isinstance(widget, TextureExporterDialog):
+            widget.cancel_job()
         spui.delete_ui_element(widget)
     PluginWidgets.clear()
 
@@ -0,0 +1,131 @@
+#
+# Convert Tests
+#   The tests of convert cache hits and misses, and the scheduler's order
+#   and memory budget.
+#   How to use :
+#       python -m pytest scripts/python/tests
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from concurrent.futures import Future
+from os.path import dirname, join, realpath
+import threading
+import sys
+
+sys.path.append(join(dirname(dirname(realpath(__file__))), "modules"))
+
+from SurF.convert import ConvertBatch, ConvertCache, ConvertJob  # noqa: E402
+from SurF.convert import ConvertScheduler, ConvertTask  # noqa: E402
+
+Timeout: float = 10.0
+
+
+def _write(file: str, content: bytes) -> str:
+    with open(file, "wb") as file_handle:
+        file_handle.write(content)
+    return file
+
+
+def _task(name: str, memory: int) -> ConvertTask:
+    task: ConvertTask = ConvertTask(
+        ConvertJob(name, name + ".tx", []), ConvertBatch(), None, Future()
+    )
+    task.memory = memory
+    return task
+
+
+def test_cache_hit(tmp_path):
+    source: str = _write(str(tmp_path / "a.tif"), b"source")
+    destination: str = _write(str(tmp_path / "a.tx"), b"converted")
+    cache: ConvertCache = ConvertCache(str(tmp_path))
+    key: str = ConvertCache.get_key(source, "maketx|-u")
+    assert cache.lookup(destination, key) is None
+    cache.store(destination, key, 1.5)
+    assert cache.lookup(destination, key) == 1.5
+    cache.save()
+    # The index is read back by another session.
+    assert ConvertCache(str(tmp_path)).lookup(destination, key) == 1.5
+
+
+def test_cache_miss_on_change(tmp_path):
+    source: str = _write(str(tmp_path / "a.tif"), b"source")
+    destination: str = _write(str(tmp_path / "a.tx"), b"converted")
+    cache: ConvertCache = ConvertCache(str(tmp_path))
+    key: str = ConvertCache.get_key(source, "maketx|-u")
+    cache.store(destination, key, 1.5)
+    # The signature changed, such as converter options or version.
+    assert cache.lookup(destination, ConvertCache.get_key(source, "maketx|-u --hicomp")) is None
+    # The source content changed.
+    _write(source, b"painted")
+    assert cache.lookup(destination, ConvertCache.get_key(source, "maketx|-u")) is None
+    _write(source, b"source")
+    assert cache.lookup(destination, ConvertCache.get_key(source, "maketx|-u")) == 1.5
+    # The destination is replaced by another file.
+    _write(destination, b"modified by hand")
+    assert cache.lookup(destination, key) is None
+
+
+def test_scheduler_largest_first():
+    scheduler: ConvertScheduler = ConvertScheduler(4, 1000, adaptive=False)
+    for name, memory in (("small", 10), ("large", 300), ("medium", 100)):
+        scheduler.push(_task(name, memory))
+    assert [scheduler.acquire().job.source for _ in range(3)] == ["large", "medium", "small"]
+
+
+def test_scheduler_memory_budget():
+    scheduler: ConvertScheduler = ConvertScheduler(4, 100, adaptive=False)
+    for name, memory in (("a", 60), ("b", 50), ("c", 30)):
+        scheduler.push(_task(name, memory))
+    first: ConvertTask = scheduler.acquire()
+    assert first.job.source == "a"
+    acquired: list = []
+    waiter: threading.Thread = threading.Thread(
+        target=lambda: acquired.append(scheduler.acquire())
+    )
+    waiter.start()
+    # 60 + 50 is over budget, the next largest waits.
+    waiter.join(0.2)
+    assert waiter.is_alive()
+    scheduler.release(first)
+    waiter.join(Timeout)
+    assert acquired[0].job.source == "b"
+    # 50 + 30 fits in budget.
+    assert scheduler.acquire().job.source == "c"
+    assert scheduler.memory_used == 80
+    assert scheduler.running == 2
+
+
+def test_scheduler_over_budget_runs_alone():
+    scheduler: ConvertScheduler = ConvertScheduler(4, 100, adaptive=False)
+    scheduler.push(_task("huge", 500))
+    scheduler.push(_task("small", 10))
+    huge: ConvertTask = scheduler.acquire()
+    assert huge.job.source == "huge"
+    acquired: list = []
+    waiter: threading.Thread = threading.Thread(
+        target=lambda: acquired.append(scheduler.acquire())
+    )
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()
+    scheduler.release(huge)
+    waiter.join(Timeout)
+    assert acquired[0].job.source == "small"
+
+
+def test_scheduler_concurrency_limit():
+    scheduler: ConvertScheduler = ConvertScheduler(2, 10 ** 9, adaptive=False)
+    for index in range(3):
+        scheduler.push(_task(str(index), 1))
+    first: ConvertTask = scheduler.acquire()
+    scheduler.acquire()
+    waiter: threading.Thread = threading.Thread(target=scheduler.acquire)
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()
+    scheduler.release(first)
+    waiter.join(Timeout)
+    assert not waiter.is_alive()
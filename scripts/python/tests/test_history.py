@@ -0,0 +1,105 @@
+#
+# History Tests
+#   The tests of the SQLite export history, the runs read back in manifest
+#   form, the stale outputs and the pruned runs.
+#   How to use :
+#       python -m pytest scripts/python/tests
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import List
+from os.path import dirname, join, realpath
+import sys
+import os
+
+sys.path.append(join(dirname(dirname(realpath(__file__))), "modules"))
+
+from SurF.history import ExportHistory  # noqa: E402
+from SurF.plan import RunHistory  # noqa: E402
+
+
+def _write(file: str, content: bytes) -> str:
+    os.makedirs(dirname(file), exist_ok=True)
+    with open(file, "wb") as file_handle:
+        file_handle.write(content)
+    return file
+
+
+def _records(root: str) -> List[dict]:
+    basecolor: str = _write(join(root, "tif", "Hero_BaseColor.1001.tif"), b"c" * 400)
+    roughness: str = _write(join(root, "tif", "Hero_Roughness.1001.tif"), b"r" * 100)
+    converted: str = _write(join(root, "tx", "Hero_BaseColor.1001.tx"), b"t" * 800)
+    common: dict = {
+        "texture_set": "Body", "profile": "film", "derived": False, "udim": 1001,
+        "bit_depth": "8", "export_duration": 4.0, "params_hash": "p1"
+    }
+    return [
+        dict(
+            common, channel="basecolor", source=basecolor, source_bytes=400,
+            converted=converted, converted_bytes=800, convert_duration=2.0,
+            convert_cached=False, convert_params="c1"
+        ),
+        dict(
+            common, channel="roughness", source=roughness, source_bytes=100,
+            converted=None, converted_bytes=None, convert_duration=None,
+            convert_cached=False, convert_params=None
+        )
+    ]
+
+
+def test_add_run(tmp_path):
+    history: ExportHistory = ExportHistory(str(tmp_path / ExportHistory.FileName))
+    records: List[dict] = _records(str(tmp_path))
+    assert history.add_run({"project": "Hero.spp", "title": "Hero", "started": 1.0}, records) == 1
+    runs: List[List[dict]] = history.get_runs(10)
+    assert len(runs) == 1
+    assert [(record["channel"], record["source"], record.get("converted")) for record in runs[0]] == [
+        (record["channel"], record["source"], record.get("converted")) for record in records
+    ]
+    assert runs[0][0]["convert_duration"] == 2.0
+    jobs = history.get_channel_jobs("Body", "basecolor", "convert")
+    assert len(jobs) == 1
+    assert jobs[0]["input"] == records[0]["source"]
+    assert jobs[0]["output"] == records[0]["converted"]
+    assert jobs[0]["bytes"] == 800
+    assert jobs[0]["params_hash"] == "c1"
+    assert jobs[0]["input_hash"] and jobs[0]["output_hash"]
+
+
+def test_stale_outputs(tmp_path):
+    history: ExportHistory = ExportHistory(str(tmp_path / ExportHistory.FileName))
+    records: List[dict] = _records(str(tmp_path))
+    history.add_run({"title": "Hero"}, records)
+    assert history.get_stale_outputs("Body", "film") == {}
+    os.remove(records[0]["source"])
+    _write(records[1]["source"], b"painted over")
+    assert history.get_stale_outputs("Body", "film") == {
+        "basecolor": [records[0]["source"]],
+        "roughness": [records[1]["source"]]
+    }
+    assert history.get_stale_outputs("Body", "realtime") == {}
+
+
+def test_keep_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(ExportHistory, "KeepRuns", 2)
+    history: ExportHistory = ExportHistory(str(tmp_path / ExportHistory.FileName))
+    records: List[dict] = _records(str(tmp_path))
+    for index in range(3):
+        history.add_run({"title": f"Hero{index}"}, records)
+    assert len(history.get_runs(10)) == 2
+    assert len(history.get_channel_jobs("Body", "basecolor")) == 2
+
+
+def test_estimates_from_history(tmp_path):
+    history: ExportHistory = ExportHistory(str(tmp_path / ExportHistory.FileName))
+    records: List[dict] = _records(str(tmp_path))
+    history.add_run({"title": "Hero"}, records)
+    runs: RunHistory = RunHistory.from_runs(history.get_runs(10))
+    # The painter call is shared by the files of texture set.
+    assert runs.get_export_seconds(records[0]["source"], 0) == 2.0
+    assert runs.get_convert_seconds(records[0]["source"], 0) == 2.0
+    assert runs.get_bytes(records[0]["converted"]) == 800
+    assert runs.export_rate == 500 / 4.0
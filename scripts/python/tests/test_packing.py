@@ -0,0 +1,103 @@
+#
+# Packing Tests
+#   The tests of packed map descriptions and the packing validation.
+#   How to use :
+#       python -m pytest scripts/python/tests
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import Dict, List
+from os.path import dirname, join, realpath
+import sys
+
+sys.path.append(join(dirname(dirname(realpath(__file__))), "modules"))
+
+from SurF.packing import PackedMap, validate_packing  # noqa: E402
+
+Maps: Dict[str, str] = {"basecolor": "C1", "roughness": "R1", "metallic": "M1"}
+MeshMaps: List[str] = ["ambient_occlusion", "curvature", "thickness"]
+Orm: dict = {
+    "channels": {"R": "mesh:ambient_occlusion", "G": "Roughness", "B": "metallic.R"},
+    "bit_depth": 16,
+    "exclusive": 0
+}
+
+
+def test_packed_map():
+    packed: PackedMap = PackedMap("ORM", Orm)
+    assert packed.label == "orm"
+    assert packed.target == "textures"
+    assert not packed.exclusive
+    assert packed.channel_labels == {"roughness", "metallic"}
+    assert packed.get_missing(["basecolor", "roughness"]) == ["metallic"]
+    assert PackedMap("RM", {"channels": {"R": "roughness"}}).exclusive
+
+
+def test_packed_map_build():
+    packed: PackedMap = PackedMap("ORM", Orm)
+    description: dict = packed.build("Hero_ORM", {
+        "roughness": ("documentMap", "roughness"),
+        "metallic": ("documentMap", "metallic")
+    })
+    assert description == {
+        "fileName": "Hero_ORM",
+        "channels": [{
+            "destChannel": "R", "srcChannel": "L",
+            "srcMapType": "meshMap", "srcMapName": "ambient_occlusion"
+        }, {
+            "destChannel": "G", "srcChannel": "L",
+            "srcMapType": "documentMap", "srcMapName": "roughness"
+        }, {
+            "destChannel": "B", "srcChannel": "R",
+            "srcMapType": "documentMap", "srcMapName": "metallic"
+        }],
+        "parameters": {"bitDepth": "16"}
+    }
+    assert packed.build("Hero_ORM", {
+        "roughness": ("documentMap", "roughness"),
+        "metallic": ("documentMap", "metallic")
+    }, 8)["parameters"] == {"bitDepth": "8"}
+
+
+def test_validate_packing():
+    assert validate_packing({"ORM": Orm}, Maps, MeshMaps) == []
+    assert validate_packing({}, Maps, MeshMaps) == []
+    assert validate_packing([], Maps, MeshMaps) == ["packing : must be object, got []"]
+    assert validate_packing({"CombinedMap": {
+        "target": "meshmaps",
+        "channels": {"R": "mesh:ambient_occlusion", "G": "mesh:curvature"}
+    }}, Maps, MeshMaps) == []
+
+
+def test_validate_packing_errors():
+    errors: List[str] = validate_packing({
+        "C1": {"channels": {"R": "roughness"}},
+        "Empty": {"channels": {}},
+        "Bad": {
+            "target": "disk",
+            "bit_depth": 12,
+            "exclusive": 2,
+            "channels": {"L": "roughness", "R": "metallic.Q", "X": "basecolor", "G": 5}
+        },
+        "Mesh": {
+            "target": "meshmaps",
+            "channels": {"R": "mesh:position", "G": "roughness", "B": "opacity"}
+        }
+    }, Maps, MeshMaps)
+    assert errors == [
+        "packing : C1 is already a channel output",
+        "packing : Empty.channels must be non-empty object",
+        "packing : Bad.channels ['X'] are not in ['R', 'G', 'B', 'A', 'L']",
+        "packing : Bad.channels can't mix L with R, G, B",
+        "packing : Bad.target is not one of ['textures', 'meshmaps']",
+        "packing : Bad.bit_depth is not one of [8, 16, 32]",
+        "packing : Bad.exclusive must be 0 or 1",
+        "packing : Bad.R component 'Q' is not in ['R', 'G', 'B', 'A', 'L']",
+        "packing : Bad.G must be str, got 5",
+        "packing : Mesh.R mesh map 'position' is unknown",
+        "packing : Mesh.G meshmaps target packs mesh maps only",
+        "packing : Mesh.B channel 'opacity' is not in maps"
+    ]
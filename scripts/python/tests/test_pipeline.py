@@ -0,0 +1,107 @@
+#
+# Pipeline Tests
+#   The tests of stage ordering, dropped items, cancel and back-pressure.
+#   How to use :
+#       python -m pytest scripts/python/tests
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import List
+from os.path import dirname, join, realpath
+import threading
+import sys
+
+sys.path.append(join(dirname(dirname(realpath(__file__))), "modules"))
+
+from SurF.pipeline import Pipeline, Stage  # noqa: E402
+
+Timeout: float = 10.0
+
+
+def test_stages_keep_order():
+    stages: List[Stage] = [
+        Stage("export", lambda item: item * 2),
+        Stage("convert", lambda item: item + 1),
+        Stage("publish", lambda item: str(item))
+    ]
+    pipeline: Pipeline = Pipeline(stages, queue_size=1)
+    assert pipeline.run(list(range(20))) == [str(item * 2 + 1) for item in range(20)]
+    assert [stage.count for stage in stages] == [20, 20, 20]
+
+
+def test_dropped_and_failed_items():
+    def convert(item: int) -> int:
+        if item == 3:
+            raise RuntimeError("broken")
+        return item
+
+    stages: List[Stage] = [
+        Stage("export", lambda item: item if item % 2 else None),
+        Stage("convert", convert, 2)
+    ]
+    results: List[int] = Pipeline(stages).run(list(range(8)))
+    assert sorted(results) == [1, 5, 7]
+    assert stages[1].count == 4
+    assert stages[1].failed == 1
+
+
+def test_single_stage():
+    assert Pipeline([Stage("export", lambda item: -item)]).run([1, 2]) == [-1, -2]
+
+
+def test_back_pressure():
+    release: threading.Event = threading.Event()
+    running: threading.Event = threading.Event()
+
+    def convert(item: int) -> int:
+        running.set()
+        release.wait(Timeout)
+        return item
+
+    pipeline: Pipeline = Pipeline([
+        Stage("export", lambda item: item), Stage("convert", convert)
+    ], queue_size=1)
+    pipeline.start()
+    pipeline.submit(0)
+    assert running.wait(Timeout)
+    assert not pipeline.is_full()
+    pipeline.submit(1)
+    # The convert stage is busy, one more item fills the queue.
+    assert pipeline.is_full()
+    submitter: threading.Thread = threading.Thread(target=pipeline.submit, args=(2,))
+    submitter.start()
+    submitter.join(0.2)
+    assert submitter.is_alive()
+    release.set()
+    submitter.join(Timeout)
+    assert not submitter.is_alive()
+    assert pipeline.close() == [0, 1, 2]
+
+
+def test_cancel_drops_queued_items():
+    release: threading.Event = threading.Event()
+    running: threading.Event = threading.Event()
+
+    def convert(item: int) -> int:
+        running.set()
+        release.wait(Timeout)
+        return item
+
+    stages: List[Stage] = [Stage("export", lambda item: item), Stage("convert", convert)]
+    pipeline: Pipeline = Pipeline(stages, queue_size=2)
+    pipeline.start()
+    pipeline.submit(0)
+    assert running.wait(Timeout)
+    pipeline.submit(1)
+    pipeline.submit(2)
+    pipeline.cancel()
+    # Not processed after cancelled.
+    pipeline.submit(3)
+    release.set()
+    # The running item is finished, the queued items are dropped.
+    assert pipeline.close() == [0]
+    assert stages[0].count == 3
+    assert stages[1].count == 1
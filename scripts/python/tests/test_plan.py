@@ -0,0 +1,106 @@
+#
+# Plan Tests
+#   The tests of the export plan resolved against disk and past runs.
+#   How to use :
+#       python -m pytest scripts/python/tests
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import Dict
+from os.path import dirname, join, realpath
+import json
+import sys
+import os
+
+sys.path.append(join(dirname(dirname(realpath(__file__))), "modules"))
+
+from SurF.plan import ExportPlan, PlanItem, RunHistory, estimate_bytes  # noqa: E402
+
+
+def _write(file: str, content: bytes) -> str:
+    os.makedirs(dirname(file), exist_ok=True)
+    with open(file, "wb") as file_handle:
+        file_handle.write(content)
+    return file
+
+
+def _build(root: str) -> Dict[str, PlanItem]:
+    basecolor: str = _write(join(root, "tif", "Hero_BaseColor.1001.tif"), b"c" * 300)
+    roughness: str = join(root, "tif", "Hero_Roughness.1001.tif")
+    roughness_rt: str = _write(join(root, "png", "Hero_Roughness_RT.1001.png"), b"r" * 50)
+    plan: ExportPlan = ExportPlan("Hero")
+    items: Dict[str, PlanItem] = {
+        "basecolor": PlanItem(
+            "Body", "film", "basecolor", 1001, basecolor, "export", 64, 64, 3, 8
+        ),
+        "roughness": PlanItem(
+            "Body", "film", "roughness", 1001, roughness, "export", 64, 64, 1, 16
+        ),
+        "roughness_rt": PlanItem(
+            "Body", "rt", "roughness", 1001, roughness_rt, "derive", 16, 16, 1, 8, roughness
+        ),
+        "basecolor_tx": PlanItem(
+            "Body", "film", "basecolor", 1001, join(root, "tx", "Hero_BaseColor.1001.tx"),
+            "convert", 64, 64, 3, 8, basecolor
+        )
+    }
+    items["basecolor"].dirty = False
+    for item in items.values():
+        plan.add(item)
+    history: RunHistory = RunHistory()
+    history.add([{
+        "texture_set": "Body", "channel": "basecolor", "source": basecolor,
+        "source_bytes": 400, "export_duration": 3.0,
+        "converted": items["basecolor_tx"].file, "converted_bytes": 900,
+        "convert_duration": 1.5
+    }])
+    plan.resolve(history)
+    items["plan"] = plan
+    return items
+
+
+def test_plan_status(tmp_path):
+    items: Dict[str, PlanItem] = _build(str(tmp_path))
+    assert items["basecolor"].status == "unchanged"
+    assert items["roughness"].status == "new"
+    # The derived file changes with its dirty source.
+    assert items["roughness_rt"].status == "changed"
+    assert items["basecolor_tx"].status == "new"
+
+
+def test_plan_estimates(tmp_path):
+    items: Dict[str, PlanItem] = _build(str(tmp_path))
+    # The recorded bytes win over the file on disk.
+    assert items["basecolor"].bytes == 400
+    assert items["basecolor_tx"].bytes == 900
+    assert items["roughness_rt"].bytes == 50
+    assert items["roughness"].bytes == estimate_bytes(64, 64, 1, 16, "tif")
+    assert items["basecolor"].seconds == 3.0
+    assert items["basecolor_tx"].seconds == 1.5
+    # Estimated by the export throughput of past runs, 400 bytes in 3 seconds.
+    assert items["roughness"].seconds == items["roughness"].bytes / (400 / 3.0)
+    assert items["roughness_rt"].seconds is None
+    assert items["basecolor"].growth == 100
+    assert items["roughness_rt"].growth == 0
+
+
+def test_plan_totals(tmp_path):
+    items: Dict[str, PlanItem] = _build(str(tmp_path))
+    plan: ExportPlan = items["plan"]
+    totals: dict = plan.get_totals()
+    assert totals["files"] == 4
+    assert totals["status"] == {"new": 2, "changed": 1, "unchanged": 1}
+    assert totals["bytes"] == 400 + 900 + 50 + estimate_bytes(64, 64, 1, 16, "tif")
+    assert totals["unknown_seconds"] == 1
+    assert plan.spaces and not plan.get_warnings()
+    plan_file: str = str(tmp_path / "plan.json")
+    plan.write(plan_file)
+    with open(plan_file, "r") as file_handle:
+        written: dict = json.load(file_handle)
+    assert written["totals"]["status"] == totals["status"]
+    assert [item["status"] for item in written["items"]] == [
+        "unchanged", "new", "changed", "new"
+    ]
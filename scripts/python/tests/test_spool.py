@@ -0,0 +1,208 @@
+#
+# Spool Tests
+#   The tests of spool claims, stale recovery, claim ownership and the
+#   detached results, the workers run in their own processes on one spool.
+#   How to use :
+#       python -m pytest scripts/python/tests
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from typing import List, Optional
+from os.path import dirname, join, realpath
+import multiprocessing
+import shutil
+import time
+import json
+import sys
+import os
+
+sys.path.append(join(dirname(dirname(realpath(__file__))), "modules"))
+
+from SurF.convert import ConvertBatch, ConvertCache, ConvertJob, ConvertResult  # noqa: E402
+from SurF.convert import ConverterBackend  # noqa: E402
+from SurF.spool import SpoolQueue, SpoolWorker  # noqa: E402
+
+Timeout: float = 60.0
+# The workers are spawned, as on Windows.
+_Context = multiprocessing.get_context("spawn")
+
+
+class CopyBackend(ConverterBackend):
+    """
+    Convert by copying the source.
+    """
+    Name: str = "copy"
+
+    def convert(self, job: ConvertJob, batch: ConvertBatch) -> ConvertResult:
+        start: float = time.perf_counter()
+        shutil.copyfile(job.source, job.destination)
+        return ConvertResult(
+            job.source, job.destination, 0, duration=time.perf_counter() - start
+        )
+
+
+def _claim_all(directory: str, start, results) -> None:
+    worker: SpoolWorker = SpoolWorker(directory, backend=CopyBackend())
+    start.wait(Timeout)
+    names: List[str] = []
+    name: Optional[str] = worker.claim()
+    while name is not None:
+        names.append(name)
+        name = worker.claim()
+    results.put(names)
+
+
+def _claim_and_process(directory: str, stale_timeout: float, claimed, go, results) -> None:
+    worker: SpoolWorker = SpoolWorker(
+        directory, backend=CopyBackend(), stale_timeout=stale_timeout
+    )
+    worker.recover_stale()
+    name: Optional[str] = worker.claim()
+    results.put((worker.name, name))
+    claimed.set()
+    go.wait(Timeout)
+    if name is not None:
+        worker.process(name)
+
+
+def _run_once(directory: str, stale_timeout: float) -> None:
+    SpoolWorker(
+        directory, workers=2, backend=CopyBackend(), stale_timeout=stale_timeout
+    ).run(once=True)
+
+
+def _make_jobs(root: str, count: int) -> List[ConvertJob]:
+    os.makedirs(join(root, "tif"), exist_ok=True)
+    jobs: List[ConvertJob] = []
+    index: int
+    for index in range(count):
+        source: str = join(root, "tif", f"Hero_BaseColor.{1001 + index}.tif")
+        with open(source, "wb") as file_handle:
+            file_handle.write(os.urandom(1024 * (index + 1)))
+        jobs.append(ConvertJob(
+            source, join(root, "tx", f"Hero_BaseColor.{1001 + index}.tx"),
+            ["maketx", "-o", "destination", "source"], "copy"
+        ))
+    return jobs
+
+
+def _start(target, *args) -> multiprocessing.Process:
+    process = _Context.Process(target=target, args=args)
+    process.start()
+    return process
+
+
+def _join(process: multiprocessing.Process) -> None:
+    process.join(Timeout)
+    assert process.exitcode == 0
+
+
+def _read(file: str) -> dict:
+    with open(file, "r") as file_handle:
+        return json.load(file_handle)
+
+
+def test_one_worker_claims_each_job(tmp_path):
+    directory: str = str(tmp_path / "spool")
+    SpoolQueue(directory).submit(_make_jobs(str(tmp_path), 20))
+    start = _Context.Event()
+    results = _Context.Queue()
+    processes: List[multiprocessing.Process] = [
+        _start(_claim_all, directory, start, results) for _ in range(2)
+    ]
+    start.set()
+    claimed: List[List[str]] = [results.get(timeout=Timeout) for _ in processes]
+    for process in processes:
+        _join(process)
+    first, second = claimed
+    assert not set(first) & set(second)
+    assert sorted(first + second) == sorted(os.listdir(join(directory, "claimed")))
+    assert len(first + second) == 20
+    assert not os.listdir(join(directory, "pending"))
+    tokens: List[str] = [
+        _read(join(directory, "claimed", name))["claim"] for name in first + second
+    ]
+    assert len(set(tokens)) == 20
+
+
+def test_stale_claim_recovered(tmp_path):
+    directory: str = str(tmp_path / "spool")
+    job: ConvertJob = _make_jobs(str(tmp_path), 1)[0]
+    SpoolQueue(directory).submit([job])
+    # The worker claims and exits without converting.
+    start = _Context.Event()
+    results = _Context.Queue()
+    crashed = _start(_claim_all, directory, start, results)
+    start.set()
+    name: str = results.get(timeout=Timeout)[0]
+    _join(crashed)
+    claimed_file: str = join(directory, "claimed", name)
+    stale: float = time.time() - 1000
+    os.utime(claimed_file, (stale, stale))
+    _join(_start(_run_once, directory, 60.0))
+    done: dict = _read(join(directory, "done", name))
+    assert done["return_code"] == 0
+    assert os.path.isfile(job.destination)
+    assert not os.listdir(join(directory, "claimed"))
+    assert not os.listdir(join(directory, "pending"))
+
+
+def test_taken_over_claim_drops_result(tmp_path):
+    directory: str = str(tmp_path / "spool")
+    SpoolQueue(directory).submit(_make_jobs(str(tmp_path), 1))
+    results = _Context.Queue()
+    first_claimed, first_go = _Context.Event(), _Context.Event()
+    first = _start(_claim_and_process, directory, 60.0, first_claimed, first_go, results)
+    assert first_claimed.wait(Timeout)
+    _, name = results.get(timeout=Timeout)
+    claimed_file: str = join(directory, "claimed", name)
+    stale: float = time.time() - 1000
+    os.utime(claimed_file, (stale, stale))
+    # The second worker recovers the stale claim and claims it again.
+    second_claimed, second_go = _Context.Event(), _Context.Event()
+    second = _start(_claim_and_process, directory, 1.0, second_claimed, second_go, results)
+    assert second_claimed.wait(Timeout)
+    second_name, second_job = results.get(timeout=Timeout)
+    assert second_job == name
+    first_go.set()
+    _join(first)
+    done_file: str = join(directory, "done", name)
+    assert not os.path.exists(done_file)
+    assert _read(claimed_file)["worker"] == second_name
+    second_go.set()
+    _join(second)
+    assert _read(done_file)["worker"] == second_name
+    assert not os.listdir(join(directory, "claimed"))
+
+
+def test_wait_stores_results(tmp_path):
+    directory: str = str(tmp_path / "spool")
+    jobs: List[ConvertJob] = _make_jobs(str(tmp_path), 3)
+    cache: ConvertCache = ConvertCache.get(str(tmp_path / "tx"))
+    batch = SpoolQueue(directory).submit(jobs, cache)
+    worker = _start(_run_once, directory, 60.0)
+    results: List[ConvertResult] = batch.wait(timeout=Timeout)
+    _join(worker)
+    assert sorted(result.source for result in results) == [job.source for job in jobs]
+    assert all(result.successful for result in results)
+    assert not os.listdir(join(directory, "done"))
+    for job in jobs:
+        assert cache.lookup(job.destination, ConvertCache.get_key(job.source, "copy")) is not None
+
+
+def test_collect_detached_results(tmp_path):
+    directory: str = str(tmp_path / "spool")
+    jobs: List[ConvertJob] = _make_jobs(str(tmp_path), 3)
+    cache_directory: str = str(tmp_path / "tx")
+    queue: SpoolQueue = SpoolQueue(directory, detached=True)
+    queue.submit(jobs, ConvertCache.get(cache_directory))
+    _join(_start(_run_once, directory, 60.0))
+    assert len(os.listdir(join(directory, "done"))) == 3
+    assert queue.collect() == 3
+    assert not os.listdir(join(directory, "done"))
+    cache: ConvertCache = ConvertCache(cache_directory)
+    for job in jobs:
+        assert cache.lookup(job.destination, ConvertCache.get_key(job.source, "copy")) is not None
@@ -0,0 +1,93 @@
+#
+# UDIM Tests
+#   The tests of TileSet and the range and scope compilers.
+#   How to use :
+#       python -m pytest scripts/python/tests
+#
+# Author : Chia Xin Lin ( nnnight@gmail.com )
+#
+# Substance Painter Version : 2020.2.0 (6.2.0)
+#
+
+from os.path import dirname, join, realpath
+import sys
+
+sys.path.append(join(dirname(dirname(realpath(__file__))), "modules"))
+
+from SurF.udim import TileSet, compile_range, compile_scope, resolve_scope  # noqa: E402
+
+
+def test_tile_set_range():
+    tiles: TileSet = TileSet.from_range(1001, 1010)
+    assert len(tiles) == 10
+    assert 1001 in tiles and 1010 in tiles
+    assert 1011 not in tiles and 1000 not in tiles
+    assert list(TileSet.from_range(1010, 1005)) == []
+    assert TileSet.from_range(9995, 10005) == TileSet.from_range(9995, 9999)
+
+
+def test_tile_set_operators():
+    tiles: TileSet = TileSet.from_range(1001, 1005)
+    other: TileSet = TileSet.from_tiles([1005, 1006])
+    assert list(tiles | other) == [1001, 1002, 1003, 1004, 1005, 1006]
+    assert list(tiles & other) == [1005]
+    assert list(tiles - other) == [1001, 1002, 1003, 1004]
+    assert list(tiles ^ other) == [1001, 1002, 1003, 1004, 1006]
+    assert (~tiles | tiles).is_all
+    assert not TileSet.Empty
+    assert hash(tiles) == hash(TileSet.from_range(1001, 1005))
+
+
+def test_tile_set_conversion():
+    tiles: TileSet = TileSet.from_tiles([1001, 1002, 1011, 1013])
+    assert tiles.to_uv_tiles() == [[0, 0], [1, 0], [0, 1], [2, 1]]
+    assert TileSet.from_uv_tiles([(0, 0), (1, 0), (0, 1), (2, 1)]) == tiles
+    assert tiles.to_ranges() == [(1001, 1002), (1011, 1011), (1013, 1013)]
+    assert tiles.to_expression() == "1001-1002,1011,1013"
+    assert TileSet.All.to_expression() == "*"
+
+
+def test_compile_range():
+    assert list(compile_range("1001-1003,1010")) == [1001, 1002, 1003, 1010]
+    assert list(compile_range("1001-1003 1010")) == [1001, 1002, 1003, 1010]
+    assert list(compile_range("1001-1005,!1002-1003")) == [1001, 1004, 1005]
+    assert compile_range("!1005") == TileSet.All - TileSet.from_tiles([1005])
+    assert compile_range("*").is_all
+    assert not compile_range("1010-1005")
+    assert not compile_range("abc")
+
+
+def test_compile_scope_separators():
+    expected: dict = {
+        "diffuse": TileSet.from_range(1001, 1010),
+        "normal": TileSet.from_tiles([1001])
+    }
+    expression: str
+    for expression in (
+            "diffuse:1001-1010;normal:1001",
+            "diffuse:1001-1010 normal:1001",
+            "diffuse:1001-1010,normal:1001",
+            " diffuse : 1001-1010 ; normal:1001 ;"
+    ):
+        assert resolve_scope(expression, []) == expected, expression
+
+
+def test_compile_scope_merge():
+    terms: dict = compile_scope("diffuse:1001-1002,1005 1007;diffuse:!1002")
+    assert list(terms) == ["diffuse"]
+    assert list(terms["diffuse"].resolve()) == [1001, 1005, 1007]
+
+
+def test_compile_scope_wildcard():
+    scope: dict = resolve_scope("*:1001-1010;diffuse:!1005", ["diffuse", "normal"])
+    assert scope["normal"] == TileSet.from_range(1001, 1010)
+    assert scope["diffuse"] == TileSet.from_range(1001, 1010) - TileSet.from_tiles([1005])
+    assert resolve_scope("normal:*", ["diffuse"]) == {"normal": TileSet.All}
+
+
+def test_compile_scope_invalid():
+    assert compile_scope("") == {}
+    assert compile_scope("diffuse 1001") == {}
+    assert compile_scope("diffuse:1010-1005") == {}
+    assert compile_scope("diffuse:abc") == {}
+    assert list(compile_scope("diffuse:abc normal:1001")) == ["normal"]